@@ -3,10 +3,14 @@
 Striker 1945 - A vertical scrolling shoot-em-up game
 """
 
+import time
+
+STARTED = time.perf_counter()  # Taken before the game modules load, so the startup report covers imports
+
 from src.game import Game
 
 def main():
-    game = Game()
+    game = Game(started=STARTED)
     game.run()
 
 
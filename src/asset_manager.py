@@ -1,11 +1,14 @@
 import pygame
+import json
 import os
+from src.settings import SCREEN_WIDTH, SCREEN_HEIGHT
 
 class AssetManager:
     def __init__(self):
         self.images = {}
         self.sounds = {}
         self.fonts = {}
+        self.configs = {}  # Parsed JSON data files by path, shared across game restarts
         
     def load_images(self):
         """Load all game images"""
@@ -185,6 +188,12 @@ class AssetManager:
                     pygame.draw.circle(surf, color, (width - 8, 24), 4)
                 self.images[key] = surf
 
+        # Translucent overlay behind the game over / victory screens
+        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        overlay.set_alpha(128)
+        overlay.fill((0, 0, 0))
+        self.images['overlay'] = overlay
+
     def load_sounds(self):
         """Load all game sounds"""
         sound_path = os.path.join('assets', 'sounds')
@@ -220,6 +229,7 @@ class AssetManager:
         # Use default font if custom font not available
         self.fonts['score'] = pygame.font.Font(None, 24)
         self.fonts['title'] = pygame.font.Font(None, 48)
+        self.fonts['small'] = pygame.font.Font(None, 18)
         
     def load_all(self):
         """Load all assets"""
@@ -239,6 +249,21 @@ class AssetManager:
         """Get font by key"""
         return self.fonts.get(key)
         
+    def get_config(self, path):
+        """
+        Get a parsed JSON data file, reading it on first use only.
+        
+        Returns None if the file is missing or invalid. The result is shared
+        by every caller, so it must be treated as read-only.
+        """
+        if path not in self.configs:
+            try:
+                with open(path, 'r') as f:
+                    self.configs[path] = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self.configs[path] = None
+        return self.configs[path]
+        
     def play_sound(self, key):
         """Play sound by key"""
         sound = self.sounds.get(key)
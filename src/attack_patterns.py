@@ -5,11 +5,11 @@ import random
 
 class AttackPattern:
     """Base class for attack patterns"""
-    def __init__(self, config, all_sprites, bullet_group):
+    def __init__(self, config, all_sprites, bullets):
         self.cooldown = config.get('cooldown', 1.0)
         self.last_attack_time = 0
         self.all_sprites = all_sprites
-        self.bullet_group = bullet_group
+        self.bullets = bullets
         
     def update(self, dt, enemy, player):
         current_time = pygame.time.get_ticks()
@@ -26,16 +26,23 @@ class AttackPattern:
         """Override this to implement the actual attack"""
         pass
 
+    def fire(self, enemy, velocity, image_key=None):
+        """Spawn one enemy bullet at the enemy's center into the enemy BulletField"""
+        if self.bullets is None:
+            return
+        image_id = self.bullets.image_id(image_key or 'enemy_bullet', enemy_bullet_image, enemy.asset_manager, image_key)
+        self.bullets.spawn(enemy.rect.center, velocity, image_id)
+
 class NoAttack(AttackPattern):
-    def __init__(self, config, all_sprites, bullet_group):
-        super().__init__(config, all_sprites, bullet_group)
+    def __init__(self, config, all_sprites, bullets):
+        super().__init__(config, all_sprites, bullets)
         
     def execute_attack(self, enemy, player):
         pass  # Do nothing
 
 class SingleShotPlayer(AttackPattern):
-    def __init__(self, config, all_sprites, bullet_group):
-        super().__init__(config, all_sprites, bullet_group)
+    def __init__(self, config, all_sprites, bullets):
+        super().__init__(config, all_sprites, bullets)
         self.bullet_speed = config.get('bullet_speed', 300)
         
     def execute_attack(self, enemy, player):
@@ -43,20 +50,20 @@ class SingleShotPlayer(AttackPattern):
         direction = player.pos - enemy.pos
         if direction.magnitude() > 0:
             direction = direction.normalize()
-            EnemyBullet(enemy.rect.center, direction * self.bullet_speed, [self.all_sprites, self.bullet_group])
+            self.fire(enemy, direction * self.bullet_speed)
 
 class SingleShotDown(AttackPattern):
-    def __init__(self, config, all_sprites, bullet_group):
-        super().__init__(config, all_sprites, bullet_group)
+    def __init__(self, config, all_sprites, bullets):
+        super().__init__(config, all_sprites, bullets)
         self.bullet_speed = config.get('bullet_speed', 300)
         
     def execute_attack(self, enemy, player):
         direction = pygame.math.Vector2(0, 1)  # Straight down
-        EnemyBullet(enemy.rect.center, direction * self.bullet_speed, [self.all_sprites, self.bullet_group])
+        self.fire(enemy, direction * self.bullet_speed)
 
 class SpreadShot(AttackPattern):
-    def __init__(self, config, all_sprites, bullet_group):
-        super().__init__(config, all_sprites, bullet_group)
+    def __init__(self, config, all_sprites, bullets):
+        super().__init__(config, all_sprites, bullets)
         self.bullet_speed = config.get('bullet_speed', 300)
         self.bullet_count = config.get('bullet_count', 3)
         self.spread_angle = config.get('spread_angle', 15)  # degrees
@@ -87,11 +94,11 @@ class SpreadShot(AttackPattern):
                 base_direction.x * sin_a + base_direction.y * cos_a
             )
             
-            EnemyBullet(enemy.rect.center, rotated_dir * self.bullet_speed, [self.all_sprites, self.bullet_group])
+            self.fire(enemy, rotated_dir * self.bullet_speed)
 
 class CircularShot(AttackPattern):
-    def __init__(self, config, all_sprites, bullet_group):
-        super().__init__(config, all_sprites, bullet_group)
+    def __init__(self, config, all_sprites, bullets):
+        super().__init__(config, all_sprites, bullets)
         self.bullet_speed = config.get('bullet_speed', 250)
         self.bullet_count = config.get('bullet_count', 8)
         
@@ -101,11 +108,11 @@ class CircularShot(AttackPattern):
         for i in range(self.bullet_count):
             angle = i * angle_step
             direction = pygame.math.Vector2(math.cos(angle), math.sin(angle))
-            EnemyBullet(enemy.rect.center, direction * self.bullet_speed, [self.all_sprites, self.bullet_group])
+            self.fire(enemy, direction * self.bullet_speed)
 
 class BurstFire(AttackPattern):
-    def __init__(self, config, all_sprites, bullet_group):
-        super().__init__(config, all_sprites, bullet_group)
+    def __init__(self, config, all_sprites, bullets):
+        super().__init__(config, all_sprites, bullets)
         self.bullet_speed = config.get('bullet_speed', 350)
         self.burst_count = config.get('burst_count', 3)
         self.burst_delay = config.get('burst_delay', 0.1)  # seconds between shots in burst
@@ -137,11 +144,11 @@ class BurstFire(AttackPattern):
         direction = player.pos - enemy.pos
         if direction.magnitude() > 0:
             direction = direction.normalize()
-            EnemyBullet(enemy.rect.center, direction * self.bullet_speed, [self.all_sprites, self.bullet_group])
+            self.fire(enemy, direction * self.bullet_speed)
 
 class SpreadShotImage(AttackPattern):
-    def __init__(self, config, all_sprites, bullet_group):
-        super().__init__(config, all_sprites, bullet_group)
+    def __init__(self, config, all_sprites, bullets):
+        super().__init__(config, all_sprites, bullets)
         self.bullet_speed = config.get('bullet_speed', 300)
         self.bullet_count = config.get('bullet_count', 3)
         self.spread_angle = config.get('spread_angle', 15)
@@ -167,21 +174,21 @@ class SpreadShotImage(AttackPattern):
                 base_direction.x * sin_a + base_direction.y * cos_a
             )
             
-            EnemyBullet(enemy.rect.center, rotated_dir * self.bullet_speed, [self.all_sprites, self.bullet_group], image_key=self.image_key, asset_manager=enemy.asset_manager)
+            self.fire(enemy, rotated_dir * self.bullet_speed, self.image_key)
 
 class FastForwardShotImage(AttackPattern):
-    def __init__(self, config, all_sprites, bullet_group):
-        super().__init__(config, all_sprites, bullet_group)
+    def __init__(self, config, all_sprites, bullets):
+        super().__init__(config, all_sprites, bullets)
         self.bullet_speed = config.get('bullet_speed', 500)
         self.image_key = config.get('image', 'tang')
 
     def execute_attack(self, enemy, player):
         direction = pygame.math.Vector2(0, 1)
-        EnemyBullet(enemy.rect.center, direction * self.bullet_speed, [self.all_sprites, self.bullet_group], image_key=self.image_key, asset_manager=enemy.asset_manager)
+        self.fire(enemy, direction * self.bullet_speed, self.image_key)
 
 class BlueScreenAttack(AttackPattern):
-    def __init__(self, config, all_sprites, bullet_group):
-        super().__init__(config, all_sprites, bullet_group)
+    def __init__(self, config, all_sprites, bullets):
+        super().__init__(config, all_sprites, bullets)
         self.num_points = config.get('num_points', 5)
         self.delay = config.get('delay', 1.0) # 1 second
         self.points = []
@@ -219,52 +226,37 @@ class WarningPoint(pygame.sprite.Sprite):
                 self.kill()
 
 
-class EnemyBullet(pygame.sprite.Sprite):
-    def __init__(self, pos, velocity, groups, image_key=None, asset_manager=None):
-        super().__init__(groups)
-        
-        if image_key and asset_manager:
-            self.image = asset_manager.get_image(image_key)
-        else:
-            self.image = pygame.Surface((6, 6))
-            self.image.fill((255, 100, 100))  # Red enemy bullet
-        
-        self.rect = self.image.get_rect(center=pos)
-        
-        # Movement
-        self.pos = pygame.math.Vector2(self.rect.center)
-        self.velocity = velocity
-        
-    def update(self, dt):
-        self.pos += self.velocity * dt
-        self.rect.center = (round(self.pos.x), round(self.pos.y))
-        
-        # Remove when off screen
-        if (self.rect.right < 0 or self.rect.left > SCREEN_WIDTH or 
-            self.rect.bottom < 0 or self.rect.top > SCREEN_HEIGHT):
-            self.kill()
+def enemy_bullet_image(asset_manager=None, image_key=None):
+    """Enemy bullet image: the asset named `image_key`, or a small red square"""
+    if image_key and asset_manager:
+        image = asset_manager.get_image(image_key)
+        if image:
+            return image
+    image = pygame.Surface((6, 6))
+    image.fill((255, 100, 100))
+    return image
 
-def create_attack_pattern(config, all_sprites, bullet_group):
+def create_attack_pattern(config, all_sprites, bullets):
     """Factory function to create attack patterns"""
     pattern_type = config.get('type', 'none')
     
     if pattern_type == 'none':
-        return NoAttack(config, all_sprites, bullet_group)
+        return NoAttack(config, all_sprites, bullets)
     elif pattern_type == 'single_shot_player':
-        return SingleShotPlayer(config, all_sprites, bullet_group)
+        return SingleShotPlayer(config, all_sprites, bullets)
     elif pattern_type == 'single_shot_down':
-        return SingleShotDown(config, all_sprites, bullet_group)
+        return SingleShotDown(config, all_sprites, bullets)
     elif pattern_type == 'spread_shot':
-        return SpreadShot(config, all_sprites, bullet_group)
+        return SpreadShot(config, all_sprites, bullets)
     elif pattern_type == 'circular_shot':
-        return CircularShot(config, all_sprites, bullet_group)
+        return CircularShot(config, all_sprites, bullets)
     elif pattern_type == 'burst_fire':
-        return BurstFire(config, all_sprites, bullet_group)
+        return BurstFire(config, all_sprites, bullets)
     elif pattern_type == 'spread_shot_image':
-        return SpreadShotImage(config, all_sprites, bullet_group)
+        return SpreadShotImage(config, all_sprites, bullets)
     elif pattern_type == 'fast_forward_shot_image':
-        return FastForwardShotImage(config, all_sprites, bullet_group)
+        return FastForwardShotImage(config, all_sprites, bullets)
     elif pattern_type == 'blue_screen_attack':
-        return BlueScreenAttack(config, all_sprites, bullet_group)
+        return BlueScreenAttack(config, all_sprites, bullets)
     else:
-        return NoAttack(config, all_sprites, bullet_group)
\ No newline at end of file
+        return NoAttack(config, all_sprites, bullets)
\ No newline at end of file
@@ -1,19 +1,21 @@
 import pygame
-import json
 import os
 import math
 import random
 from src.movement_patterns import create_movement_pattern
 from src.attack_patterns import create_attack_pattern
+from src.log import get_logger, log_event
+
+log = get_logger('boss')
 
 class Boss(pygame.sprite.Sprite):
     """Boss enemy with enhanced health, multiple attack phases, and complex patterns"""
     
-    def __init__(self, pos, boss_type, asset_manager, player, groups):
+    def __init__(self, pos, boss_type, asset_manager, player, groups, bullets=None):
         super().__init__(groups)
         
         # Load boss configuration
-        self.config = self.load_boss_config(boss_type)
+        self.config = self.load_boss_config(boss_type, asset_manager)
         
         # Core attributes from config
         self.max_health = self.config['health']
@@ -47,10 +49,8 @@ class Boss(pygame.sprite.Sprite):
         self.player = player
         self.asset_manager = asset_manager
         
-        # Get sprite groups for attack patterns
+        # Sprite group and enemy BulletField for attack patterns
         all_sprites = groups[0] if groups else None
-        # enemy_bullet_group을 groups 리스트에서 직접 가져옵니다.
-        enemy_bullet_group = groups[2] if len(groups) > 2 else pygame.sprite.Group()
 
         # Boss-specific attributes
         self.phase = 1
@@ -63,7 +63,7 @@ class Boss(pygame.sprite.Sprite):
         self.attack_patterns = []
         for i in range(self.max_phases):
             phase_config = self.config['attack_phases'][i] if i < len(self.config['attack_phases']) else self.config['attack_phases'][-1]
-            pattern = create_attack_pattern(phase_config, all_sprites, enemy_bullet_group)
+            pattern = create_attack_pattern(phase_config, all_sprites, bullets)
             self.attack_patterns.append(pattern)
         # Movement pattern
         self.movement = create_movement_pattern(self.config['movement'])
@@ -76,13 +76,15 @@ class Boss(pygame.sprite.Sprite):
         
         # Internal state
         self.age = 0.0
+        self.talker = None  # Network address that triggered this boss, if any
+        self.talker_label = None  # Rendered talker address, drawn above the boss
         
         # Health bar properties
         self.health_bar_width = 200
         self.health_bar_height = 10
         
-    def load_boss_config(self, boss_type):
-        """Load boss configuration from JSON file"""
+    def load_boss_config(self, boss_type, asset_manager):
+        """Load boss configuration (built-in bosses, else data/boss_config.json parsed once by the asset manager)"""
         boss_configs = {
             "angry_migam": {
                 "health": 1000,
@@ -109,13 +111,10 @@ class Boss(pygame.sprite.Sprite):
         if boss_type in boss_configs:
             return boss_configs[boss_type]
 
-        config_path = os.path.join('data', 'boss_config.json')
-        try:
-            with open(config_path, 'r') as f:
-                configs = json.load(f)
-                return configs.get(boss_type, configs.get('basic', self.get_default_config()))
-        except (FileNotFoundError, json.JSONDecodeError):
+        configs = asset_manager.get_config(os.path.join('data', 'boss_config.json'))
+        if configs is None:
             return self.get_default_config()
+        return configs.get(boss_type, configs.get('basic', self.get_default_config()))
 
     def get_default_config(self):
         """Default boss configuration"""
@@ -204,7 +203,7 @@ class Boss(pygame.sprite.Sprite):
         self.invulnerable = True
         self.invulnerable_timer = 1.0  # 1 second invulnerability during transition
         self.flash_timer = 1.0
-        print(f"Boss entering phase {new_phase}!")
+        log_event(log, "boss phase", "Boss entering phase %d!", new_phase, phase=new_phase)
     
     def update_visual_effects(self):
         """Update visual effects like flashing"""
@@ -262,12 +261,17 @@ class Boss(pygame.sprite.Sprite):
         pygame.draw.rect(surface, (255, 255, 255), bg_rect, 2)
         
         # Boss name and phase
-        font = pygame.font.Font(None, 24)
+        font = self.asset_manager.get_font('score')
         boss_text = f"{self.boss_type.upper()} - Phase {self.phase}"
         text_surface = font.render(boss_text, True, (255, 255, 255))
         text_rect = text_surface.get_rect(centerx=screen_width // 2, y=y + self.health_bar_height + 5)
         surface.blit(text_surface, text_rect)
     
+    def tag_talker(self, talker):
+        """Mark this boss as standing for a network talker"""
+        self.talker = talker
+        self.talker_label = self.asset_manager.get_font('score').render(talker, True, (255, 120, 120))
+    
     def get_score_value(self):
         """Get the score value for destroying this boss"""
         base_score = 5000
@@ -0,0 +1,272 @@
+"""
+Struct-of-arrays bullet engine.
+
+A BulletField holds one side's bullets (the player's or the enemies') in
+preallocated NumPy arrays instead of one pygame Sprite per bullet:
+- pos, vel: float centers and velocities (pixels, pixels/s)
+- image_ids: index into the field's image table, which also gives the size
+- alive: cleared by kill(); dead slots are compacted away in order
+- rects: left, top, width and height of every live bullet
+Each coordinate is a contiguous row, and every per-frame operation writes
+into preallocated scratch rows, so a frame allocates almost nothing.
+
+Live bullets are packed at the front of the arrays in spawn order, which is
+the order the old sprite groups iterated in. Each frame, integration, the
+rect update and off-screen culling are a few array operations over the live
+slice. Collision against one rect (the player) is a single vectorized AABB
+test. Drawing is one Surface.blits() call.
+
+Rects follow pygame's rules exactly: a bullet's rect is its image size
+centered on the rounded position, and overlap is Rect.colliderect's strict
+test, so gameplay is unchanged.
+
+Frame cost at growing bullet counts:
+    python -m src.bullet_engine
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+import pygame
+
+from src.settings import SCREEN_WIDTH, SCREEN_HEIGHT
+
+
+class BulletField:
+    """Fixed-capacity bullets in parallel arrays; spawn() drops bullets when full."""
+
+    def __init__(self, capacity, bounds=(SCREEN_WIDTH, SCREEN_HEIGHT)):
+        self.capacity = capacity
+        self.bounds = bounds
+        # One contiguous row per coordinate, so every per-frame operation runs unbuffered
+        self.pos = np.zeros((2, capacity), dtype=np.float64)
+        self.vel = np.zeros((2, capacity), dtype=np.float64)
+        self.image_ids = np.zeros(capacity, dtype=np.intp)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.rects = np.zeros((4, capacity), dtype=np.int64)  # Left, top, width, height; refreshed by update()
+        self.half = np.zeros((2, capacity), dtype=np.int64)  # Width // 2, height // 2
+        self.count = 0  # Live bullets occupy [0, count)
+        self.high_water = 0  # Most bullets alive at once
+        self.spawned = 0
+        self.dropped = 0  # Bullets refused because the field was full
+
+        # Scratch space for the per-frame array operations, so a frame allocates no arrays
+        self.step = np.zeros((2, capacity), dtype=np.float64)
+        self.edge = np.zeros(capacity, dtype=np.int64)
+        self.mask = np.zeros(capacity, dtype=bool)
+        self.test = np.zeros(capacity, dtype=bool)
+        float_scratch = np.zeros(capacity, dtype=np.float64)
+        int_scratch = np.zeros(capacity, dtype=np.int64)
+        self.columns = ([(row, float_scratch) for row in (*self.pos, *self.vel)] +
+                        [(row, int_scratch) for row in (*self.rects, *self.half)] +
+                        [(self.image_ids, np.zeros(capacity, dtype=np.intp))])
+
+        self.images = []  # Image id -> Surface
+        self.image_sizes = []  # Image id -> (width, height)
+        self.image_keys = {}  # Key -> image id
+
+    def __len__(self):
+        return self.count
+
+    def image_id(self, key, load, *args):
+        """Id of the image registered as `key`, calling load(*args) for the Surface the first time."""
+        image_id = self.image_keys.get(key)
+        if image_id is None:
+            image = load(*args)
+            image_id = len(self.images)
+            self.images.append(image)
+            self.image_sizes.append(image.get_size())
+            self.image_keys[key] = image_id
+        return image_id
+
+    def spawn(self, center, velocity, image_id):
+        """Add a bullet centered on `center`; returns its slot, or None if the field is full."""
+        index = self.count
+        if index >= self.capacity:
+            self.dropped += 1
+            return None
+        width, height = self.image_sizes[image_id]
+        left = center[0] - width // 2
+        top = center[1] - height // 2
+        self.pos[:, index] = left + width // 2, top + height // 2  # The rect's center, as Sprite.pos was
+        self.vel[:, index] = velocity[0], velocity[1]
+        self.image_ids[index] = image_id
+        self.alive[index] = True
+        self.rects[:, index] = left, top, width, height
+        self.half[:, index] = width // 2, height // 2
+        self.count = index + 1
+        self.spawned += 1
+        if self.count > self.high_water:
+            self.high_water = self.count
+        return index
+
+    def update(self, dt):
+        """Move every bullet, refresh the rects and kill the ones that left the screen."""
+        count = self.count
+        if not count:
+            return
+        step = self.step[:, :count]
+        np.multiply(self.vel[:, :count], dt, out=step)
+        self.pos[:, :count] += step
+
+        # Same rounding as round() (half to even) and the same left = centerx - width // 2 as Rect
+        np.rint(self.pos[:, :count], out=step)
+        topleft = self.rects[:2, :count]
+        np.copyto(topleft, step, casting='unsafe')
+        topleft -= self.half[:, :count]
+
+        width, height = self.bounds
+        left, top, widths, heights = self.rects[:, :count]
+        edge = self.edge[:count]
+        offscreen = self.mask[:count]
+        test = self.test[:count]
+        np.add(left, widths, out=edge)
+        np.less(edge, 0, out=offscreen)
+        np.greater(left, width, out=test)
+        offscreen |= test
+        np.add(top, heights, out=edge)
+        np.less(edge, 0, out=test)
+        offscreen |= test
+        np.greater(top, height, out=test)
+        offscreen |= test
+        if offscreen.any():
+            np.logical_not(offscreen, out=self.alive[:count])
+            self.compact()
+
+    def kill(self, indices):
+        """Remove bullets by slot (as returned by the collision queries)."""
+        if len(indices):
+            self.alive[indices] = False
+            self.compact()
+
+    def clear(self):
+        self.alive[:self.count] = False
+        self.count = 0
+
+    def compact(self):
+        """Move live bullets to the front of the arrays, keeping their order; the freed slots are reused by spawn()."""
+        count = self.count
+        keep = np.flatnonzero(self.alive[:count])
+        live = len(keep)
+        if live == count:
+            return
+        for row, scratch in self.columns:
+            np.take(row[:count], keep, out=scratch[:live], mode='clip')  # Indices are in range; 'clip' skips buffering
+            row[:live] = scratch[:live]
+        self.alive[:live] = True
+        self.alive[live:count] = False
+        self.count = live
+
+    def collide_rect(self, rect):
+        """Slots of the bullets whose rect overlaps `rect` (Rect.colliderect), in spawn order."""
+        count = self.count
+        if not count or not rect.width or not rect.height:
+            return []
+        left, top, widths, heights = self.rects[:, :count]
+        edge = self.edge[:count]
+        overlap = self.mask[:count]
+        test = self.test[:count]
+        np.less(left, rect.right, out=overlap)
+        np.add(left, widths, out=edge)
+        np.greater(edge, rect.left, out=test)
+        overlap &= test
+        np.less(top, rect.bottom, out=test)
+        overlap &= test
+        np.add(top, heights, out=edge)
+        np.greater(edge, rect.top, out=test)
+        overlap &= test
+        if not overlap.any():
+            return []
+        return np.flatnonzero(overlap).tolist()
+
+    def collide_grid(self, grid, dokill=True):
+        """
+        {slot: sprites hit} against a SpatialHash, the same pairs and order as
+        groupcollide(bullets, grid.group, dokill, False) gave for sprite bullets.
+        """
+        count = self.count
+        if not count or not grid.cells:
+            return {}
+        rects = self.rects[:, :count].T
+        candidates = np.flatnonzero(grid.may_hit(rects))  # Only bullets touching an occupied cell
+        crashed = {}
+        for index, (left, top, width, height) in zip(candidates.tolist(), rects[candidates].tolist()):
+            hits = grid.query(pygame.Rect(left, top, width, height))
+            if hits:
+                crashed[index] = hits
+        if dokill and crashed:
+            self.kill(list(crashed))
+        return crashed
+
+    def draw(self, screen):
+        """Blit every live bullet in one call."""
+        count = self.count
+        if not count:
+            return
+        # A lazy (image, (x, y)) stream: zip reuses its tuples as blits consumes them,
+        # so the only per-bullet objects are the coordinates themselves
+        images = map(self.images.__getitem__, self.image_ids[:count].tolist())
+        screen.blits(zip(images, zip(self.rects[0, :count].tolist(), self.rects[1, :count].tolist())), False)
+
+    def get_stats(self):
+        return {
+            'capacity': self.capacity,
+            'live': self.count,
+            'high_water': self.high_water,
+            'spawned': self.spawned,
+            'dropped': self.dropped,
+        }
+
+
+def benchmark(counts=(1000, 2500, 5000, 10000), frames=120):
+    """Per-frame update, player collision and draw cost of a CircularShot-style bullet field."""
+    pygame.display.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    player = pygame.Rect(0, 0, 40, 40)
+    player.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100)
+    image = pygame.Surface((6, 6)).convert()
+    image.fill((255, 100, 100))
+
+    print(f"{'bullets':>8} {'update ms':>10} {'collide ms':>11} {'draw ms':>9} {'total ms':>9}")
+    for count in counts:
+        field = BulletField(count)
+        image_id = field.image_id('enemy_bullet', lambda: image)
+        timings = [0.0, 0.0, 0.0]
+        emitter = 0
+        for _ in range(frames):
+            # Keep the field full: refill from emitters spread over the top half, 16 bullets per volley
+            while len(field) < count:
+                center = ((emitter * 97) % SCREEN_WIDTH, (emitter * 61) % (SCREEN_HEIGHT // 2))
+                for step in range(16):
+                    angle = step * 2 * math.pi / 16
+                    field.spawn(center, (math.cos(angle) * 250, math.sin(angle) * 250), image_id)
+                emitter += 1
+
+            start = time.perf_counter()
+            field.update(1 / 60)
+            middle = time.perf_counter()
+            field.kill(field.collide_rect(player))
+            end = time.perf_counter()
+            field.draw(screen)
+            done = time.perf_counter()
+            timings[0] += middle - start
+            timings[1] += end - middle
+            timings[2] += done - end
+        update, collide, draw = (timing / frames * 1000 for timing in timings)
+        print(f"{count:>8} {update:>10.3f} {collide:>11.3f} {draw:>9.3f} {update + collide + draw:>9.3f}")
+    pygame.display.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bullet engine's frame cost")
+    parser.add_argument('--frames', type=int, default=120, help="frames to average per bullet count")
+    parser.add_argument('counts', type=int, nargs='*', default=[1000, 2500, 5000, 10000],
+                        help="live bullets to keep on screen")
+    args = parser.parse_args()
+    benchmark(args.counts, args.frames)
+
+
+if __name__ == '__main__':
+    main()
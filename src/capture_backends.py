@@ -0,0 +1,263 @@
+"""
+Packet capture backends used by NetworkMonitor.
+
+Every backend's run() waits for packets with CAPTURE_POLL_TIMEOUT and
+re-checks the monitor's stop event in between, so stopping never depends on
+traffic arriving. Socket errors (e.g. the interface going down) propagate as
+OSError so the monitor can reopen the capture.
+
+- ScapyCapture: portable, reads a scapy L2 listen socket and dissects every packet
+- MmapRingCapture: Linux only, reads an AF_PACKET TPACKET_V3 memory-mapped
+  ring and classifies frames in place (no per-packet objects)
+- PcapReplayCapture: replays a pcap/pcapng file (see src/pcap_replay.py)
+"""
+
+import logging
+import mmap
+import os
+import select
+import socket
+import struct
+import sys
+
+from src.pcap_replay import PcapReplayCapture
+from src.log import get_logger, log_event
+from src.settings import (
+    MMAP_RING_BLOCK_SIZE, MMAP_RING_BLOCK_COUNT, MMAP_RING_FRAME_SIZE,
+    MMAP_RING_BLOCK_TIMEOUT, CAPTURE_POLL_TIMEOUT,
+)
+
+log = get_logger('capture')
+
+# <linux/if_packet.h> / <linux/if_ether.h>
+SOL_PACKET = 263
+PACKET_RX_RING = 5
+PACKET_STATISTICS = 6
+PACKET_VERSION = 10
+TPACKET_V3 = 2
+ETH_P_ALL = 0x0003
+
+TP_STATUS_KERNEL = 0
+TP_STATUS_USER = 1
+
+# struct tpacket_block_desc (with tpacket_hdr_v1) field offsets
+BLOCK_STATUS_OFFSET = 8
+BLOCK_NUM_PKTS_OFFSET = 12
+BLOCK_FIRST_PKT_OFFSET = 16
+
+# struct tpacket3_hdr field offsets
+PKT_NEXT_OFFSET = 0
+PKT_SEC_OFFSET = 4
+PKT_NSEC_OFFSET = 8
+PKT_SNAPLEN_OFFSET = 12
+PKT_MAC_OFFSET = 24
+
+
+class ScapyCapture:
+    """
+    Capture through a scapy L2 listen socket, dissecting every packet.
+
+    Unlike sniff(stop_filter=...), which only looks at the stop event when a
+    packet arrives, the socket is polled with a timeout.
+    """
+
+    name = 'scapy'
+
+    def __init__(self, monitor):
+        self.monitor = monitor
+        self.sock = None
+
+    def open(self):
+        # Loading scapy is the bulk of the capture's startup cost; it happens here, on the capture thread
+        from scapy.all import conf
+        
+        bpf_filter = self.monitor.classifier.bpf_filter()
+        try:
+            self.sock = conf.L2listen(iface=self.monitor.interface, filter=bpf_filter or None)
+        except OSError:
+            raise
+        except Exception as e:
+            # Compiling the filter needs libpcap; without it every packet is classified in userspace
+            log_event(log, 'bpf filter', "BPF filter not attached, classifying every packet in userspace: %s", e,
+                      level=logging.WARNING, backend=self.name)
+            self.sock = conf.L2listen(iface=self.monitor.interface)
+
+    def run(self):
+        sock = self.sock
+        select_sockets = type(sock).select
+        process_packet = self.monitor.process_packet
+        stop_event = self.monitor.stop_event
+
+        while not stop_event.is_set():
+            if not select_sockets([sock], CAPTURE_POLL_TIMEOUT):
+                continue
+            packet = sock.recv()
+            if packet is not None:
+                process_packet(packet, float(packet.time))
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+class MmapRingCapture:
+    """Capture from an AF_PACKET TPACKET_V3 ring shared with the kernel."""
+
+    name = 'mmap'
+
+    def __init__(self, monitor, block_size=MMAP_RING_BLOCK_SIZE,
+                 block_count=MMAP_RING_BLOCK_COUNT, frame_size=MMAP_RING_FRAME_SIZE,
+                 block_timeout=MMAP_RING_BLOCK_TIMEOUT):
+        self.monitor = monitor
+        self.block_size = block_size
+        self.block_count = block_count
+        self.frame_size = frame_size
+        self.block_timeout = block_timeout
+        self.sock = None
+        self.ring = None
+        self.words = None
+        self.halves = None
+
+    @staticmethod
+    def is_available():
+        """TPACKET_V3 rings only exist on Linux."""
+        return sys.platform.startswith('linux') and hasattr(socket, 'AF_PACKET')
+
+    def open(self):
+        """Create the socket, negotiate TPACKET_V3 and map the ring."""
+        if not self.is_available():
+            raise OSError("AF_PACKET is not available on this platform")
+
+        self.sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+        try:
+            self.sock.setsockopt(SOL_PACKET, PACKET_VERSION, TPACKET_V3)
+            frame_count = (self.block_size // self.frame_size) * self.block_count
+            req = struct.pack(
+                '=IIIIIII',
+                self.block_size, self.block_count,
+                self.frame_size, frame_count,
+                self.block_timeout,  # retire_blk_tov (ms)
+                0,  # sizeof_priv
+                0,  # feature_req_word
+            )
+            self.sock.setsockopt(SOL_PACKET, PACKET_RX_RING, req)
+            self.ring = mmap.mmap(self.sock.fileno(), self.block_size * self.block_count,
+                                  mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+            if self.monitor.interface:
+                self.sock.bind((self.monitor.interface, ETH_P_ALL))
+        except OSError:
+            self.close()
+            raise
+        self.attach_bpf_filter()
+
+        # Word views so header fields can be read without unpacking tuples
+        self.words = memoryview(self.ring).cast('I')
+        self.halves = memoryview(self.ring).cast('H')
+
+    def attach_bpf_filter(self):
+        """Drop frames no protocol rule matches in the kernel, before they reach the ring."""
+        bpf_filter = self.monitor.classifier.bpf_filter()
+        if not bpf_filter:
+            return
+        try:
+            # Compiling needs libpcap; without it every frame is classified in userspace
+            from scapy.arch.linux import attach_filter
+            attach_filter(self.sock, bpf_filter, self.monitor.interface)
+        except Exception as e:
+            log_event(log, 'bpf filter', "BPF filter not attached, classifying every frame in userspace: %s", e,
+                      level=logging.WARNING, backend=self.name)
+
+    def run(self):
+        """Walk ring blocks as the kernel retires them."""
+        poller = select.poll()
+        poller.register(self.sock.fileno(), select.POLLIN | select.POLLERR)
+        poll_timeout_ms = int(CAPTURE_POLL_TIMEOUT * 1000)
+
+        words = self.words
+        halves = self.halves
+        ring = self.ring
+        process_frame = self.monitor.process_frame
+        stop_event = self.monitor.stop_event
+        block = 0
+
+        while not stop_event.is_set():
+            base = block * self.block_size
+            status_index = (base + BLOCK_STATUS_OFFSET) >> 2
+            if not words[status_index] & TP_STATUS_USER:
+                for _, events in poller.poll(poll_timeout_ms):
+                    if events & select.POLLERR:
+                        self.raise_socket_error()
+                continue
+
+            num_pkts = words[(base + BLOCK_NUM_PKTS_OFFSET) >> 2]
+            pkt = base + words[(base + BLOCK_FIRST_PKT_OFFSET) >> 2]
+            for _ in range(num_pkts):
+                # The kernel's receive time, not when this block happened to be walked
+                timestamp = words[(pkt + PKT_SEC_OFFSET) >> 2] + words[(pkt + PKT_NSEC_OFFSET) >> 2] * 1e-9
+                process_frame(ring, pkt + halves[(pkt + PKT_MAC_OFFSET) >> 1],
+                              words[(pkt + PKT_SNAPLEN_OFFSET) >> 2], timestamp)
+                pkt += words[(pkt + PKT_NEXT_OFFSET) >> 2]
+
+            # Hand the block back to the kernel
+            words[status_index] = TP_STATUS_KERNEL
+            block = (block + 1) % self.block_count
+
+    def raise_socket_error(self):
+        """Surface a pending socket error (e.g. ENETDOWN when the interface goes away)."""
+        error = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if error:
+            raise OSError(error, os.strerror(error))
+
+    def get_kernel_stats(self):
+        """Return (packets, drops) counted by the kernel since the last call."""
+        if self.sock is None:
+            return 0, 0
+        # struct tpacket_stats_v3: tp_packets, tp_drops, tp_freeze_q_cnt
+        raw = self.sock.getsockopt(SOL_PACKET, PACKET_STATISTICS, 12)
+        packets, drops, _ = struct.unpack('=III', raw)
+        return packets, drops
+
+    def close(self):
+        if self.words is not None:
+            self.words.release()
+            self.halves.release()
+            self.words = None
+            self.halves = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+CAPTURE_BACKENDS = {
+    'scapy': ScapyCapture,
+    'mmap': MmapRingCapture,
+    'pcap': PcapReplayCapture,
+}
+
+
+def create_capture_backend(name, monitor):
+    """Factory function to open a capture backend, falling back to scapy"""
+    backend_class = CAPTURE_BACKENDS.get(name, ScapyCapture)
+
+    if backend_class is PcapReplayCapture:
+        # Replaying a file is an explicit choice, there is nothing to fall back to
+        capture = PcapReplayCapture(monitor, monitor.pcap_path, monitor.replay_speed)
+        capture.open()
+        return capture
+
+    if backend_class is not ScapyCapture:
+        capture = backend_class(monitor)
+        try:
+            capture.open()
+            return capture
+        except OSError as e:
+            log_event(log, 'backend fallback', "%s capture unavailable (%s), falling back to scapy", name, e,
+                      level=logging.WARNING, backend=name)
+
+    capture = ScapyCapture(monitor)
+    capture.open()
+    return capture
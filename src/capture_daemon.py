@@ -0,0 +1,167 @@
+"""
+One capture shared by many game sessions on the same machine.
+
+The daemon runs a supervised capture worker (src/capture_worker.py) whose
+shared counter block has a fixed name instead of an anonymous one:
+    python -m src.capture_daemon [--interface eth0] [--backend mmap]
+
+Sessions started with NETWORK_CAPTURE_MODE = 'daemon' attach to that block
+through a CaptureSubscriber instead of sniffing. The worker classifies
+every packet once, whatever the number of sessions. Every slot has a single
+writer and the counters only grow, so subscribers never write to the block
+or coordinate with each other. Each one keeps its own baselines and spawn
+controller, so a session costs one mapping plus a few dozen word reads per
+frame.
+
+Subscribers tolerate the daemon starting after them or restarting: they
+retry every CAPTURE_DAEMON_RETRY_INTERVAL while the block is missing, and
+reattach when its heartbeat is older than CAPTURE_DAEMON_STALE_AFTER.
+"""
+
+import argparse
+import signal
+import threading
+import time
+
+from src.capture_worker import (
+    CaptureWorkerClient, SharedCounterReader, attach_shared_memory,
+    HEARTBEAT_SLOT, TOTAL_SLOTS, WORD_SIZE,
+)
+from src.log import configure_logging, shutdown_logging, get_logger
+from src.settings import (
+    NETWORK_CAPTURE_BACKEND, NETWORK_REPLAY_PCAP, NETWORK_REPLAY_SPEED,
+    CAPTURE_DAEMON_NAME, CAPTURE_DAEMON_STALE_AFTER, CAPTURE_DAEMON_RETRY_INTERVAL,
+)
+
+log = get_logger('capture_daemon')
+
+REPORT_INTERVAL = 10.0  # Seconds between the daemon's status lines
+
+
+def daemon_block_name(name=CAPTURE_DAEMON_NAME, interface=None):
+    """Shared memory name of the daemon capturing `interface` (None = automatic choice)."""
+    return name if interface is None else f"{name}-{interface}"
+
+
+class CaptureSubscriber(SharedCounterReader):
+    """
+    Game-side subscription to a running capture daemon.
+
+    Same interface as NetworkMonitor (start, stop, poll_spawns, get_stats,
+    get_metrics). Nothing runs in the background: attaching and the
+    heartbeat check happen on the game thread, at most once per
+    CAPTURE_DAEMON_RETRY_INTERVAL.
+    """
+
+    def __init__(self, interface=None, spawn_controller=None, name=CAPTURE_DAEMON_NAME):
+        super().__init__(spawn_controller)
+        self.interface = interface
+        self.name = daemon_block_name(name, interface)
+        self.stop_event = threading.Event()  # Only set by stop(); kept for callers that signal readers first
+        self.shm = None
+        self.next_check = 0.0
+        self.connects = 0
+
+    def start(self):
+        self.spawn_controller.start(time.time())
+        if not self.connect():
+            log.info("Waiting for capture daemon %s (python -m src.capture_daemon)", self.name)
+        self.next_check = time.monotonic() + CAPTURE_DAEMON_RETRY_INTERVAL
+
+    def connect(self):
+        """Attach to the daemon's block if it exists and is alive; new sessions start from its current counts."""
+        try:
+            shm = attach_shared_memory(self.name)
+        except FileNotFoundError:
+            return False
+        if shm.size < TOTAL_SLOTS * WORD_SIZE:
+            shm.close()
+            log.warning("Capture daemon block %s is too small, its protocol rules differ from this game's", self.name)
+            return False
+
+        counters = shm.buf.cast('Q')
+        if (time.time_ns() - counters[HEARTBEAT_SLOT]) / 1e9 >= CAPTURE_DAEMON_STALE_AFTER:
+            counters.release()
+            shm.close()
+            return False
+
+        self.shm = shm
+        self.counters = counters
+        self.sync_baselines()
+        self.connects += 1
+        log.info("Subscribed to capture daemon %s", self.name)
+        return True
+
+    def disconnect(self):
+        if self.shm is not None:
+            self.counters.release()
+            self.counters = None
+            self.shm.close()  # The daemon owns the block; never unlink it here
+            self.shm = None
+
+    def check_connection(self):
+        """Attach if not attached, reattach if the daemon's heartbeat went stale."""
+        now = time.monotonic()
+        if now < self.next_check or self.stop_event.is_set():
+            return
+        self.next_check = now + CAPTURE_DAEMON_RETRY_INTERVAL
+        if self.counters is not None:
+            if (time.time_ns() - self.counters[HEARTBEAT_SLOT]) / 1e9 < CAPTURE_DAEMON_STALE_AFTER:
+                return
+            log.warning("Capture daemon %s stopped publishing, reconnecting", self.name)
+            self.disconnect()
+        self.connect()
+
+    def poll_spawns(self, now=None):
+        self.check_connection()
+        return super().poll_spawns(now)
+
+    def read_records(self):
+        self.check_connection()
+        return super().read_records()
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats['daemon_connected'] = self.counters is not None
+        stats['daemon_connects'] = self.connects
+        return stats
+
+    def stop(self, timeout=None):
+        """Detach from the daemon, which keeps running for other sessions."""
+        self.stop_event.set()
+        self.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture once and publish spawn counters to every local game session")
+    parser.add_argument('--interface', help="interface to capture (default: automatic choice)")
+    parser.add_argument('--backend', default=NETWORK_CAPTURE_BACKEND, help="capture backend: scapy, mmap or pcap")
+    parser.add_argument('--pcap', default=NETWORK_REPLAY_PCAP, help="capture file for the pcap backend")
+    parser.add_argument('--speed', type=float, default=NETWORK_REPLAY_SPEED, help="replay speed for the pcap backend")
+    parser.add_argument('--name', default=CAPTURE_DAEMON_NAME, help="shared memory name sessions subscribe to")
+    args = parser.parse_args()
+    configure_logging()
+
+    stopping = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda signum, frame: stopping.set())
+
+    client = CaptureWorkerClient(
+        interface=args.interface, backend=args.backend,
+        pcap_path=args.pcap, replay_speed=args.speed,
+        shm_name=daemon_block_name(args.name, args.interface),
+    )
+    client.start()
+    print(f"📡 Publishing to sessions as '{client.shm.name}'")
+    try:
+        while not stopping.wait(REPORT_INTERVAL):
+            stats = client.get_stats()
+            print(f"📡 {stats['packets_seen']} packets seen, {stats['kernel_drops']} kernel drops, "
+                  f"worker CPU {stats['worker_cpu_percent']:.0f}%, restarts {stats['worker_restarts']}")
+    finally:
+        client.stop()
+        shutdown_logging()
+
+
+if __name__ == '__main__':
+    main()
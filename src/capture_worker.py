@@ -0,0 +1,520 @@
+"""
+Out-of-process packet capture.
+
+The capture and classification run in a separate `multiprocessing` worker so
+they never compete with the game loop for the GIL. The worker publishes
+monotonically increasing per-protocol packet counters and spawn key (packet
+type / flow event) counters into a `multiprocessing.shared_memory` block. Each slot is a 64-bit word written by
+the worker only, so the game reads them once per frame without locks or
+pickling and feeds the deltas to its spawn controller. The periodically
+published totals (packet counters, kernel counters) sit behind a sequence
+counter that is odd while the worker writes them, so get_metrics() can
+retry instead of reading a torn snapshot. Since the worker is the only
+writer, any number of readers can follow one block (SharedCounterReader);
+the capture daemon relies on this to serve several sessions.
+
+Shared memory layout (native uint64 words):
+    [0] heartbeat (wall clock, ns)    [1] worker CPU time (ns)
+    [2] kernel packets                [3] kernel drops
+    [4] worker pid                    [5] stop flag (set by the game)
+    [6] distinct sources estimate
+    [7] heavy hitter report sequence  [8] heavy hitter packets
+    [9] heavy hitter share (ppm)      [10..15] heavy hitter address (UTF-8, NUL padded)
+    [16] publish sequence             [17] packets seen
+    [18] heavy hitter time (ns)       [19] capture restarts
+    [20] capture downtime (ms)
+    then one packet counter per packet type,
+    then one event counter per spawn key,
+    then one last event time (ns) per spawn key
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+from src.network_monitor import (
+    NetworkMonitor, build_spawn_list, build_heavy_hitter_spawn, SPAWN_KEY_TO_ENEMY_MAP, PROTOCOL_CLASSIFIER,
+)
+from src.packet_classifier import format_address
+from src.spawn_controller import SpawnController
+from src.metrics import CaptureMetrics
+from src.log import configure_logging, shutdown_logging, get_logger, log_event
+from src.settings import (
+    NETWORK_CAPTURE_BACKEND,
+    NETWORK_REPLAY_PCAP, NETWORK_REPLAY_SPEED,
+    CAPTURE_WORKER_STATS_INTERVAL, CAPTURE_WORKER_RESTART_DELAY, CAPTURE_WORKER_MAX_RESTART_DELAY,
+    CAPTURE_STOP_TIMEOUT, CAPTURE_DAEMON_STALE_AFTER,
+)
+
+HEARTBEAT_SLOT = 0
+CPU_TIME_SLOT = 1
+KERNEL_PACKETS_SLOT = 2
+KERNEL_DROPS_SLOT = 3
+PID_SLOT = 4
+STOP_SLOT = 5
+DISTINCT_SOURCES_SLOT = 6
+HEAVY_HITTER_SEQ_SLOT = 7
+HEAVY_HITTER_PACKETS_SLOT = 8
+HEAVY_HITTER_SHARE_SLOT = 9
+HEAVY_HITTER_ADDRESS_SLOT = 10
+HEAVY_HITTER_ADDRESS_WORDS = 6  # Room for the longest IPv6 text form
+PUBLISH_SEQ_SLOT = 16
+PACKETS_SEEN_SLOT = 17
+HEAVY_HITTER_TIME_SLOT = 18
+CAPTURE_RESTARTS_SLOT = 19
+CAPTURE_DOWNTIME_SLOT = 20
+HEADER_SLOTS = 22
+
+PACKET_TYPES = PROTOCOL_CLASSIFIER.packet_types
+PACKET_TYPE_SLOTS = {packet_type: HEADER_SLOTS + i for i, packet_type in enumerate(PACKET_TYPES)}
+SPAWN_KEYS = list(SPAWN_KEY_TO_ENEMY_MAP.keys())
+SPAWN_KEY_SLOTS = {key: HEADER_SLOTS + len(PACKET_TYPES) + i for i, key in enumerate(SPAWN_KEYS)}
+SPAWN_TIME_SLOTS = {key: HEADER_SLOTS + len(PACKET_TYPES) + len(SPAWN_KEYS) + i for i, key in enumerate(SPAWN_KEYS)}
+TOTAL_SLOTS = HEADER_SLOTS + len(PACKET_TYPES) + 2 * len(SPAWN_KEYS)
+SNAPSHOT_RETRIES = 8
+WORD_SIZE = 8
+
+log = get_logger('capture_worker')
+
+
+class SharedStopFlag:
+    """
+    Stop signal living in the shared memory block, with the Event methods the capture backends use.
+    
+    A multiprocessing.Event would deadlock set() if the worker was killed while waiting on it.
+    """
+
+    def __init__(self, counters, poll_interval=0.05):
+        self.counters = counters
+        self.poll_interval = poll_interval
+
+    def is_set(self):
+        return self.counters[STOP_SLOT] != 0
+
+    def set(self):
+        self.counters[STOP_SLOT] = 1
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.is_set():
+            remaining = self.poll_interval if deadline is None else deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.poll_interval, remaining))
+        return True
+
+
+class SharedCounterMonitor(NetworkMonitor):
+    """NetworkMonitor that publishes spawn key counters to shared memory instead of a spawn feed."""
+
+    def __init__(self, counters, stop_event, **kwargs):
+        super().__init__(**kwargs)
+        self.counters = counters
+        self.stop_event = stop_event  # SharedStopFlag set by the game process
+
+    def emit(self, key, timestamp):
+        """Record the event time, then bump the shared counter for this spawn key."""
+        self.counters[SPAWN_TIME_SLOTS[key]] = int(timestamp * 1e9)
+        self.counters[SPAWN_KEY_SLOTS[key]] += 1
+    
+    def report_heavy_hitter(self, address, share, packets, timestamp):
+        """Publish the report fields, then bump the sequence so the game picks it up."""
+        counters = self.counters
+        text = format_address(address).encode()[:HEAVY_HITTER_ADDRESS_WORDS * WORD_SIZE]
+        text = text.ljust(HEAVY_HITTER_ADDRESS_WORDS * WORD_SIZE, b'\0')
+        for i in range(HEAVY_HITTER_ADDRESS_WORDS):
+            counters[HEAVY_HITTER_ADDRESS_SLOT + i] = int.from_bytes(text[i * WORD_SIZE:(i + 1) * WORD_SIZE], 'little')
+        counters[HEAVY_HITTER_PACKETS_SLOT] = packets
+        counters[HEAVY_HITTER_SHARE_SLOT] = int(share * 1_000_000)
+        counters[HEAVY_HITTER_TIME_SLOT] = int(timestamp * 1e9)
+        counters[HEAVY_HITTER_SEQ_SLOT] += 1
+
+
+def publish_monitor_counters(monitor, counters):
+    """Copy the monitor's packet, kernel and distinct source counters into shared memory."""
+    counters[HEARTBEAT_SLOT] = time.time_ns()
+    counters[CPU_TIME_SLOT] = time.process_time_ns()
+    packets = monitor.packet_count.copy()
+    metrics = monitor.metrics
+
+    counters[PUBLISH_SEQ_SLOT] += 1  # Odd: totals are being written
+    for packet_type, count in packets.items():
+        counters[PACKET_TYPE_SLOTS[packet_type]] = count
+    counters[PACKETS_SEEN_SLOT] = metrics.packets_seen
+    counters[KERNEL_PACKETS_SLOT] = metrics.kernel_packets
+    counters[KERNEL_DROPS_SLOT] = metrics.kernel_drops
+    counters[CAPTURE_RESTARTS_SLOT] = monitor.restart_count
+    counters[CAPTURE_DOWNTIME_SLOT] = int(monitor.downtime * 1000)
+    counters[PUBLISH_SEQ_SLOT] += 1
+    counters[DISTINCT_SOURCES_SLOT] = int(monitor.get_distinct_sources())
+
+
+def publish_worker_stats(monitor, counters, stop_event):
+    """Worker-side ticker: heartbeat, CPU time, packet, distinct source and kernel drop counters."""
+    while not stop_event.wait(CAPTURE_WORKER_STATS_INTERVAL):
+        monitor.poll_kernel_stats()
+        publish_monitor_counters(monitor, counters)
+
+
+def run_capture_worker(shm_name, interface, backend, pcap_path, replay_speed):
+    """Entry point of the capture worker process."""
+    # Ctrl+C reaches the whole process group; the parent stops the worker through STOP_SLOT
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    configure_logging()  # Spawned processes start without the parent's logging setup
+    shm = shared_memory.SharedMemory(name=shm_name)
+    counters = shm.buf.cast('Q')
+    stop_event = SharedStopFlag(counters)
+    counters[PID_SLOT] = os.getpid()
+    counters[HEARTBEAT_SLOT] = time.time_ns()
+
+    monitor = SharedCounterMonitor(
+        counters, stop_event,
+        interface=interface, backend=backend,
+        pcap_path=pcap_path, replay_speed=replay_speed,
+    )
+    # Carry totals over from a previous (crashed) worker so they stay monotonic
+    for packet_type in PACKET_TYPES:
+        monitor.packet_count[packet_type] = counters[PACKET_TYPE_SLOTS[packet_type]]
+    monitor.metrics.packets_seen = counters[PACKETS_SEEN_SLOT]
+    monitor.metrics.add_kernel_stats(counters[KERNEL_PACKETS_SLOT], counters[KERNEL_DROPS_SLOT])
+    monitor.restart_count = counters[CAPTURE_RESTARTS_SLOT]
+    monitor.downtime = counters[CAPTURE_DOWNTIME_SLOT] / 1000
+
+    # The ticker gets its own event: it must be joined before the final publish and before the block goes away
+    ticker_stop = threading.Event()
+    ticker = threading.Thread(target=publish_worker_stats, args=(monitor, counters, ticker_stop), daemon=True)
+    ticker.start()
+
+    try:
+        monitor.run()
+    finally:
+        ticker_stop.set()
+        ticker.join()
+        publish_monitor_counters(monitor, counters)
+        counters.release()
+        shm.close()
+        shutdown_logging()
+
+    # A non-zero exit code tells the supervisor the capture died and should be restarted
+    sys.exit(1 if monitor.error else 0)
+
+
+def create_shared_memory(name, size):
+    """
+    Create a shared counter block, anonymous when `name` is None.
+    
+    A block left under `name` by a capture that died without unlinking it
+    (no heartbeat for CAPTURE_DAEMON_STALE_AFTER seconds) is replaced; a
+    live one raises FileExistsError.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, create=True, size=size)
+    except FileExistsError:
+        existing = attach_shared_memory(name)
+        counters = existing.buf.cast('Q')
+        heartbeat_age = (time.time_ns() - counters[HEARTBEAT_SLOT]) / 1e9 if existing.size >= size else float('inf')
+        counters.release()
+        existing.close()
+        if heartbeat_age < CAPTURE_DAEMON_STALE_AFTER:
+            raise
+        stale = shared_memory.SharedMemory(name=name)
+        stale.close()
+        stale.unlink()
+        log_event(log, 'stale shm', "Replaced stale shared memory block %s", name, level=logging.WARNING, block=name)
+        return shared_memory.SharedMemory(name=name, create=True, size=size)
+
+
+def attach_shared_memory(name):
+    """
+    Attach to an existing shared memory block without taking ownership of it.
+    
+    Attaching registers the block with this process's resource tracker,
+    which would unlink it when this process exits, out from under the
+    process that created it.
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+class SharedCounterReader:
+    """
+    Reads a capture worker's shared counters on the game side.
+    
+    Every slot is written by the worker alone and only ever grows (apart from
+    the seqlocked totals), so any number of readers can follow the same block;
+    each keeps its own baselines and spawn controller. Exposes the interface
+    the game uses on NetworkMonitor apart from start/stop, which subclasses
+    provide. Spawn timestamps are the worker's last event time per spawn key,
+    so the latency histogram measures from the newest packet behind each batch.
+    """
+
+    def __init__(self, spawn_controller=None):
+        self.spawn_controller = spawn_controller or SpawnController()
+        self.counters = None
+        self.capture_clock = False  # Event times are capture timestamps (unpaced replay), not wall clock
+
+        # Values seen at the last poll, to turn monotonic counters into deltas
+        self.last_events = {key: 0 for key in SPAWN_KEYS}
+        self.last_heavy_hitter_seq = 0
+        self.last_cpu_sample = (0, time.time_ns())
+        self.cpu_percent = 0.0
+        self.metrics = CaptureMetrics()  # Only the latency histogram is game-side
+
+    def sync_baselines(self):
+        """Start counting from the block's current values, skipping what was published before."""
+        counters = self.counters
+        self.last_events = {key: counters[SPAWN_KEY_SLOTS[key]] for key in SPAWN_KEYS}
+        self.last_heavy_hitter_seq = counters[HEAVY_HITTER_SEQ_SLOT]
+
+    def poll_spawns(self, now=None):
+        """Read shared counters once per frame and feed the deltas to the spawn controller."""
+        if self.counters is None:
+            return []
+
+        counts = {key: count for timestamp, key, count in self.read_records()}
+        due = self.spawn_controller.poll(counts, time.time() if now is None else now)
+        timestamps = {key: self.counters[SPAWN_TIME_SLOTS[key]] / 1e9 for key in due}
+        spawns = build_spawn_list(due, counts, timestamps)
+        
+        for report in self.drain_heavy_hitters():
+            spawns.append(build_heavy_hitter_spawn(*report))
+        return spawns
+    
+    def read_records(self):
+        """
+        Spawn key deltas since the last read as (timestamp, spawn key, count) records.
+        
+        The worker only publishes counters, so each key changed since the
+        last read becomes one record stamped with its newest event time.
+        """
+        if self.counters is None:
+            return []
+        counters = self.counters
+        records = []
+        for key in SPAWN_KEYS:
+            events = counters[SPAWN_KEY_SLOTS[key]]
+            if events != self.last_events[key]:
+                records.append((counters[SPAWN_TIME_SLOTS[key]] / 1e9, key, events - self.last_events[key]))
+                self.last_events[key] = events
+        records.sort()
+        return records
+    
+    def drain_heavy_hitters(self):
+        """Take the newest heavy hitter report, if the worker published one since the last call."""
+        if self.counters is None:
+            return []
+        report = self.read_heavy_hitter()
+        return [] if report is None else [report]
+    
+    def read_heavy_hitter(self):
+        """Return (talker, share, packets, timestamp) if the worker published a new report, else None."""
+        counters = self.counters
+        seq = counters[HEAVY_HITTER_SEQ_SLOT]
+        if seq == self.last_heavy_hitter_seq:
+            return None
+        text = b''.join(counters[HEAVY_HITTER_ADDRESS_SLOT + i].to_bytes(WORD_SIZE, 'little')
+                        for i in range(HEAVY_HITTER_ADDRESS_WORDS))
+        packets = counters[HEAVY_HITTER_PACKETS_SLOT]
+        share = counters[HEAVY_HITTER_SHARE_SLOT] / 1_000_000
+        timestamp = counters[HEAVY_HITTER_TIME_SLOT] / 1e9
+        if counters[HEAVY_HITTER_SEQ_SLOT] != seq:
+            return None  # Overwritten while reading; the newer report is picked up next frame
+        self.last_heavy_hitter_seq = seq
+        return text.rstrip(b'\0').decode(errors='replace'), share, packets, timestamp
+    
+    def get_distinct_sources(self):
+        """Distinct source estimate last published by the worker."""
+        if self.counters is None:
+            return 0
+        return self.counters[DISTINCT_SOURCES_SLOT]
+
+    def record_spawn_latency(self, seconds):
+        """Account the delay between a packet and the enemy it spawned."""
+        if self.capture_clock:
+            return  # Not comparable with the wall clock
+        self.metrics.record_spawn_latency(seconds)
+    
+    def read_published_totals(self):
+        """
+        Read the published totals under the publish sequence.
+        
+        Returns (packet counters, packets seen, kernel packets, kernel drops,
+        capture restarts, capture downtime in seconds).
+        
+        Retries while the worker is mid-publish; after SNAPSHOT_RETRIES the
+        last read is returned, at most one publish interval out of step.
+        """
+        counters = self.counters
+        for _ in range(SNAPSHOT_RETRIES):
+            seq = counters[PUBLISH_SEQ_SLOT]
+            packets = {packet_type: counters[PACKET_TYPE_SLOTS[packet_type]] for packet_type in PACKET_TYPES}
+            totals = (packets, counters[PACKETS_SEEN_SLOT], counters[KERNEL_PACKETS_SLOT], counters[KERNEL_DROPS_SLOT],
+                      counters[CAPTURE_RESTARTS_SLOT], counters[CAPTURE_DOWNTIME_SLOT] / 1000)
+            if not seq & 1 and counters[PUBLISH_SEQ_SLOT] == seq:
+                break
+        return totals
+    
+    def get_metrics(self):
+        """Snapshot of the capture pipeline metrics, NetworkMonitor.get_metrics() without the spawn feed's high-water mark."""
+        if self.counters is None:
+            packets, packets_seen, kernel_packets, kernel_drops, restarts, downtime = (
+                dict.fromkeys(PACKET_TYPES, 0), 0, 0, 0, 0, 0.0)
+        else:
+            packets, packets_seen, kernel_packets, kernel_drops, restarts, downtime = self.read_published_totals()
+        return {
+            'packets_seen': packets_seen,
+            'packets_classified': packets,
+            'packets_unclassified': max(0, packets_seen - sum(packets.values())),
+            'kernel_packets': kernel_packets,
+            'kernel_drops': kernel_drops,
+            'spawns_suppressed': self.spawn_controller.get_suppressed(),
+            'pps': self.spawn_controller.get_rates(),
+            'spawn_latency_ms': self.metrics.latency_snapshot(),
+            'capture_restarts': restarts,
+            'capture_downtime': downtime,
+        }
+    
+    def get_stats(self):
+        """Get packet capture statistics, including the worker's published health counters."""
+        if self.counters is None:
+            return {packet_type: 0 for packet_type in PACKET_TYPES}
+
+        counters = self.counters
+        stats, packets_seen, kernel_packets, kernel_drops, restarts, downtime = self.read_published_totals()
+        stats['packets_seen'] = packets_seen
+
+        # CPU usage of the worker since the previous call
+        cpu_ns = counters[CPU_TIME_SLOT]
+        wall_ns = time.time_ns()
+        last_cpu_ns, last_wall_ns = self.last_cpu_sample
+        if wall_ns > last_wall_ns and cpu_ns >= last_cpu_ns:
+            self.cpu_percent = 100.0 * (cpu_ns - last_cpu_ns) / (wall_ns - last_wall_ns)
+        self.last_cpu_sample = (cpu_ns, wall_ns)
+
+        stats['worker_pid'] = counters[PID_SLOT]
+        stats['capture_restarts'] = restarts
+        stats['capture_downtime'] = downtime
+        stats['worker_cpu_percent'] = self.cpu_percent
+        stats['worker_heartbeat_age'] = max(0.0, (wall_ns - counters[HEARTBEAT_SLOT]) / 1e9)
+        stats['kernel_packets'] = kernel_packets
+        stats['kernel_drops'] = kernel_drops
+        stats['distinct_sources'] = counters[DISTINCT_SOURCES_SLOT]
+        stats['pps'] = self.spawn_controller.get_rates()
+        stats['spawns_suppressed'] = sum(self.spawn_controller.get_suppressed().values())
+        return stats
+
+
+
+class CaptureWorkerClient(SharedCounterReader):
+    """
+    Game-side handle for a supervised capture worker process.
+
+    Exposes the same interface the game uses on NetworkMonitor (start, stop,
+    poll_spawns, get_stats, get_metrics) but reads everything from shared memory.
+    With `shm_name`, the block gets that fixed name so other processes can
+    subscribe to it (see src/capture_daemon.py); by default it is anonymous.
+    """
+
+    def __init__(self, interface=None, spawn_controller=None, backend=NETWORK_CAPTURE_BACKEND,
+                 pcap_path=NETWORK_REPLAY_PCAP, replay_speed=NETWORK_REPLAY_SPEED, shm_name=None):
+        super().__init__(spawn_controller)
+        self.interface = interface
+        self.backend = backend
+        self.pcap_path = pcap_path
+        self.replay_speed = replay_speed
+        self.capture_clock = backend == 'pcap' and not replay_speed
+        self.shm_name = shm_name
+
+        # Spawn keeps child processes independent of pygame/SDL state in the game process
+        self.context = multiprocessing.get_context('spawn')
+        self.stop_event = threading.Event()  # Stops the supervisor; the worker watches STOP_SLOT
+        self.shm = None
+        self.process = None
+        self.supervisor = None
+
+        # Supervisor bookkeeping
+        self.restart_count = 0
+        self.restart_delay = CAPTURE_WORKER_RESTART_DELAY
+        self.started_at = None  # Monotonic time the current worker was launched
+
+    def start(self):
+        """Create the shared memory block, launch the worker and its supervisor."""
+        self.shm = create_shared_memory(self.shm_name, TOTAL_SLOTS * WORD_SIZE)
+        self.counters = self.shm.buf.cast('Q')
+        for slot in range(TOTAL_SLOTS):
+            self.counters[slot] = 0
+
+        self.spawn_controller.start(time.time())
+        self.spawn_worker()
+        self.supervisor = threading.Thread(target=self.supervise, daemon=True)
+        self.supervisor.start()
+        log_event(log, 'worker start', "Capture worker started (pid %d, backend: %s)", self.process.pid, self.backend,
+                  pid=self.process.pid, backend=self.backend)
+
+    def spawn_worker(self):
+        self.process = self.context.Process(
+            target=run_capture_worker,
+            args=(self.shm.name, self.interface, self.backend,
+                  self.pcap_path, self.replay_speed),
+            daemon=True,
+        )
+        self.process.start()
+        self.started_at = time.monotonic()
+
+    def supervise(self):
+        """
+        Restart the worker with exponential backoff whenever it crashes.
+
+        A worker that stayed up for the longest backoff was healthy, so its
+        crash starts the backoff over from the shortest delay.
+        """
+        while not self.stop_event.wait(CAPTURE_WORKER_STATS_INTERVAL):
+            if self.process.is_alive():
+                continue
+            if self.process.exitcode == 0:
+                break  # Capture finished on its own (e.g. end of a replay)
+
+            if time.monotonic() - self.started_at >= CAPTURE_WORKER_MAX_RESTART_DELAY:
+                self.restart_delay = CAPTURE_WORKER_RESTART_DELAY
+            log_event(log, 'worker exit', "Capture worker exited with code %s, restarting in %.1fs",
+                      self.process.exitcode, self.restart_delay, level=logging.ERROR,
+                      exitcode=self.process.exitcode, restart_delay=self.restart_delay)
+            if self.stop_event.wait(self.restart_delay):
+                break
+            self.restart_count += 1
+            self.restart_delay = min(self.restart_delay * 2, CAPTURE_WORKER_MAX_RESTART_DELAY)
+            self.spawn_worker()
+
+    def get_stats(self):
+        """Get packet capture statistics, including worker health."""
+        stats = super().get_stats()
+        if self.counters is not None:
+            stats['worker_alive'] = self.process is not None and self.process.is_alive()
+            stats['worker_restarts'] = self.restart_count
+        return stats
+
+    def stop(self, timeout=CAPTURE_STOP_TIMEOUT):
+        """Stop the worker (terminating it after `timeout` seconds) and release the shared memory block."""
+        self.stop_event.set()
+        if self.counters is not None:
+            self.counters[STOP_SLOT] = 1
+        if self.process is not None:
+            self.process.join(timeout=timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout=1.0)
+        if self.supervisor is not None:
+            self.supervisor.join(timeout=1.0)
+        if self.shm is not None:
+            self.counters.release()
+            self.counters = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+        log_event(log, 'worker stop', "Capture worker stopped")
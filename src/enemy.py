@@ -1,15 +1,15 @@
 import pygame
-import json
 import os
 from src.movement_patterns import create_movement_pattern
 from src.attack_patterns import create_attack_pattern
+from src.settings import ELITE_HEALTH_MULTIPLIER, ELITE_SCORE_MULTIPLIER
 
 class Enemy(pygame.sprite.Sprite):
-    def __init__(self, pos, enemy_type, asset_manager, player, groups):
+    def __init__(self, pos, enemy_type, asset_manager, player, groups, bullets=None, movement=None):
         super().__init__(groups)
         
         # Load enemy configuration
-        self.config = self.load_enemy_config(enemy_type)
+        self.config = self.load_enemy_config(enemy_type, asset_manager)
         
         # Core attributes from config
         self.health = self.config['health']
@@ -32,30 +32,31 @@ class Enemy(pygame.sprite.Sprite):
         self.player = player
         self.asset_manager = asset_manager
         
-        # Get sprite groups for attack patterns
+        # Sprite group and enemy BulletField for attack patterns
         all_sprites = groups[0] if groups else None
-        # enemy_bullet_group을 groups 리스트에서 직접 가져옵니다.
-        enemy_bullet_group = groups[2] if len(groups) > 2 else pygame.sprite.Group()
         
-        # Behavior components
-        self.movement = create_movement_pattern(self.config['movement'])
-        self.attack = create_attack_pattern(self.config['attack'], all_sprites, enemy_bullet_group)
         # Internal state
         self.age = 0.0
+
+        # Behavior components; a MovementSystem moves batchable patterns itself
+        if movement is not None:
+            self.movement = movement.add(self, self.config['movement'])
+        else:
+            self.movement = create_movement_pattern(self.config['movement'])
+        self.attack = create_attack_pattern(self.config['attack'], all_sprites, bullets)
+        self.talker = None  # Network address this elite enemy stands for
+        self.talker_label = None  # Rendered talker address, drawn above the enemy
         
         # Visual effects for blinking
         self.flash_timer = 0.0
         self.flash_duration = 0.1  # Blink for 0.1 seconds
         
-    def load_enemy_config(self, enemy_type):
-        """Load enemy configuration from JSON file"""
-        config_path = os.path.join('data', 'enemy_config.json')
-        try:
-            with open(config_path, 'r') as f:
-                configs = json.load(f)
-                return configs.get(enemy_type, configs.get('scout', self.get_default_config()))
-        except (FileNotFoundError, json.JSONDecodeError):
+    def load_enemy_config(self, enemy_type, asset_manager):
+        """Look up the enemy configuration in data/enemy_config.json (parsed once by the asset manager)"""
+        configs = asset_manager.get_config(os.path.join('data', 'enemy_config.json'))
+        if configs is None:
             return self.get_default_config()
+        return configs.get(enemy_type, configs.get('scout', self.get_default_config()))
             
     def get_default_config(self):
         """Default enemy configuration"""
@@ -99,6 +100,23 @@ class Enemy(pygame.sprite.Sprite):
         if not self.rect.colliderect(expanded_rect):
             self.kill()
             
+    def make_elite(self, talker):
+        """Promote to an elite enemy representing a heavy hitter talker."""
+        self.talker = talker
+        self.talker_label = self.asset_manager.get_font('score').render(talker, True, (255, 120, 120))
+        self.health = int(self.health * ELITE_HEALTH_MULTIPLIER)
+        self.max_health = self.health
+        
+        # Red tint marks elites
+        self.original_image = self.original_image.copy()
+        self.original_image.fill((255, 60, 60), special_flags=pygame.BLEND_RGB_MULT)
+        self.image = self.original_image
+        
+    def kill(self):
+        """Remove from all groups and give up the movement batch slot"""
+        super().kill()
+        self.movement.release()
+
     def take_damage(self, damage=10):
         """Take damage and return True if enemy is destroyed"""
         self.health -= damage
@@ -117,6 +135,10 @@ class Enemy(pygame.sprite.Sprite):
             'gunship': 150,
             'interceptor': 120,
             'bomber': 200,
+            'raider': 110,
             'basic': 75
         }
-        return score_values.get(self.enemy_type, 50)
\ No newline at end of file
+        score = score_values.get(self.enemy_type, 50)
+        if self.talker is not None:
+            score *= ELITE_SCORE_MULTIPLIER
+        return score
\ No newline at end of file
@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from src.settings import FLOW_TABLE_CAPACITY, FLOW_IDLE_TIMEOUT, FLOW_VOLUME_STEP
+
+# Per-flow entry fields (a plain list keeps entries small and mutable in place)
+LAST_SEEN = 0
+BYTES = 1
+NEXT_VOLUME_MARK = 2
+CLOSED = 3
+EVENT_KEYS = 4
+
+FLOW_EVENTS = ('flow_start', 'flow_volume', 'flow_end')
+
+
+def flow_event_key(packet_type, event):
+    """Spawn key of a flow event for one packet type, e.g. 'https:flow_start'."""
+    return f"{packet_type}:{event}"
+
+
+class FlowTable:
+    """
+    Bounded connection table keyed on the 5-tuple.
+
+    Entries live in an OrderedDict kept in least-recently-seen order, so lookup,
+    insert, LRU eviction and idle expiry are all O(1) per packet and memory never
+    grows past `capacity` flows, no matter how many short flows the link carries.
+
+    Flow lifecycle events are reported through `on_event(key, timestamp)`,
+    keyed with the flow's packet type (see flow_event_key), e.g. 'https:flow_start':
+    - 'flow_start'  -> first packet of a new flow
+    - 'flow_volume' -> flow crossed another `volume_step` bytes
+    - 'flow_end'    -> TCP FIN/RST, idle timeout or eviction to make room
+    """
+
+    def __init__(self, on_event, capacity=FLOW_TABLE_CAPACITY, idle_timeout=FLOW_IDLE_TIMEOUT,
+                 volume_step=FLOW_VOLUME_STEP):
+        self.on_event = on_event
+        self.capacity = capacity
+        self.idle_timeout = idle_timeout
+        self.volume_step = volume_step
+        self.flows = OrderedDict()
+        self.event_keys = {}  # Packet type -> its (start, volume, end) spawn keys
+
+        # Statistics
+        self.flows_started = 0
+        self.flows_evicted = 0
+        self.flows_expired = 0
+
+    def update(self, key, length, timestamp, closing=False, packet_type=None):
+        """Account one packet of `length` bytes to the flow `key` of `packet_type`."""
+        flows = self.flows
+        entry = flows.get(key)
+
+        if entry is None:
+            if len(flows) >= self.capacity:
+                self.evict_oldest(timestamp)
+            event_keys = self.event_keys.get(packet_type)
+            if event_keys is None:
+                event_keys = self.event_keys[packet_type] = tuple(
+                    flow_event_key(packet_type, event) for event in FLOW_EVENTS)
+            entry = [timestamp, 0, self.volume_step, False, event_keys]
+            flows[key] = entry
+            self.flows_started += 1
+            self.on_event(event_keys[0], timestamp)
+        else:
+            flows.move_to_end(key)
+            entry[LAST_SEEN] = timestamp
+
+        entry[BYTES] += length
+        if entry[BYTES] >= entry[NEXT_VOLUME_MARK]:
+            entry[NEXT_VOLUME_MARK] = entry[BYTES] + self.volume_step
+            self.on_event(entry[EVENT_KEYS][1], timestamp)
+
+        if closing and not entry[CLOSED]:
+            # Keep closed flows until they go idle so trailing ACKs don't start a new flow
+            entry[CLOSED] = True
+            self.on_event(entry[EVENT_KEYS][2], timestamp)
+
+        self.expire_idle(timestamp)
+
+    def evict_oldest(self, timestamp):
+        """Drop the least recently seen flow to stay within capacity."""
+        _, entry = self.flows.popitem(last=False)
+        self.flows_evicted += 1
+        if not entry[CLOSED]:
+            self.on_event(entry[EVENT_KEYS][2], timestamp)
+
+    def expire_idle(self, now):
+        """End flows that have been silent for longer than the idle timeout."""
+        flows = self.flows
+        cutoff = now - self.idle_timeout
+        while flows:
+            entry = flows[next(iter(flows))]
+            if entry[LAST_SEEN] > cutoff:
+                break
+            flows.popitem(last=False)
+            self.flows_expired += 1
+            if not entry[CLOSED]:
+                self.on_event(entry[EVENT_KEYS][2], now)
+
+    def __len__(self):
+        return len(self.flows)
+
+    def get_stats(self):
+        return {
+            'active_flows': len(self.flows),
+            'flows_started': self.flows_started,
+            'flows_evicted': self.flows_evicted,
+            'flows_expired': self.flows_expired,
+        }
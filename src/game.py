@@ -3,10 +3,28 @@ import sys
 from src.settings import *
 from src.asset_manager import AssetManager
 from src.states import StateManager
-from src.network_monitor import NetworkMonitor  # NetworkMonitor 임포트
+from src.network_monitor import NetworkMonitor, PROTOCOL_CLASSIFIER  # NetworkMonitor 임포트
+from src.capture_worker import CaptureWorkerClient
+from src.capture_daemon import CaptureSubscriber
+from src.multi_capture import MultiInterfaceMonitor
+from src.log import configure_logging, shutdown_logging, get_logger, log_event
+from src.traffic_hud import TrafficHistory, TrafficPanel
+from src.startup import StartupTimer
+from src.bullet_engine import BulletField
+from src.pools import SpritePool
+from src.powerups import PowerUp
+
+log = get_logger('game')
 
 class Game:
-    def __init__(self):
+    def __init__(self, started=None):
+        # `started` is the perf_counter() reading taken before the game modules were imported
+        self.startup = StartupTimer(started)
+        self.startup.mark('imports')
+        
+        # Logging goes through a background thread so the game loop never blocks on stdout
+        configure_logging()
+        
         # Initialize pygame
         pygame.init()
         
@@ -19,6 +37,7 @@ class Game:
         # Set up display
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Striker 1945")
+        self.startup.mark('display')
         
         # Game clock
         self.clock = pygame.time.Clock()
@@ -27,13 +46,45 @@ class Game:
         # Asset manager
         self.asset_manager = AssetManager()
         self.asset_manager.load_all()
+        self.startup.mark('assets')
+        
+        # Per-protocol pps history and its HUD panel, kept across game restarts
+        self.traffic_history = TrafficHistory(PROTOCOL_CLASSIFIER.packet_types)
+        self.traffic_panel = TrafficPanel(self.traffic_history, self.asset_manager.get_font('small'))
         
-        # State manager
+        # Bullet arrays and the power-up pool, recycled across game restarts
+        self.bullets = BulletField(PLAYER_BULLET_CAPACITY)
+        self.enemy_bullets = BulletField(ENEMY_BULLET_CAPACITY)
+        self.powerup_pool = SpritePool(lambda pool: PowerUp(pool, self.asset_manager))
+        
+        # State manager (builds the menu now, gameplay when it starts)
         self.state_manager = StateManager(self)
+        self.startup.mark('states')
         
         # --- 네트워크 모니터 시작 ---
-        self.network_monitor = NetworkMonitor()
-        self.network_monitor.start()
+        if NETWORK_INTERFACES:
+            # 인터페이스별 리더 + 타임스탬프 순 병합 피드
+            self.network_monitor = MultiInterfaceMonitor(
+                NETWORK_INTERFACES,
+                backend=NETWORK_CAPTURE_BACKEND,
+                mode=NETWORK_CAPTURE_MODE,
+            )
+        elif NETWORK_CAPTURE_MODE == 'daemon':
+            # 직접 캡처하지 않고 캡처 데몬의 공유 카운터를 구독
+            self.network_monitor = CaptureSubscriber()
+        else:
+            if NETWORK_CAPTURE_MODE == 'process':
+                monitor_class = CaptureWorkerClient
+            else:
+                monitor_class = NetworkMonitor
+            self.network_monitor = monitor_class(
+                backend=NETWORK_CAPTURE_BACKEND,
+                pcap_path=NETWORK_REPLAY_PCAP,
+                replay_speed=NETWORK_REPLAY_SPEED,
+            )
+        # Started after the first frame (see run()): the capture backend, scapy included,
+        # loads on the monitor's own thread while the menu is already on screen
+        self.startup.mark('network setup')
         
     def run(self):
         """Main game loop"""
@@ -53,6 +104,13 @@ class Game:
                     
             # Update current state
             self.state_manager.current_state.handle_events(events)
+            
+            # --- 네트워크 스폰 피드 (프레임당 한 번 드레인) ---
+            network_spawns = self.network_monitor.poll_spawns()
+            self.state_manager.current_state.handle_network_spawns(network_spawns)
+            if TRAFFIC_HUD_ENABLED:
+                self.traffic_history.poll(self.network_monitor, current_time / 1000.0)
+            
             self.state_manager.current_state.update(dt)
             
             # Draw current state
@@ -60,10 +118,25 @@ class Game:
             
             # Update display
             pygame.display.flip()
+            if self.startup is not None:
+                self.startup.mark('first frame')
+                self.startup.report()
+                self.startup = None
+                self.network_monitor.start()
             self.clock.tick(FPS)
             
+        # Pool sizes and high-water marks, for tuning the capacities in settings
+        pools = {
+            'player_bullets': self.bullets.get_stats(),
+            'enemy_bullets': self.enemy_bullets.get_stats(),
+            'powerups': self.powerup_pool.get_stats(),
+        }
+        log_event(log, 'pools', "Pool high-water marks: %s",
+                  ', '.join(f"{name} {stats['high_water']}" for name, stats in pools.items()), **pools)
+        
         # --- 네트워크 모니터 종료 ---
         self.network_monitor.stop()
+        shutdown_logging()
         
         # Quit
         pygame.quit()
@@ -0,0 +1,54 @@
+from src.sketches import SpaceSaving
+from src.settings import (
+    HEAVY_HITTER_CAPACITY, HEAVY_HITTER_WINDOW, HEAVY_HITTER_SHARE, HEAVY_HITTER_MIN_PACKETS,
+)
+
+
+class HeavyHitterDetector:
+    """
+    Finds single talkers that dominate the traffic.
+
+    Source addresses are counted in a SpaceSaving summary over tumbling windows
+    of `window` seconds (packet time). When a window closes, the top talker is
+    reported through `on_report(address, share, packets, timestamp)` if it sent
+    at least `share` of the window's packets and the window saw at least
+    `min_packets`. Memory is fixed at `capacity` counters.
+    """
+
+    def __init__(self, on_report, capacity=HEAVY_HITTER_CAPACITY, window=HEAVY_HITTER_WINDOW,
+                 share=HEAVY_HITTER_SHARE, min_packets=HEAVY_HITTER_MIN_PACKETS):
+        self.on_report = on_report
+        self.window = window
+        self.share = share
+        self.min_packets = min_packets
+        self.summary = SpaceSaving(capacity)
+        self.window_end = None
+
+        # Statistics
+        self.reports = 0
+
+    def update(self, source, timestamp):
+        """Account one packet from `source`."""
+        if self.window_end is None:
+            self.window_end = timestamp + self.window
+        elif timestamp >= self.window_end:
+            self.close_window(timestamp)
+        self.summary.add(source)
+
+    def close_window(self, timestamp):
+        """Report the window's top talker if it crossed the share threshold, then start a new window."""
+        summary = self.summary
+        top = summary.top()
+        if top is not None and summary.total >= self.min_packets:
+            address, packets = top
+            share = packets / summary.total
+            if share >= self.share:
+                self.reports += 1
+                self.on_report(address, share, packets, timestamp)
+        summary.clear()
+        self.window_end = timestamp + self.window
+
+    def get_stats(self):
+        return {
+            'heavy_hitter_reports': self.reports,
+        }
@@ -0,0 +1,309 @@
+"""
+Offline pcap -> level compiler.
+
+Streams a capture through the same classification as live play (an
+unstarted NetworkMonitor fed by PcapReplayCapture) and compiles the traffic
+into a level file in the data/wave_config.json format:
+- the capture is split into `waves` equal time slices, one per wave
+- a wave's enemy mix follows its spawn keys through SPAWN_KEY_TO_ENEMY_MAP,
+  with the total scaled between LEVEL_MIN_ENEMIES and LEVEL_MAX_ENEMIES by
+  the square root of its share of the busiest wave's traffic
+- the spawn delay spreads those enemies over the wave's duration
+- the waves with the sharpest traffic peaks become boss battles, one per
+  BOSS_WAVE_INTERVAL waves, tagged with the heavy hitter seen at the time
+
+Memory is bounded by the number of time bins, not by the capture: frames
+are read one at a time, the spawn feed is drained into a fixed set of
+per-key count bins, and when the capture outgrows the bins, neighbouring
+bins merge and the bin width doubles.
+
+    python -m src.level_compiler incident.pcapng -o data/levels/incident.json
+
+Play it by pointing WAVE_CONFIG_PATH in src/settings.py at the output.
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+
+from src.network_monitor import NetworkMonitor, SPAWN_KEY_TO_ENEMY_MAP
+from src.pcap_replay import PcapReplayCapture
+from src.settings import (
+    FPS, MAX_WAVES, WAVE_DURATION, BOSS_WAVE_INTERVAL, LEVEL_BINS_PER_WAVE,
+    LEVEL_MIN_ENEMIES, LEVEL_MAX_ENEMIES, LEVEL_MIN_SPAWN_DELAY, LEVEL_MAX_SPAWN_DELAY,
+)
+
+INITIAL_BIN_WIDTH = 0.001  # Seconds; doubled as often as the capture's length needs
+BURST_RATIO = 3.0  # Peak bin over mean bin at which a wave spawns in bursts
+DOMINANT_SHARE = 0.6  # Share of one enemy type at which a wave flies in formation
+QUIET_ENEMY_TYPE = 'scout'  # Fills waves that saw no traffic at all
+
+PATTERN_NAMES = {
+    'waves': "Burst",
+    'formation': "Flood",
+    'mixed': "Storm",
+    'random': "Patrol",
+}
+
+
+class TimeBins:
+    """
+    A fixed number of {spawn key: count} bins over a timeline of unknown length.
+
+    Bins start INITIAL_BIN_WIDTH wide from the first timestamp; a timestamp
+    past the last bin merges neighbouring bins pairwise and doubles the width
+    until it fits, so at least half the bins are in use once the timeline
+    has grown past its initial span.
+    """
+
+    def __init__(self, count, width=INITIAL_BIN_WIDTH):
+        self.count = count
+        self.width = width
+        self.start = None
+        self.used = 0  # Bins up to and including the newest one written
+        self.counts = [{} for _ in range(count)]
+        self.talkers = [None] * count  # (share, talker) of the strongest heavy hitter per bin
+
+    def index(self, timestamp):
+        if self.start is None:
+            self.start = timestamp
+        offset = max(timestamp - self.start, 0.0)  # Slightly out-of-order frames join the first bin
+        index = int(offset / self.width)
+        while index >= self.count:
+            self.coarsen()
+            index = int(offset / self.width)
+        if index >= self.used:
+            self.used = index + 1
+        return index
+
+    def add(self, timestamp, key, count=1):
+        counts = self.counts[self.index(timestamp)]
+        counts[key] = counts.get(key, 0) + count
+
+    def add_talker(self, timestamp, talker, share):
+        index = self.index(timestamp)
+        current = self.talkers[index]
+        if current is None or share > current[0]:
+            self.talkers[index] = (share, talker)
+
+    def coarsen(self):
+        """Merge bins pairwise, doubling the bin width."""
+        counts = []
+        talkers = []
+        for index in range(0, self.count, 2):
+            merged = dict(self.counts[index])
+            talker = self.talkers[index]
+            if index + 1 < self.count:
+                for key, count in self.counts[index + 1].items():
+                    merged[key] = merged.get(key, 0) + count
+                other = self.talkers[index + 1]
+                if other is not None and (talker is None or other[0] > talker[0]):
+                    talker = other
+            counts.append(merged)
+            talkers.append(talker)
+        free = self.count - len(counts)
+        self.counts = counts + [{} for _ in range(free)]
+        self.talkers = talkers + [None] * free
+        self.used = (self.used + 1) // 2
+        self.width *= 2
+
+    def duration(self):
+        return self.used * self.width
+
+
+def read_capture(path, bins):
+    """Classify every frame of `path` into `bins`; returns the NetworkMonitor for its stats."""
+    monitor = NetworkMonitor(backend='pcap', pcap_path=path, replay_speed=0, record_dir=None)
+    capture = PcapReplayCapture(monitor, path, speed=0)
+    frame_interval = 1.0 / FPS  # Read the feed on a simulated frame clock, as the game does
+    next_drain = None
+
+    def drain():
+        for timestamp, key, count in monitor.spawn_feed.drain_records():
+            bins.add(timestamp, key, count)
+        for talker, share, packets, timestamp in monitor.drain_heavy_hitters():
+            bins.add_talker(timestamp, talker, share)
+
+    capture.open()
+    try:
+        for timestamp, data, linktype in capture.frames():
+            if next_drain is None:
+                next_drain = timestamp + frame_interval
+            elif timestamp >= next_drain:
+                drain()  # Each batch only holds one frame's events, stamped with the newest
+                next_drain = timestamp + frame_interval
+            capture.feed(timestamp, data, linktype)
+    finally:
+        capture.close()
+    drain()
+    return monitor
+
+
+def allocate(weights, total):
+    """Split `total` across {name: weight} in proportion (largest remainder), dropping zero shares."""
+    weight_sum = sum(weights.values())
+    if weight_sum <= 0:
+        return {}
+    quotas = {name: total * weight / weight_sum for name, weight in weights.items()}
+    shares = {name: int(quota) for name, quota in quotas.items()}
+    remainder = total - sum(shares.values())
+    for name in sorted(quotas, key=lambda name: (shares[name] - quotas[name], name))[:remainder]:
+        shares[name] += 1
+    return {name: share for name, share in shares.items() if share > 0}
+
+
+def summarize_waves(bins, waves):
+    """Per-wave traffic: spawn key counts, event totals per bin and the strongest heavy hitter."""
+    used = max(bins.used, 1)
+    summaries = []
+    for wave in range(waves):
+        first = wave * used // waves
+        last = (wave + 1) * used // waves
+        keys = {}
+        totals = []
+        talker = None
+        for index in range(first, last):
+            counts = bins.counts[index]
+            for key, count in counts.items():
+                keys[key] = keys.get(key, 0) + count
+            totals.append(sum(counts.values()))
+            candidate = bins.talkers[index]
+            if candidate is not None and (talker is None or candidate[0] > talker[0]):
+                talker = candidate
+        summaries.append({
+            'keys': keys,
+            'events': sum(totals),
+            'peak': max(totals, default=0),
+            'bins': len(totals),
+            'talker': talker[1] if talker else None,
+            'start': first * bins.width,
+            'end': last * bins.width,
+        })
+    return summaries
+
+
+def choose_boss_waves(summaries, boss_interval=BOSS_WAVE_INTERVAL):
+    """Wave numbers (1-based) of the sharpest traffic peaks, one per `boss_interval` waves, never wave 1."""
+    bosses = len(summaries) // boss_interval
+    candidates = [number for number in range(2, len(summaries) + 1) if summaries[number - 1]['peak'] > 0]
+    candidates.sort(key=lambda number: (-summaries[number - 1]['peak'], number))
+    return set(candidates[:bosses])
+
+
+def compile_wave(summary, busiest, bin_width, wave_duration=WAVE_DURATION):
+    """wave_config.json entry for one regular wave."""
+    events = summary['events']
+    if not events:
+        enemies = {QUIET_ENEMY_TYPE: LEVEL_MIN_ENEMIES}
+        return {
+            "name": "Quiet Skies",
+            "boss": False,
+            "enemies": enemies,
+            "spawn_delay": LEVEL_MAX_SPAWN_DELAY,
+            "spawn_pattern": "random",
+        }
+
+    enemy_weights = {}
+    for key, count in summary['keys'].items():
+        enemy_type = SPAWN_KEY_TO_ENEMY_MAP.get(key)
+        if enemy_type is not None:
+            enemy_weights[enemy_type] = enemy_weights.get(enemy_type, 0) + count
+    total = round(LEVEL_MIN_ENEMIES + (LEVEL_MAX_ENEMIES - LEVEL_MIN_ENEMIES) * math.sqrt(events / busiest))
+    enemies = allocate(enemy_weights, total) or {QUIET_ENEMY_TYPE: total}
+
+    spawn_delay = int(min(max(wave_duration / total, LEVEL_MIN_SPAWN_DELAY), LEVEL_MAX_SPAWN_DELAY))
+
+    mean = events / summary['bins']
+    dominant_share = max(enemies.values()) / total
+    if summary['peak'] >= BURST_RATIO * mean:
+        pattern = "waves"
+    elif dominant_share >= DOMINANT_SHARE:
+        pattern = "formation"
+    elif len(enemies) >= 3:
+        pattern = "mixed"
+    else:
+        pattern = "random"
+
+    dominant_key = max(summary['keys'], key=lambda key: (summary['keys'][key], key))
+    return {
+        "name": f"{dominant_key.replace(':', ' ').replace('_', ' ').upper()} {PATTERN_NAMES[pattern]}",
+        "boss": False,
+        "enemies": dict(sorted(enemies.items(), key=lambda item: (-item[1], item[0]))),
+        "spawn_delay": spawn_delay,
+        "spawn_pattern": pattern,
+    }
+
+
+def compile_level(bins, waves=MAX_WAVES):
+    """Level dict {"1": wave config, ...} from binned traffic."""
+    summaries = summarize_waves(bins, waves)
+    bosses = choose_boss_waves(summaries)
+    busiest = max((summary['events'] for summary in summaries), default=0)
+
+    level = {}
+    for number, summary in enumerate(summaries, start=1):
+        if number in bosses:
+            wave = {
+                "name": f"Traffic Peak - {summary['peak'] / bins.width:.0f} events/s",
+                "boss": True,
+                "enemies": {},
+                "spawn_delay": 0,
+                "spawn_pattern": "boss",
+            }
+            if summary['talker'] is not None:
+                wave["talker"] = summary['talker']
+        else:
+            wave = compile_wave(summary, busiest, bins.width)
+        # Where in the capture the wave came from, for reference
+        wave["traffic"] = {
+            "start": round(summary['start'], 3),
+            "end": round(summary['end'], 3),
+            "events": summary['events'],
+        }
+        level[str(number)] = wave
+    return level
+
+
+def compile_pcap(path, waves=MAX_WAVES, bins_per_wave=LEVEL_BINS_PER_WAVE):
+    """Stream `path` and return (level dict, NetworkMonitor used to classify it)."""
+    bins = TimeBins(waves * bins_per_wave)
+    monitor = read_capture(path, bins)
+    return compile_level(bins, waves), monitor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a pcap file into a precomputed wave level")
+    parser.add_argument('pcap', help="pcap or pcapng file to compile")
+    parser.add_argument('-o', '--output', help="level file to write (default: data/levels/<capture name>.json)")
+    parser.add_argument('--waves', type=int, default=MAX_WAVES, help="number of waves to split the capture into")
+    parser.add_argument('--bins-per-wave', type=int, default=LEVEL_BINS_PER_WAVE,
+                        help="time bins per wave used to find traffic peaks")
+    args = parser.parse_args()
+
+    output = args.output
+    if output is None:
+        name = os.path.splitext(os.path.basename(args.pcap))[0]
+        output = os.path.join('data', 'levels', f"{name}.json")
+
+    start = time.perf_counter()
+    level, monitor = compile_pcap(args.pcap, args.waves, args.bins_per_wave)
+    elapsed = time.perf_counter() - start
+
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(level, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+    packets = monitor.metrics.packets_seen
+    print(f"Compiled {packets} packets in {elapsed:.3f}s ({packets / max(elapsed, 1e-9):.0f} pps)")
+    for number, wave in level.items():
+        print(f"Wave {number}: {wave['name']} {wave['enemies'] or ''}")
+    print(f"Level written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""
+Queued, rate-limited logging for the game and capture hot paths.
+
+Callers log through standard `logging` loggers (see get_logger). Once
+configure_logging() has run, the only handler is an EnqueueHandler that
+puts the raw LogRecord on a SimpleQueue. Formatting, rate limiting and
+writing to stderr happen on a background LogPump thread, so a caller pays
+for one record and one enqueue.
+
+Records logged with log_event() carry a rate-limit key. The first
+LOG_RATE_BURST records per key in each LOG_RATE_WINDOW pass through. The
+rest are counted and folded into one summary when the window closes:
+    TCP→interceptor ×523 in last 5s
+
+Output is human-readable or one JSON object per line (LOG_FORMAT).
+"""
+
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+
+from src.settings import LOG_FORMAT, LOG_LEVEL, LOG_RATE_WINDOW, LOG_RATE_BURST
+
+ROOT_LOGGER = 'striker'
+
+_pump = None
+
+
+def get_logger(name):
+    """Logger under the game's root logger, e.g. get_logger('network')."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def log_event(logger, key, message, *args, count=1, level=logging.INFO, **fields):
+    """
+    Log a rate-limited event.
+
+    `key` groups events for rate limiting and names them in summaries.
+    `count` is how many occurrences the record stands for, e.g. a batch of spawns.
+    Extra keyword fields are kept on the record and appear in JSON output.
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, message, *args, extra={'key': key, 'count': count, 'fields': fields})
+
+
+class EnqueueHandler(logging.Handler):
+    """Hand records to the LogPump untouched; formatting happens on the pump thread."""
+
+    def __init__(self, record_queue):
+        super().__init__()
+        self.queue = record_queue
+
+    def emit(self, record):
+        self.queue.put(record)
+
+    def handle(self, record):
+        # No handler lock: SimpleQueue.put is thread-safe on its own
+        self.queue.put(record)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record):
+        entry = {
+            'time': round(record.created, 6),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        key = getattr(record, 'key', None)
+        if key is not None:
+            entry['key'] = key
+            entry['count'] = record.count
+            entry.update(record.fields)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RateLimiter:
+    """Per-key windows: pass the first `burst` records, count the rest for a summary (pump thread only)."""
+
+    def __init__(self, window=LOG_RATE_WINDOW, burst=LOG_RATE_BURST):
+        self.window = window
+        self.burst = burst
+        self.windows = {}  # key -> [window start, records passed, occurrences suppressed, last suppressed record]
+
+    def admit(self, record, now):
+        """True if the record should be written now."""
+        state = self.windows.get(record.key)
+        if state is None:
+            self.windows[record.key] = [now, 1, 0, None]
+            return True
+        if state[1] < self.burst:
+            state[1] += 1
+            return True
+        state[2] += record.count
+        state[3] = record
+        return False
+
+    def expire(self, now):
+        """Close windows older than `window`, returning a summary record for each that suppressed anything."""
+        summaries = []
+        for key, (started, passed, suppressed, last) in list(self.windows.items()):
+            if now - started < self.window:
+                continue
+            del self.windows[key]
+            if suppressed:
+                summaries.append(self.summarize(key, suppressed, last))
+        return summaries
+
+    def summarize(self, key, suppressed, last):
+        summary = logging.LogRecord(last.name, last.levelno, last.pathname, last.lineno,
+                                    "%s ×%d in last %gs", (key, suppressed, self.window), None)
+        summary.key = key
+        summary.count = suppressed
+        summary.fields = {'aggregated': True, 'window': self.window}
+        return summary
+
+
+class LogPump(threading.Thread):
+    """Background thread that rate-limits, formats and writes queued records."""
+
+    def __init__(self, record_queue, handler, limiter):
+        super().__init__(daemon=True, name='log-pump')
+        self.queue = record_queue
+        self.handler = handler
+        self.limiter = limiter
+        self.stop_event = threading.Event()
+
+    def run(self):
+        poll_interval = min(1.0, self.limiter.window / 5)
+        next_expiry = time.monotonic() + poll_interval
+        while not (self.stop_event.is_set() and self.queue.empty()):
+            try:
+                record = self.queue.get(timeout=poll_interval)
+            except queue.Empty:
+                record = None
+            now = time.monotonic()
+            if record is not None:
+                if getattr(record, 'key', None) is None or self.limiter.admit(record, now):
+                    self.handler.handle(record)
+            if now >= next_expiry:
+                for summary in self.limiter.expire(now):
+                    self.handler.handle(summary)
+                next_expiry = now + poll_interval
+
+        # Flush every open window on shutdown
+        for summary in self.limiter.expire(float('inf')):
+            self.handler.handle(summary)
+        self.handler.flush()
+
+    def stop(self, timeout=1.0):
+        self.stop_event.set()
+        self.join(timeout)
+
+
+def configure_logging(log_format=LOG_FORMAT, level=LOG_LEVEL, stream=None):
+    """Route the game's loggers through the background pump (idempotent)."""
+    global _pump
+    if _pump is not None:
+        return
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    if log_format == 'json':
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+
+    record_queue = queue.SimpleQueue()
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level)
+    root.addHandler(EnqueueHandler(record_queue))
+    root.propagate = False
+
+    _pump = LogPump(record_queue, output, RateLimiter())
+    _pump.start()
+
+
+def shutdown_logging():
+    """Write out everything still queued, including pending summaries."""
+    global _pump
+    if _pump is None:
+        return
+    _pump.stop()
+    _pump = None
+    root = logging.getLogger(ROOT_LOGGER)
+    for handler in list(root.handlers):
+        if isinstance(handler, EnqueueHandler):
+            root.removeHandler(handler)
+    root.propagate = True
@@ -0,0 +1,130 @@
+"""
+Capture pipeline instrumentation.
+
+- LatencyHistogram: HDR-style log-linear histogram, O(1) record into a fixed
+  bucket array, buckets at most 1/16 of their value wide at the default
+  5 precision bits
+- CaptureMetrics: per-monitor counters (packets seen, classified per
+  protocol, kernel/ring drops, suppressed spawns) plus the packet-to-spawn
+  latency histogram, read by the game as one consistent snapshot
+
+Counters are plain ints written by a single thread each (capture thread for
+packet counters, game thread for the histogram), so leaving them on costs an
+integer add per packet.
+"""
+
+from src.settings import METRICS_LATENCY_MAX, METRICS_LATENCY_PRECISION_BITS
+
+DEFAULT_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of non-negative integer values (microseconds).
+
+    Values below 2^precision_bits get one bucket each; above that every power
+    of two is split into 2^(precision_bits - 1) equal buckets, so the bucket
+    width is always within 2^(1 - precision_bits) of the value. Values above
+    `max_value` are clamped into the last bucket. Memory is fixed at
+    construction and record() never allocates.
+    """
+
+    def __init__(self, max_value=int(METRICS_LATENCY_MAX * 1e6), precision_bits=METRICS_LATENCY_PRECISION_BITS):
+        self.precision_bits = precision_bits
+        self.sub_bucket_count = 1 << precision_bits
+        self.half_count = self.sub_bucket_count >> 1
+        self.max_value = max_value
+        self.counts = [0] * (self.bucket_index(max_value) + 1)
+        self.total = 0
+        self.sum = 0
+        self.min = None
+        self.max = 0
+
+    def bucket_index(self, value):
+        if value < self.sub_bucket_count:
+            return value
+        shift = value.bit_length() - self.precision_bits
+        return self.sub_bucket_count + (shift - 1) * self.half_count + (value >> shift) - self.half_count
+
+    def bucket_value(self, index):
+        """Lowest value that lands in bucket `index`."""
+        if index < self.sub_bucket_count:
+            return index
+        shift, offset = divmod(index - self.sub_bucket_count, self.half_count)
+        return (self.half_count + offset) << (shift + 1)
+
+    def record(self, value):
+        """Count one value; negative values (clock skew) count as zero."""
+        value = int(value)
+        if value < 0:
+            value = 0
+        elif value > self.max_value:
+            value = self.max_value
+        self.counts[self.bucket_index(value)] += 1
+        self.total += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent):
+        """Value at or below which `percent` of the recorded values fall (bucket lower bound)."""
+        if not self.total:
+            return 0
+        target = max(1, int(self.total * percent / 100.0 + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.bucket_value(index), self.max)
+        return self.max
+
+    def snapshot(self, percentiles=DEFAULT_PERCENTILES):
+        """Summary dict: count, min, max, mean and the requested percentiles."""
+        summary = {
+            'count': self.total,
+            'min': self.min or 0,
+            'max': self.max,
+            'mean': self.sum / self.total if self.total else 0.0,
+        }
+        for percent in percentiles:
+            summary[f"p{percent:g}"] = self.percentile(percent)
+        return summary
+
+    def clear(self):
+        self.counts = [0] * len(self.counts)
+        self.total = 0
+        self.sum = 0
+        self.min = None
+        self.max = 0
+
+
+class CaptureMetrics:
+    """
+    Metrics surface shared by NetworkMonitor and CaptureWorkerClient.
+
+    The capture side only bumps `packets_seen` and the per-protocol dict owned
+    by its monitor; kernel drops are accumulated from the capture backend when
+    the game asks for a snapshot. The game side records one latency sample per
+    network enemy, from the timestamp of the packet that drove the spawn to
+    the moment the enemy exists.
+    """
+
+    def __init__(self):
+        self.packets_seen = 0  # Frames handed to the classifier (capture thread)
+        self.kernel_packets = 0
+        self.kernel_drops = 0
+        self.spawn_latency = LatencyHistogram()  # Game thread only
+
+    def record_spawn_latency(self, seconds):
+        self.spawn_latency.record(seconds * 1e6)
+
+    def add_kernel_stats(self, packets, drops):
+        self.kernel_packets += packets
+        self.kernel_drops += drops
+
+    def latency_snapshot(self):
+        """Latency summary in milliseconds."""
+        summary = self.spawn_latency.snapshot()
+        return {key: value if key == 'count' else value / 1000.0 for key, value in summary.items()}
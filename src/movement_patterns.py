@@ -7,43 +7,61 @@ class MovementPattern:
     def update(self, dt, enemy):
         pass
 
-class StraightMovement(MovementPattern):
+    def release(self):
+        """Called when the enemy dies; batched movement frees its slot here"""
+        pass
+
+class TrajectoryMovement(MovementPattern):
+    """
+    Base class for patterns whose path is a pure function of the enemy's age.
+
+    position(t, origin) is where an enemy placed at `origin` is `t` seconds
+    later, so nothing is integrated from frame to frame: a long frame lands
+    the enemy exactly on its path, and (origin, age) is its whole state.
+    """
+    def __init__(self):
+        self.origin = None
+
+    def position(self, t, origin):
+        """(x, y) at age `t` for an enemy spawned at `origin`"""
+        raise NotImplementedError
+
+    def update(self, dt, enemy):
+        if self.origin is None:
+            self.origin = pygame.math.Vector2(enemy.pos)
+        enemy.pos.update(self.position(enemy.age, self.origin))
+
+class StraightMovement(TrajectoryMovement):
     def __init__(self, config):
+        super().__init__()
         self.speed = config.get('speed', 100)
         self.direction = pygame.math.Vector2(config.get('direction_x', 0), config.get('direction_y', 1))
         if self.direction.magnitude() > 0:
             self.direction = self.direction.normalize()
-        
-    def update(self, dt, enemy):
-        enemy.pos += self.direction * self.speed * dt
+        self.velocity = self.direction * self.speed
+
+    def position(self, t, origin):
+        return origin.x + self.velocity.x * t, origin.y + self.velocity.y * t
 
-class SineWaveMovement(MovementPattern):
+class SineWaveMovement(TrajectoryMovement):
     def __init__(self, config):
+        super().__init__()
         self.speed = config.get('speed', 150)
         self.amplitude = config.get('amplitude', 60)
         self.frequency = config.get('frequency', 2)
-        self.initial_x = None
-        
-    def update(self, dt, enemy):
-        if self.initial_x is None:
-            self.initial_x = enemy.pos.x
-            
-        enemy.pos.y += self.speed * dt
-        enemy.pos.x = self.initial_x + self.amplitude * math.sin(enemy.age * self.frequency)
 
-class CosineWaveMovement(MovementPattern):
+    def position(self, t, origin):
+        return origin.x + self.amplitude * math.sin(t * self.frequency), origin.y + self.speed * t
+
+class CosineWaveMovement(TrajectoryMovement):
     def __init__(self, config):
+        super().__init__()
         self.speed = config.get('speed', 150)
         self.amplitude = config.get('amplitude', 60)
         self.frequency = config.get('frequency', 2)
-        self.initial_x = None
-        
-    def update(self, dt, enemy):
-        if self.initial_x is None:
-            self.initial_x = enemy.pos.x
-            
-        enemy.pos.y += self.speed * dt
-        enemy.pos.x = self.initial_x + self.amplitude * math.cos(enemy.age * self.frequency)
+
+    def position(self, t, origin):
+        return origin.x + self.amplitude * math.cos(t * self.frequency), origin.y + self.speed * t
 
 class DiveMovement(MovementPattern):
     def __init__(self, config):
@@ -69,71 +87,68 @@ class DiveMovement(MovementPattern):
             if self.direction:
                 enemy.pos += self.direction * self.speed * self.dive_speed_multiplier * dt
 
-class CircularMovement(MovementPattern):
+class CircularMovement(TrajectoryMovement):
     def __init__(self, config):
+        super().__init__()
         self.radius = config.get('radius', 80)
         self.angular_speed = config.get('angular_speed', 2)  # radians per second
         self.center_speed = config.get('center_speed', 50)  # speed at which center moves down
-        self.center = None
         self.angle = config.get('start_angle', 0)
-        
-    def update(self, dt, enemy):
-        if self.center is None:
-            self.center = pygame.math.Vector2(enemy.pos)
-            
-        # Move the center point down
-        self.center.y += self.center_speed * dt
-        
-        # Update angle
-        self.angle += self.angular_speed * dt
-        
-        # Calculate position on circle
-        enemy.pos.x = self.center.x + self.radius * math.cos(self.angle)
-        enemy.pos.y = self.center.y + self.radius * math.sin(self.angle)
 
-class ZigZagMovement(MovementPattern):
+    def position(self, t, origin):
+        # Circle around the spawn point while that center drifts down
+        angle = self.angle + self.angular_speed * t
+        return (origin.x + self.radius * math.cos(angle),
+                origin.y + self.center_speed * t + self.radius * math.sin(angle))
+
+class ZigZagMovement(TrajectoryMovement):
     def __init__(self, config):
+        super().__init__()
         self.speed = config.get('speed', 120)
         self.zigzag_width = config.get('zigzag_width', 100)
         self.zigzag_frequency = config.get('zigzag_frequency', 3)
-        self.initial_x = None
-        self.direction = 1
-        
-    def update(self, dt, enemy):
-        if self.initial_x is None:
-            self.initial_x = enemy.pos.x
-            
-        enemy.pos.y += self.speed * dt
-        
-        # Calculate zigzag offset
-        time_factor = enemy.age * self.zigzag_frequency
-        if math.sin(time_factor) > 0 and self.direction == -1:
-            self.direction = 1
-        elif math.sin(time_factor) < 0 and self.direction == 1:
-            self.direction = -1
-            
-        enemy.pos.x = self.initial_x + (self.zigzag_width / 2) * self.direction
 
-class BossHoverMovement(MovementPattern):
+    def position(self, t, origin):
+        # Snap between the two sides as the sine changes sign, starting on the right
+        side = -1 if math.sin(t * self.zigzag_frequency) < 0 else 1
+        return origin.x + (self.zigzag_width / 2) * side, origin.y + self.speed * t
+
+class PathMovement(TrajectoryMovement):
+    """
+    Follows a table of offsets from the spawn point sampled every `step`
+    seconds ("points": [[dx, dy], ...] in data/enemy_config.json), with linear
+    interpolation between samples and the last segment continued once the
+    table runs out, so the enemy flies off screen at its final velocity.
+    """
     def __init__(self, config):
+        super().__init__()
+        self.step = config.get('step', 0.5)
+        points = config.get('points', [])
+        if len(points) < 2:
+            points = [[0, 0], [0, 100 * self.step]]  # Straight down at 100 px/s
+        self.xs = [float(x) for x, _ in points]
+        self.ys = [float(y) for _, y in points]
+
+    def position(self, t, origin):
+        u = max(t, 0.0) / self.step
+        index = min(int(u), len(self.xs) - 2)
+        fraction = u - index
+        xs, ys = self.xs, self.ys
+        return (origin.x + xs[index] + (xs[index + 1] - xs[index]) * fraction,
+                origin.y + ys[index] + (ys[index + 1] - ys[index]) * fraction)
+
+class BossHoverMovement(TrajectoryMovement):
+    def __init__(self, config):
+        super().__init__()
         self.speed = config.get('speed', 50)
         self.amplitude = config.get('amplitude', 80)
         self.frequency = config.get('frequency', 0.8)
-        self.initial_pos = None
         self.hover_y = 80  # Stay near top of screen
-        
-    def update(self, dt, enemy):
-        if self.initial_pos is None:
-            self.initial_pos = pygame.math.Vector2(enemy.pos)
-            self.initial_pos.y = self.hover_y
-            
-        # Gentle horizontal movement
-        enemy.pos.x = self.initial_pos.x + self.amplitude * math.sin(enemy.age * self.frequency)
-        enemy.pos.y = self.hover_y + 20 * math.sin(enemy.age * self.frequency * 0.5)
-        
-        # Keep boss on screen
-        screen_width = SCREEN_WIDTH
-        enemy.pos.x = max(60, min(screen_width - 60, enemy.pos.x))
+
+    def position(self, t, origin):
+        # Gentle horizontal movement, kept on screen
+        x = origin.x + self.amplitude * math.sin(t * self.frequency)
+        return max(60, min(SCREEN_WIDTH - 60, x)), self.hover_y + 20 * math.sin(t * self.frequency * 0.5)
 
 class BossTeleportMovement(MovementPattern):
     def __init__(self, config):
@@ -207,6 +222,8 @@ def create_movement_pattern(config):
         return CircularMovement(config)
     elif pattern_type == 'zigzag':
         return ZigZagMovement(config)
+    elif pattern_type == 'path':
+        return PathMovement(config)
     elif pattern_type == 'boss_hover':
         return BossHoverMovement(config)
     elif pattern_type == 'boss_teleport':
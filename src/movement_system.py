@@ -0,0 +1,392 @@
+"""
+Batched movement for regular enemies.
+
+The patterns in src/movement_patterns.py run one Python update() per enemy
+per frame. MovementSystem groups enemies by trajectory instead. Every
+batched pattern is a closed-form position(t) (TrajectoryMovement), so a
+MovementBatch only keeps its enemies' spawn points, ages and parameters
+(speed, amplitude, frequency, ...) in NumPy arrays. Each frame it advances
+the ages, evaluates every position with a few array expressions and copies
+them back into the enemies' pos vectors in one pass. Path tables are turned
+into arrays once per table, and their enemies are evaluated together.
+
+The batches read their parameters from the per-object pattern built for the
+same config and evaluate the same formulas, so a batched enemy flies the
+same path as one moved by its own pattern object (to the last bit of
+sin/cos). The benchmark checks that, and checks both against copies of the
+incremental per-frame steps the closed forms replaced:
+    python -m src.movement_system
+
+Dive (which aims at the player mid-flight) and the boss patterns keep their
+per-object classes.
+"""
+
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+import pygame
+
+from src.movement_patterns import (
+    create_movement_pattern, MovementPattern,
+    StraightMovement, SineWaveMovement, CosineWaveMovement, ZigZagMovement, CircularMovement, PathMovement,
+)
+from src.settings import SCREEN_WIDTH
+
+
+class BatchedMovement(MovementPattern):
+    """An enemy's slot in a MovementBatch; the batch moves it, so update() does nothing."""
+
+    def __init__(self, batch, slot, pattern):
+        self.batch = batch
+        self.slot = slot
+        self.pattern = pattern  # The per-object pattern the batch took its parameters from
+
+    def release(self):
+        if self.batch is not None:
+            self.batch.remove(self.slot)
+            self.batch = None
+
+
+class MovementBatch:
+    """Enemies sharing one trajectory, with their spawn points, ages and parameters in parallel arrays."""
+
+    FIELDS = ()  # Per-enemy parameter arrays besides the common ones
+    COMMON = ('x', 'y', 'age', 'origin_x', 'origin_y')
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, pattern):
+        self.capacity = self.INITIAL_CAPACITY
+        for name in self.COMMON + self.FIELDS:
+            setattr(self, name, np.zeros(self.capacity))
+        self.enemies = []
+        self.handles = []
+
+    @classmethod
+    def key(cls, pattern):
+        """Enemies whose patterns give the same key share a batch."""
+        return cls
+
+    def __len__(self):
+        return len(self.enemies)
+
+    def parameters(self, pattern):
+        """{field: value} for a new enemy, from its per-object pattern."""
+        return {}
+
+    def evaluate(self, t, origin_x, origin_y, count):
+        """Write the positions at ages `t` into the first `count` slots of x and y."""
+        raise NotImplementedError
+
+    def add(self, enemy, pattern):
+        slot = len(self.enemies)
+        if slot == self.capacity:
+            self.capacity *= 2
+            for name in self.COMMON + self.FIELDS:
+                array = np.zeros(self.capacity)
+                array[:slot] = getattr(self, name)
+                setattr(self, name, array)
+        self.x[slot] = self.origin_x[slot] = enemy.pos.x
+        self.y[slot] = self.origin_y[slot] = enemy.pos.y
+        self.age[slot] = enemy.age
+        for name, value in self.parameters(pattern).items():
+            getattr(self, name)[slot] = value
+        handle = BatchedMovement(self, slot, pattern)
+        self.enemies.append(enemy)
+        self.handles.append(handle)
+        return handle
+
+    def remove(self, slot):
+        """Drop a slot by moving the last enemy into it."""
+        last = len(self.enemies) - 1
+        if slot != last:
+            for name in self.COMMON + self.FIELDS:
+                array = getattr(self, name)
+                array[slot] = array[last]
+            self.enemies[slot] = self.enemies[last]
+            self.handles[slot] = self.handles[last]
+            self.handles[slot].slot = slot
+        self.enemies.pop()
+        self.handles.pop()
+
+    def update(self, dt):
+        count = len(self.enemies)
+        if not count:
+            return
+        age = self.age[:count]
+        age += dt
+        self.evaluate(age, self.origin_x[:count], self.origin_y[:count], count)
+        for enemy, x, y in zip(self.enemies, self.x[:count].tolist(), self.y[:count].tolist()):
+            enemy.pos.update(x, y)
+
+
+class StraightBatch(MovementBatch):
+    FIELDS = ('vx', 'vy')
+
+    def parameters(self, pattern):
+        return {'vx': pattern.velocity.x, 'vy': pattern.velocity.y}
+
+    def evaluate(self, t, origin_x, origin_y, count):
+        self.x[:count] = origin_x + self.vx[:count] * t
+        self.y[:count] = origin_y + self.vy[:count] * t
+
+
+class SineWaveBatch(MovementBatch):
+    FIELDS = ('speed', 'amplitude', 'frequency')
+    WAVE = staticmethod(np.sin)
+
+    def parameters(self, pattern):
+        return {'speed': pattern.speed, 'amplitude': pattern.amplitude, 'frequency': pattern.frequency}
+
+    def evaluate(self, t, origin_x, origin_y, count):
+        self.x[:count] = origin_x + self.amplitude[:count] * self.WAVE(t * self.frequency[:count])
+        self.y[:count] = origin_y + self.speed[:count] * t
+
+
+class CosineWaveBatch(SineWaveBatch):
+    WAVE = staticmethod(np.cos)
+
+
+class ZigZagBatch(MovementBatch):
+    FIELDS = ('speed', 'half_width', 'frequency')
+
+    def parameters(self, pattern):
+        return {'speed': pattern.speed, 'half_width': pattern.zigzag_width / 2, 'frequency': pattern.zigzag_frequency}
+
+    def evaluate(self, t, origin_x, origin_y, count):
+        side = np.where(np.sin(t * self.frequency[:count]) < 0, -1.0, 1.0)
+        self.x[:count] = origin_x + self.half_width[:count] * side
+        self.y[:count] = origin_y + self.speed[:count] * t
+
+
+class CircularBatch(MovementBatch):
+    FIELDS = ('radius', 'angular_speed', 'center_speed', 'start_angle')
+
+    def parameters(self, pattern):
+        return {
+            'radius': pattern.radius,
+            'angular_speed': pattern.angular_speed,
+            'center_speed': pattern.center_speed,
+            'start_angle': pattern.angle,
+        }
+
+    def evaluate(self, t, origin_x, origin_y, count):
+        angle = self.start_angle[:count] + self.angular_speed[:count] * t
+        radius = self.radius[:count]
+        self.x[:count] = origin_x + radius * np.cos(angle)
+        self.y[:count] = origin_y + self.center_speed[:count] * t + radius * np.sin(angle)
+
+
+class PathBatch(MovementBatch):
+    """Enemies flying one path table; the table is turned into arrays once, when the batch is made."""
+
+    def __init__(self, pattern):
+        super().__init__(pattern)
+        self.step = pattern.step
+        self.last = len(pattern.xs) - 2  # Last segment, continued past the end of the table
+        self.table_x = np.array(pattern.xs)
+        self.table_y = np.array(pattern.ys)
+        # Per-segment deltas, computed as PathMovement.position() computes them
+        self.delta_x = np.array([b - a for a, b in zip(pattern.xs, pattern.xs[1:])])
+        self.delta_y = np.array([b - a for a, b in zip(pattern.ys, pattern.ys[1:])])
+
+    @classmethod
+    def key(cls, pattern):
+        return cls, pattern.step, tuple(pattern.xs), tuple(pattern.ys)
+
+    def evaluate(self, t, origin_x, origin_y, count):
+        u = np.maximum(t, 0.0) / self.step
+        index = np.minimum(u.astype(np.intp), self.last)
+        fraction = u - index
+        self.x[:count] = origin_x + self.table_x[index] + self.delta_x[index] * fraction
+        self.y[:count] = origin_y + self.table_y[index] + self.delta_y[index] * fraction
+
+
+# Per-object pattern class -> batch class that reproduces it
+BATCH_CLASSES = {
+    StraightMovement: StraightBatch,
+    SineWaveMovement: SineWaveBatch,
+    CosineWaveMovement: CosineWaveBatch,
+    ZigZagMovement: ZigZagBatch,
+    CircularMovement: CircularBatch,
+    PathMovement: PathBatch,
+}
+
+
+class MovementSystem:
+    """One MovementBatch per trajectory; update() moves every batched enemy."""
+
+    def __init__(self):
+        self.batches = {}  # Batch key -> batch
+
+    def __len__(self):
+        return sum(len(batch) for batch in self.batches.values())
+
+    def add(self, enemy, config):
+        """Movement for a new enemy: a slot in a batch, or its own pattern object for unbatched types."""
+        pattern = create_movement_pattern(config)
+        batch_class = BATCH_CLASSES.get(type(pattern))
+        if batch_class is None:
+            return pattern
+        key = batch_class.key(pattern)
+        batch = self.batches.get(key)
+        if batch is None:
+            batch = self.batches[key] = batch_class(pattern)
+        return batch.add(enemy, pattern)
+
+    def update(self, dt):
+        """Advance every batch one frame; call once per frame before the enemies' own update()."""
+        for batch in self.batches.values():
+            batch.update(dt)
+
+
+class Probe:
+    """Stand-in enemy for the benchmark: just the state movement patterns touch."""
+
+    def __init__(self, pos):
+        self.pos = pygame.math.Vector2(pos)
+        self.age = 0.0
+
+
+# The per-frame steps these patterns took before they became closed forms,
+# kept as the benchmark's reference for the behaviour position(t) replaced.
+# Path tables were added as closed forms and have no incremental original.
+
+class IncrementalStraight:
+    def __init__(self, config):
+        self.speed = config.get('speed', 100)
+        self.direction = pygame.math.Vector2(config.get('direction_x', 0), config.get('direction_y', 1))
+        if self.direction.magnitude() > 0:
+            self.direction = self.direction.normalize()
+
+    def update(self, dt, enemy):
+        enemy.pos += self.direction * self.speed * dt
+
+
+class IncrementalWave:
+    def __init__(self, config, wave=math.sin):
+        self.speed = config.get('speed', 150)
+        self.amplitude = config.get('amplitude', 60)
+        self.frequency = config.get('frequency', 2)
+        self.wave = wave
+        self.initial_x = None
+
+    def update(self, dt, enemy):
+        if self.initial_x is None:
+            self.initial_x = enemy.pos.x
+        enemy.pos.y += self.speed * dt
+        enemy.pos.x = self.initial_x + self.amplitude * self.wave(enemy.age * self.frequency)
+
+
+class IncrementalCircular:
+    def __init__(self, config):
+        self.radius = config.get('radius', 80)
+        self.angular_speed = config.get('angular_speed', 2)
+        self.center_speed = config.get('center_speed', 50)
+        self.center = None
+        self.angle = config.get('start_angle', 0)
+
+    def update(self, dt, enemy):
+        if self.center is None:
+            self.center = pygame.math.Vector2(enemy.pos)
+        self.center.y += self.center_speed * dt
+        self.angle += self.angular_speed * dt
+        enemy.pos.x = self.center.x + self.radius * math.cos(self.angle)
+        enemy.pos.y = self.center.y + self.radius * math.sin(self.angle)
+
+
+class IncrementalZigZag:
+    def __init__(self, config):
+        self.speed = config.get('speed', 120)
+        self.zigzag_width = config.get('zigzag_width', 100)
+        self.zigzag_frequency = config.get('zigzag_frequency', 3)
+        self.initial_x = None
+        self.direction = 1
+
+    def update(self, dt, enemy):
+        if self.initial_x is None:
+            self.initial_x = enemy.pos.x
+        enemy.pos.y += self.speed * dt
+        time_factor = enemy.age * self.zigzag_frequency
+        if math.sin(time_factor) > 0 and self.direction == -1:
+            self.direction = 1
+        elif math.sin(time_factor) < 0 and self.direction == 1:
+            self.direction = -1
+        enemy.pos.x = self.initial_x + (self.zigzag_width / 2) * self.direction
+
+
+INCREMENTAL_PATTERNS = {
+    'straight': IncrementalStraight,
+    'sine_wave': IncrementalWave,
+    'cosine_wave': lambda config: IncrementalWave(config, math.cos),
+    'circular': IncrementalCircular,
+    'zigzag': IncrementalZigZag,
+}
+
+
+def benchmark(counts=(100, 300, 1000, 3000), frames=120, seed=1, hitch_chance=0.05):
+    """
+    Per-frame movement cost, per-object patterns vs batches.
+
+    Also checks that the batches fly the per-object patterns' paths, and
+    that both fly the paths the incremental originals did. Frames are
+    mostly 1/60 s, with the odd hitch of up to 0.25 s.
+    """
+    configs = [
+        {'type': 'straight', 'speed': 80},
+        {'type': 'sine_wave', 'speed': 150, 'amplitude': 60, 'frequency': 2},
+        {'type': 'cosine_wave', 'speed': 60, 'amplitude': 40, 'frequency': 1},
+        {'type': 'zigzag', 'speed': 140, 'zigzag_width': 120, 'zigzag_frequency': 3},
+        {'type': 'circular', 'radius': 80, 'angular_speed': 2, 'center_speed': 50},
+        {'type': 'path', 'step': 0.5, 'points': [[0, 0], [40, 60], [100, 110], [90, 230], [-50, 330], [-100, 460]]},
+    ]
+    rng = random.Random(seed)
+    print(f"{'enemies':>8} {'per-object ms':>14} {'batched ms':>11} {'batch drift px':>15} {'vs incremental px':>18}")
+    for count in counts:
+        steps = [rng.uniform(1 / 60, 0.25) if rng.random() < hitch_chance else 1 / 60 for _ in range(frames)]
+        starts = [(rng.uniform(50, SCREEN_WIDTH - 50), rng.uniform(-100, -50)) for _ in range(count)]
+        enemy_configs = [configs[index % len(configs)] for index in range(count)]
+        reference = [(Probe(start), create_movement_pattern(config)) for start, config in zip(starts, enemy_configs)]
+        incremental = [(Probe(start), INCREMENTAL_PATTERNS[config['type']](config))
+                       for start, config in zip(starts, enemy_configs) if config['type'] in INCREMENTAL_PATTERNS]
+        system = MovementSystem()
+        batched = [Probe(start) for start in starts]
+        for probe, config in zip(batched, enemy_configs):
+            system.add(probe, config)
+
+        start = time.perf_counter()
+        for dt in steps:
+            for probe, pattern in reference:
+                probe.age += dt
+                pattern.update(dt, probe)
+        per_object = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for dt in steps:
+            system.update(dt)
+        batch_time = time.perf_counter() - start
+
+        for dt in steps:
+            for probe, pattern in incremental:
+                probe.age += dt
+                pattern.update(dt, probe)
+
+        drift = max((a.pos - b.pos).length() for (a, _), b in zip(reference, batched))
+        closed_form = [probe for probe, config in zip(batched, enemy_configs) if config['type'] in INCREMENTAL_PATTERNS]
+        legacy_drift = max((a.pos - b.pos).length() for (a, _), b in zip(incremental, closed_form))
+        print(f"{count:>8} {per_object / frames * 1000:>14.3f} {batch_time / frames * 1000:>11.3f} "
+              f"{drift:>15.2e} {legacy_drift:>18.2e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched enemy movement against the per-object patterns")
+    parser.add_argument('--frames', type=int, default=120, help="frames to simulate per enemy count")
+    parser.add_argument('counts', type=int, nargs='*', default=[100, 300, 1000, 3000], help="enemies to move")
+    args = parser.parse_args()
+    benchmark(args.counts, args.frames)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""
+Concurrent capture on several interfaces, merged into one feed.
+
+Each interface gets its own reader with its own classifier state, flow table
+and spawn feed, so packets never funnel through a shared callback or lock:
+- mode 'thread'  -> one NetworkMonitor thread per interface
+- mode 'process' -> one CaptureWorkerClient worker process per interface;
+                    readers classify on their own cores, so throughput grows
+                    with the number of interfaces
+- mode 'daemon'  -> one CaptureSubscriber per interface, each following a
+                    capture daemon started with --interface
+
+Only the game loop touches every reader. Once per frame it reads their
+per-key counts into a FeedMerger, which sums them into time windows, and
+the merged counts drive one spawn controller. Accounting is kept per interface.
+"""
+
+import math
+import time
+
+from src.network_monitor import (
+    NetworkMonitor, build_spawn_list, build_heavy_hitter_spawn, PROTOCOL_CLASSIFIER,
+)
+from src.capture_worker import CaptureWorkerClient
+from src.capture_daemon import CaptureSubscriber
+from src.spawn_controller import SpawnController
+from src.sketches import WindowedHyperLogLog
+from src.metrics import CaptureMetrics
+from src.settings import (
+    NETWORK_CAPTURE_BACKEND, NETWORK_CAPTURE_MODE, MERGE_WINDOW, MERGE_MAX_DELAY, MERGE_BUFFER_LIMIT,
+)
+
+
+class FeedMerger:
+    """
+    Merges per-source count batches into fixed time windows.
+
+    Sources hand in (timestamp, key, count) records, one per spawn key per
+    read, and each record is summed into the window of width `window` its
+    timestamp falls in. A merge therefore costs a dict update per key and
+    source, however many packets are behind the counts. A window is
+    released once it ends at or before the watermark: the oldest of the
+    sources' newest timestamps, but never more than `max_delay` behind
+    `now`, so an idle interface can't hold the feed back. With more than
+    `buffer_limit` windows pending the oldest are released early, and a
+    record for a window that was already released goes out with the next
+    release and is counted as late.
+    """
+
+    def __init__(self, sources, window=MERGE_WINDOW, max_delay=MERGE_MAX_DELAY, buffer_limit=MERGE_BUFFER_LIMIT):
+        self.sources = list(sources)
+        self.window = window
+        self.max_delay = max_delay
+        self.buffer_limit = buffer_limit
+        self.windows = {}  # Window index -> {key: [count, newest timestamp]}
+        self.window_records = {}  # Window index -> {source: records summed into it}
+        self.late = {}  # Records for already released windows, as {key: [count, newest timestamp]}
+        self.newest = dict.fromkeys(self.sources)  # Newest timestamp seen per source
+        self.released_until = None  # Windows below this index have been released
+
+        # Per-source accounting
+        self.records_in = dict.fromkeys(self.sources, 0)
+        self.records_late = dict.fromkeys(self.sources, 0)
+        self.records_forced = dict.fromkeys(self.sources, 0)
+        self.backlog = dict.fromkeys(self.sources, 0)
+        self.high_water = dict.fromkeys(self.sources, 0)
+
+    def add(self, source, records):
+        """Sum a batch of records read from `source` into their windows."""
+        if not records:
+            return
+        released_until = self.released_until
+        for timestamp, key, count in records:
+            index = math.floor(timestamp / self.window)
+            if released_until is not None and index < released_until:
+                totals = self.late
+                self.records_late[source] += 1
+            else:
+                totals = self.windows.get(index)
+                if totals is None:
+                    totals = self.windows[index] = {}
+                    self.window_records[index] = {}
+                sources = self.window_records[index]
+                sources[source] = sources.get(source, 0) + 1
+                self.backlog[source] += 1
+            merge_count(totals, key, count, timestamp)
+        self.records_in[source] += len(records)
+        newest = max(record[0] for record in records)
+        if self.newest[source] is None or newest > self.newest[source]:
+            self.newest[source] = newest
+        if self.backlog[source] > self.high_water[source]:
+            self.high_water[source] = self.backlog[source]
+
+    def watermark(self, now):
+        floor = now - self.max_delay
+        newest = [timestamp for timestamp in self.newest.values() if timestamp is not None]
+        if not newest:
+            return floor
+        return max(min(newest), floor)
+
+    def pop_ready(self, now):
+        """Release every window that ended by the watermark as {key: (count, newest timestamp)}."""
+        ready = math.floor(self.watermark(now) / self.window)
+        pending = sorted(self.windows)
+        forced = pending[:max(0, len(pending) - self.buffer_limit)]
+        released = [index for index in pending if index < ready or index in forced]
+
+        merged = self.late
+        self.late = {}
+        for index in released:
+            for key, (count, timestamp) in self.windows.pop(index).items():
+                merge_count(merged, key, count, timestamp)
+            for source, records in self.window_records.pop(index).items():
+                self.backlog[source] -= records
+                if index >= ready:
+                    self.records_forced[source] += records
+        if released:
+            ready = max(ready, released[-1] + 1)
+        if self.released_until is None or ready > self.released_until:
+            self.released_until = ready
+        return {key: (count, timestamp) for key, (count, timestamp) in merged.items()}
+
+    def get_stats(self, source):
+        return {
+            'merge_records': self.records_in[source],
+            'merge_late': self.records_late[source],
+            'merge_forced': self.records_forced[source],
+            'merge_backlog': self.backlog[source],
+            'merge_high_water': self.high_water[source],
+        }
+
+
+def merge_count(totals, key, count, timestamp):
+    """Add `count` events of `key` to a {key: [count, newest timestamp]} summary."""
+    entry = totals.get(key)
+    if entry is None:
+        totals[key] = [count, timestamp]
+    else:
+        entry[0] += count
+        if timestamp > entry[1]:
+            entry[1] = timestamp
+
+
+class MultiInterfaceMonitor:
+    """
+    Captures several interfaces at once and spawns from their merged feed.
+
+    Exposes the interface the game uses on NetworkMonitor (start, stop,
+    poll_spawns, get_stats, get_metrics, get_distinct_sources,
+    record_spawn_latency). Heavy hitter reports come from each interface's
+    own detector.
+    """
+
+    def __init__(self, interfaces, spawn_controller=None, backend=NETWORK_CAPTURE_BACKEND,
+                 mode=NETWORK_CAPTURE_MODE):
+        self.interfaces = list(interfaces)
+        self.spawn_controller = spawn_controller or SpawnController()
+        if mode == 'daemon':
+            self.readers = {interface: CaptureSubscriber(interface=interface) for interface in self.interfaces}
+        else:
+            reader_class = CaptureWorkerClient if mode == 'process' else NetworkMonitor
+            self.readers = {interface: reader_class(interface=interface, backend=backend) for interface in self.interfaces}
+        self.merger = FeedMerger(self.interfaces)
+        self.capture_clock = any(reader.capture_clock for reader in self.readers.values())
+        self.metrics = CaptureMetrics()  # Only the latency histogram is used here
+        self.last_key_time = {}
+
+    def start(self):
+        self.spawn_controller.start(time.time())
+        for reader in self.readers.values():
+            reader.start()
+
+    def stop(self):
+        """Signal every reader first so they shut down in parallel, then wait for each."""
+        for reader in self.readers.values():
+            reader.stop_event.set()
+        for reader in self.readers.values():
+            reader.stop()
+
+    def poll_spawns(self, now=None):
+        """Merge every interface's new records (game thread) and decide spawns in one batch."""
+        current_time = time.time() if now is None else now
+        for interface, reader in self.readers.items():
+            self.merger.add(interface, reader.read_records())
+
+        counts = {}
+        for key, (count, newest) in self.merger.pop_ready(current_time).items():
+            counts[key] = count
+            self.last_key_time[key] = newest
+
+        due = self.spawn_controller.poll(counts, current_time)
+        spawns = build_spawn_list(due, counts, self.last_key_time)
+        for reader in self.readers.values():
+            for report in reader.drain_heavy_hitters():
+                spawns.append(build_heavy_hitter_spawn(*report))
+        return spawns
+
+    def record_spawn_latency(self, seconds):
+        if self.capture_clock:
+            return  # Unpaced replays stamp packets with capture times
+        self.metrics.record_spawn_latency(seconds)
+
+    def get_distinct_sources(self):
+        """
+        Distinct sources across all interfaces.
+
+        Thread readers' sketches are merged, so a host seen on two interfaces
+        counts once. Worker processes only publish estimates, so the largest
+        one is used as a lower bound.
+        """
+        sketches = [getattr(reader, 'distinct_sources', None) for reader in self.readers.values()]
+        if sketches and all(sketch is not None for sketch in sketches):
+            merged = WindowedHyperLogLog()
+            for sketch in sketches:
+                merged.merge(sketch)
+            return merged.count()
+        return max((reader.get_distinct_sources() for reader in self.readers.values()), default=0)
+
+    def get_stats(self):
+        """Packet totals across interfaces, with each interface's own stats under 'interfaces'."""
+        stats = dict.fromkeys(PROTOCOL_CLASSIFIER.packet_types, 0)
+        per_interface = {}
+        for interface, reader in self.readers.items():
+            reader_stats = reader.get_stats()
+            for packet_type in PROTOCOL_CLASSIFIER.packet_types:
+                stats[packet_type] += reader_stats.get(packet_type, 0)
+            reader_stats.update(self.merger.get_stats(interface))
+            per_interface[interface] = reader_stats
+        stats['pps'] = self.spawn_controller.get_rates()
+        stats['spawns_suppressed'] = sum(self.spawn_controller.get_suppressed().values())
+        stats['distinct_sources'] = int(self.get_distinct_sources())
+        stats['interfaces'] = per_interface
+        return stats
+
+    def get_metrics(self):
+        """Capture pipeline metrics summed across interfaces, with each interface's under 'interfaces'."""
+        per_interface = {}
+        totals = {
+            'packets_seen': 0,
+            'packets_classified': dict.fromkeys(PROTOCOL_CLASSIFIER.packet_types, 0),
+            'packets_unclassified': 0,
+            'kernel_packets': 0,
+            'kernel_drops': 0,
+            'capture_restarts': 0,
+            'capture_downtime': 0.0,
+        }
+        for interface, reader in self.readers.items():
+            metrics = reader.get_metrics()
+            for name, value in totals.items():
+                if name == 'packets_classified':
+                    for packet_type, count in metrics[name].items():
+                        value[packet_type] += count
+                else:
+                    totals[name] = value + metrics[name]
+            # Spawn decisions and latency live on the merged feed, not the readers
+            for name in ('spawns_suppressed', 'pps', 'spawn_latency_ms'):
+                del metrics[name]
+            metrics.update(self.merger.get_stats(interface))
+            per_interface[interface] = metrics
+
+        totals['spawns_suppressed'] = self.spawn_controller.get_suppressed()
+        totals['pps'] = self.spawn_controller.get_rates()
+        totals['spawn_latency_ms'] = self.metrics.latency_snapshot()
+        totals['interfaces'] = per_interface
+        return totals
@@ -1,103 +1,433 @@
+import functools
+import logging
 import threading
 import time
-import pygame
-from scapy.all import sniff, TCP, ICMP, ARP, UDP
-from src.settings import ENEMY_SPAWN_EVENT, PACKET_TO_ENEMY_MAP, NETWORK_SPAWN_COOLDOWN
+from collections import deque
+from src.settings import (
+    FLOW_EVENT_TO_ENEMY_MAP, NETWORK_CAPTURE_BACKEND,
+    NETWORK_REPLAY_PCAP, NETWORK_REPLAY_SPEED, NETWORK_TRACK_FLOWS, NETWORK_TRACK_DISTINCT_SOURCES,
+    NETWORK_TRACK_HEAVY_HITTERS, HEAVY_HITTER_ENEMY_TYPE,
+    CAPTURE_RESTART_DELAY, CAPTURE_MAX_RESTART_DELAY, CAPTURE_STOP_TIMEOUT, NETWORK_RECORD_DIR,
+)
+from src.packet_classifier import (
+    load_protocol_classifier, make_flow_key, format_address,
+    ETH_P_ARP, IPPROTO_TCP, TCP_FIN, TCP_RST,
+)
+from src.flow_table import FlowTable, flow_event_key
+from src.heavy_hitters import HeavyHitterDetector
+from src.sketches import WindowedHyperLogLog
+from src.capture_backends import create_capture_backend
+from src.spawn_feed import SpawnFeed
+from src.spawn_controller import SpawnController
+from src.metrics import CaptureMetrics
+from src.pcap_recorder import PcapRecorder, DLT_EN10MB
+from src.log import get_logger, log_event
+
+log = get_logger('network')
+
+# Protocol rules from data/protocol_rules.json, shared by every monitor (and the capture worker)
+PROTOCOL_CLASSIFIER = load_protocol_classifier()
+
+
+def build_spawn_key_map(classifier):
+    """
+    Enemy for every key that can reach the spawn feed: packet types, and the
+    flow events of each flow-tracked packet type.
+
+    Flow events use FLOW_EVENT_TO_ENEMY_MAP, where None stands for the packet
+    type's own enemy, so an HTTPS connection still spawns the HTTPS enemy.
+    """
+    key_map = dict(classifier.enemy_map)
+    for packet_type in classifier.packet_types:
+        if packet_type in classifier.flow_types:
+            for event, enemy_type in FLOW_EVENT_TO_ENEMY_MAP.items():
+                key_map[flow_event_key(packet_type, event)] = enemy_type or classifier.enemy_map[packet_type]
+    return key_map
+
+
+SPAWN_KEY_TO_ENEMY_MAP = build_spawn_key_map(PROTOCOL_CLASSIFIER)
+
+
+@functools.cache
+def scapy_layers():
+    """
+    The scapy layers process_packet() dissects with, as (Ether, ARP, IP, IPv6, TCP, UDP).
+    
+    Imported on first use, on the capture thread, so loading the game never
+    waits for scapy.
+    """
+    from scapy.layers.l2 import Ether, ARP
+    from scapy.layers.inet import IP, TCP, UDP
+    from scapy.layers.inet6 import IPv6
+    return Ether, ARP, IP, IPv6, TCP, UDP
+
+
+def build_spawn_list(due, counts, timestamps=None):
+    """
+    Expand {spawn key: spawns due} into the spawn dicts handed to the game state.
+    
+    `timestamps` maps spawn keys to the capture time of the packet behind the
+    spawn, carried as 'timestamp' so the game can measure packet-to-spawn latency.
+    """
+    spawns = []
+    for packet_type, spawn_count in due.items():
+        enemy_type = SPAWN_KEY_TO_ENEMY_MAP[packet_type]
+        timestamp = timestamps.get(packet_type) if timestamps else None
+        for _ in range(spawn_count):
+            spawns.append({
+                'enemy_type': enemy_type,
+                'packet_type': packet_type,
+                'count': counts.get(packet_type, 0),
+                'timestamp': timestamp,
+            })
+        log_event(log, f"{packet_type.upper()}→{enemy_type}", "Network spawn: %s -> %s enemy x%d",
+                  packet_type.upper(), enemy_type, spawn_count, count=spawn_count,
+                  packet_type=packet_type, enemy_type=enemy_type)
+    return spawns
+
+
+def build_heavy_hitter_spawn(talker, share, packets, timestamp=None):
+    """Spawn dict for a talker that dominated the last heavy hitter window."""
+    log_event(log, f"heavy_hitter {talker}", "Heavy hitter: %s sent %.0f%% of traffic (%d packets)",
+              talker, share * 100, packets, talker=talker, share=share, packets=packets)
+    return {
+        'enemy_type': HEAVY_HITTER_ENEMY_TYPE,
+        'packet_type': 'heavy_hitter',
+        'count': packets,
+        'talker': talker,
+        'share': share,
+        'timestamp': timestamp,
+    }
+
 
 class NetworkMonitor(threading.Thread):
     """
     Network packet monitor that captures packets and triggers enemy spawns in the game.
     
-    Packet types mapped to enemies:
-    - TCP -> Basic Enemy
-    - ICMP -> Fast Enemy  
-    - ARP -> Zigzag Enemy
-    - UDP -> Tank Enemy
+    Packet types and their enemies come from the protocol rules in
+    data/protocol_rules.json (DNS, HTTP, SSH, QUIC, ... with TCP, UDP, ICMP
+    and ARP as catch-alls), compiled into O(1) lookup tables.
+    
+    Capture backends:
+    - 'scapy' -> scapy sniff(), every packet dissected (portable)
+    - 'mmap'  -> AF_PACKET TPACKET_V3 ring, frames classified in place (Linux)
+    - 'pcap'  -> offline replay of pcap_path at replay_speed (0 = as fast as possible)
+    
+    With track_flows, packet types whose rule sets "flows" (connection-oriented
+    ones such as SSH, HTTP(S), QUIC and the TCP/UDP catch-alls) spawn from connection events in a bounded flow table
+    (start / end / byte volume) instead of from every packet. Flow event keys carry
+    the packet type ('https:flow_start'), and a new connection spawns its rule's enemy.
+    
+    With track_distinct_sources, source addresses go into a sliding-window
+    HyperLogLog so the game can scale difficulty with how many hosts are talking.
+    With track_heavy_hitters, a talker sending most of the traffic is reported
+    as a 'heavy_hitter' spawn tagged with its address.
+    
+    With record_dir, every captured frame is also written to rotating pcap
+    segments in that directory by a background writer (see src/pcap_recorder.py).
     """
     
-    def __init__(self, interface=None, spawn_cooldown=NETWORK_SPAWN_COOLDOWN):
+    def __init__(self, interface=None, spawn_controller=None, backend=NETWORK_CAPTURE_BACKEND,
+                 pcap_path=NETWORK_REPLAY_PCAP, replay_speed=NETWORK_REPLAY_SPEED, track_flows=NETWORK_TRACK_FLOWS,
+                 track_distinct_sources=NETWORK_TRACK_DISTINCT_SOURCES,
+                 track_heavy_hitters=NETWORK_TRACK_HEAVY_HITTERS, record_dir=NETWORK_RECORD_DIR):
         super().__init__(daemon=True)
         self.stop_event = threading.Event()
-        self.spawn_cooldown = spawn_cooldown
-        self.last_spawn_time = {}  # Track last spawn time per enemy type
+        self.spawn_controller = spawn_controller or SpawnController()
         self.interface = interface
-        self.packet_count = {'tcp': 0, 'icmp': 0, 'arp': 0, 'udp': 0}
+        self.backend = backend
+        self.pcap_path = pcap_path
+        self.replay_speed = replay_speed
+        self.capture_clock = backend == 'pcap' and not replay_speed  # Unpaced replay keeps capture timestamps
+        self.capture = None  # Opened capture backend
+        self.error = None  # Exception that ended capture unexpectedly
+        self.restart_count = 0  # Captures reopened after a failure
+        self.downtime = 0.0  # Seconds spent without a working capture between failures
+        self.classifier = PROTOCOL_CLASSIFIER
+        self.packet_count = dict.fromkeys(self.classifier.packet_types, 0)
+        self.spawn_feed = SpawnFeed(SPAWN_KEY_TO_ENEMY_MAP)  # Capture thread -> game loop
+        self.flow_table = FlowTable(self.emit) if track_flows else None
+        self.distinct_sources = WindowedHyperLogLog() if track_distinct_sources else None
+        self.heavy_hitters = HeavyHitterDetector(self.report_heavy_hitter) if track_heavy_hitters else None
+        self.track_sources = self.distinct_sources is not None or self.heavy_hitters is not None
+        self.heavy_hitter_reports = deque(maxlen=16)  # Capture thread -> game loop, (talker, share, packets, timestamp)
+        self.metrics = CaptureMetrics()
+        self.recorder = PcapRecorder(record_dir, prefix=interface or 'capture') if record_dir else None
+        self.last_key_time = {}  # Spawn key -> capture time of its last drained packet (game thread)
+    
+    def process_packet(self, packet, timestamp=None):
+        """Process captured scapy packet and determine if enemy should be spawned."""
+        Ether, ARP, IP, IPv6, TCP, UDP = scapy_layers()
+        self.metrics.packets_seen += 1
+        if self.recorder is not None:
+            from scapy.config import conf
+            linktype = conf.l2types.layer2num.get(type(packet), DLT_EN10MB)
+            self.recorder.record(getattr(packet, 'original', None) or bytes(packet), timestamp=timestamp,
+                                 linktype=linktype)
+        classifier = self.classifier
+        network = packet.getlayer(IP) or packet.getlayer(IPv6)
         
-        # Initialize last spawn times
-        for packet_type in PACKET_TO_ENEMY_MAP.keys():
-            self.last_spawn_time[packet_type] = 0
-    
-    def process_packet(self, packet):
-        """Process captured packet and determine if enemy should be spawned."""
-        enemy_type = None
-        packet_type = None
+        if network is None:
+            # Non-IP frame: classify on the ethertype
+            if packet.haslayer(ARP):
+                self.record_packet(classifier.classify_ethertype(ETH_P_ARP), timestamp, source=packet[ARP].psrc)
+            elif packet.haslayer(Ether):
+                self.record_packet(classifier.classify_ethertype(packet[Ether].type), timestamp)
+            return
         
-        # Determine packet type and corresponding enemy
-        if packet.haslayer(TCP):
-            packet_type = 'tcp'
-            enemy_type = PACKET_TO_ENEMY_MAP['tcp']
-        elif packet.haslayer(ICMP):
-            packet_type = 'icmp'
-            enemy_type = PACKET_TO_ENEMY_MAP['icmp']
-        elif packet.haslayer(ARP):
-            packet_type = 'arp'
-            enemy_type = PACKET_TO_ENEMY_MAP['arp']
-        elif packet.haslayer(UDP):
-            packet_type = 'udp'
-            enemy_type = PACKET_TO_ENEMY_MAP['udp']
+        # Port-aware lookup on the outer IP header's protocol
+        proto = network.proto if isinstance(network, IP) else network.nh
+        transport = network.payload
+        has_ports = isinstance(transport, (TCP, UDP))
+        if has_ports:
+            packet_type = classifier.classify_ip(proto, transport.sport, transport.dport)
+        else:
+            packet_type = classifier.classify_ip(proto)
         
-        if enemy_type and packet_type:
-            self.packet_count[packet_type] += 1
-            current_time = time.time()
-            last_time = self.last_spawn_time.get(packet_type, 0)
-            
-            # Rate limiting: only spawn if cooldown has passed
-            if current_time - last_time > self.spawn_cooldown:
-                self.last_spawn_time[packet_type] = current_time
-                
-                # Create and post the custom event to pygame
-                try:
-                    spawn_event = pygame.event.Event(
-                        ENEMY_SPAWN_EVENT, 
-                        {
-                            'enemy_type': enemy_type,
-                            'packet_type': packet_type,
-                            'source': 'network'
-                        }
-                    )
-                    pygame.event.post(spawn_event)
-                    print(f"Network spawn: {packet_type.upper()} -> {enemy_type} enemy")
-                except:
-                    # If pygame isn't initialized yet, just skip
-                    pass
+        if self.flow_table is None or not has_ports or packet_type not in classifier.flow_types:
+            self.record_packet(packet_type, timestamp, source=network.src)
+            return
+        
+        # Connection identity for the flow table
+        closing = proto == IPPROTO_TCP and bool(int(transport.flags) & (TCP_FIN | TCP_RST))
+        flow_key = make_flow_key(proto, network.src, transport.sport, network.dst, transport.dport)
+        self.record_packet(packet_type, timestamp, flow_key, len(packet), closing, network.src)
+    
+    def process_frame(self, buf, offset=0, length=None, timestamp=None):
+        """Process a raw Ethernet frame in place (mmap ring and pcap replay backends)."""
+        self.metrics.packets_seen += 1
+        if self.recorder is not None:
+            self.recorder.record(buf, offset, length, timestamp)
+        if self.flow_table is None and self.distinct_sources is None and self.heavy_hitters is None:
+            self.record_packet(self.classifier.classify_frame(buf, offset, length), timestamp)
+            return
+        
+        if length is None:
+            length = len(buf) - offset
+        packet_type, flow_key, closing, source = self.classifier.parse_flow(
+            buf, offset, length, self.flow_table is not None, self.track_sources)
+        self.record_packet(packet_type, timestamp, flow_key, length, closing, source)
+    
+    def record_packet(self, packet_type, timestamp=None, flow_key=None, length=0, closing=False, source=None):
+        """Count a classified packet and emit its spawn key toward the game loop."""
+        if packet_type is None:
+            return
+        
+        self.packet_count[packet_type] += 1
+        if timestamp is None:
+            timestamp = time.time()
+        
+        if source is not None:
+            if self.distinct_sources is not None:
+                self.distinct_sources.add(source, timestamp)
+            if self.heavy_hitters is not None:
+                self.heavy_hitters.update(source, timestamp)
+        
+        if flow_key is not None and self.flow_table is not None:
+            # Flow-tracked types spawn from connection events instead of raw packets
+            self.flow_table.update(flow_key, length, timestamp, closing, packet_type)
+        else:
+            self.emit(packet_type, timestamp)
+    
+    def emit(self, key, timestamp):
+        """Hand one spawn key (packet type or flow event) to the game loop through the spawn feed."""
+        self.spawn_feed.push(key, timestamp)
+    
+    def report_heavy_hitter(self, address, share, packets, timestamp):
+        """Queue a heavy hitter report for the game loop (capture thread, at most once per window)."""
+        self.heavy_hitter_reports.append((format_address(address), share, packets, timestamp))
+    
+    def poll_spawns(self, now=None):
+        """
+        Drain the spawn feed once per frame (game thread) and decide spawns in one batch.
+        
+        The packet counts feed the adaptive spawn controller, which turns the
+        estimated packet rate per protocol into spawns. Returns a list of spawn
+        dicts with 'enemy_type', 'packet_type' and 'count' (packets of that type
+        seen since the last poll); heavy hitter spawns also carry 'talker' and
+        'share'. 'timestamp' is the capture time of the newest packet of that
+        type read this frame (or of the last one read, for spawns the
+        controller releases between packets). `now` overrides the wall clock
+        so replays can be driven on the capture timeline.
+        """
+        current_time = time.time() if now is None else now
+        counts = {}
+        for packet_type, (count, newest) in self.spawn_feed.drain().items():
+            counts[packet_type] = count
+            self.last_key_time[packet_type] = newest
+        due = self.spawn_controller.poll(counts, current_time)
+        spawns = build_spawn_list(due, counts, self.last_key_time)
+        for report in self.drain_heavy_hitters():
+            spawns.append(build_heavy_hitter_spawn(*report))
+        return spawns
+    
+    def read_records(self):
+        """Spawn key counts since the last read as (newest timestamp, spawn key, count) records (game thread)."""
+        return self.spawn_feed.drain_records()
+    
+    def drain_heavy_hitters(self):
+        """Take the queued (talker, share, packets, timestamp) heavy hitter reports."""
+        reports = []
+        while self.heavy_hitter_reports:
+            reports.append(self.heavy_hitter_reports.popleft())
+        return reports
+    
+    def get_distinct_sources(self):
+        """
+        Estimated number of distinct source addresses over the sliding window.
+        
+        The window ends at the newest packet's timestamp, so replays are measured
+        on the capture timeline rather than the wall clock.
+        """
+        if self.distinct_sources is None:
+            return 0
+        return self.distinct_sources.count()
+    
+    def start(self):
+        """Start the capture thread; spawn rates are measured from now, so the first poll's packets count."""
+        self.spawn_controller.start(time.time())
+        super().start()
     
     def run(self):
-        """Main thread execution - start packet sniffing."""
-        print(f"🌐 Network Monitor started (interface: {self.interface or 'auto'})")
-        print("📡 Listening for packets: TCP→Fighter, ICMP→Interceptor, ARP→Scout, UDP→Gunship")
+        """
+        Main thread execution - capture until stopped, restarting after failures.
         
-        try:
-            # Start packet capture with BPF filter for efficiency
-            sniff(
-                iface=self.interface,
-                filter="tcp or icmp or arp or udp",
-                prn=self.process_packet,
-                stop_filter=lambda p: self.stop_event.is_set(),
-                store=False  # Don't store packets in memory
-            )
-        except PermissionError:
-            print("❌ Permission denied! Try:")
-            print("   sudo python main.py")
-            print("   OR (Linux): sudo setcap cap_net_raw,cap_net_admin=eip $(which python3)")
-        except Exception as e:
-            print(f"❌ Network monitor error: {e}")
+        Every backend polls with CAPTURE_POLL_TIMEOUT, so stop() is noticed
+        within that bound even on an idle interface. A capture that fails
+        (interface down, socket error) is reopened after an exponential
+        backoff that resets once a capture has stayed up for
+        CAPTURE_MAX_RESTART_DELAY. Permission errors and pcap replays are not
+        retried.
+        """
+        restart_delay = CAPTURE_RESTART_DELAY
+        failed_at = None
+        if self.recorder is not None:
+            self.recorder.start()
+        
+        while not self.stop_event.is_set():
+            opened_at = None
+            try:
+                self.capture = create_capture_backend(self.backend, self)
+                opened_at = time.monotonic()
+                if failed_at is None:
+                    log_event(log, 'monitor start', "Network Monitor started (interface: %s, backend: %s)",
+                              self.interface or 'auto', self.capture.name,
+                              interface=self.interface, backend=self.capture.name)
+                    mappings = ', '.join(f"{packet_type.upper()}→{enemy_type.title()}"
+                                         for packet_type, enemy_type in self.classifier.enemy_map.items())
+                    log_event(log, 'monitor listening', "Listening for packets: %s", mappings)
+                else:
+                    self.downtime += opened_at - failed_at
+                    log_event(log, 'monitor restart', "Network Monitor restarted (backend: %s, restart #%d, down %.1fs)",
+                              self.capture.name, self.restart_count, opened_at - failed_at,
+                              backend=self.capture.name, restarts=self.restart_count, down=opened_at - failed_at)
+                self.error = None
+                self.capture.run()
+                break  # Stopped, or the replay reached the end of its file
+            except PermissionError:
+                log_event(log, 'monitor permission', "Permission denied! Try: sudo python main.py "
+                          "OR (Linux): sudo setcap cap_net_raw,cap_net_admin=eip $(which python3)",
+                          level=logging.ERROR)
+                break
+            except Exception as e:
+                self.error = e
+                log_event(log, 'monitor error', "Network monitor error: %s", e, level=logging.ERROR, error=str(e))
+                if self.backend == 'pcap':
+                    break
+            finally:
+                if self.capture:
+                    self.capture.close()
+            
+            # Back off before reopening; a capture that stayed up long enough starts over
+            now = time.monotonic()
+            if opened_at is not None and now - opened_at >= CAPTURE_MAX_RESTART_DELAY:
+                restart_delay = CAPTURE_RESTART_DELAY
+            if failed_at is None or opened_at is not None:
+                failed_at = now
+            log_event(log, 'monitor backoff', "Restarting capture in %.1fs", restart_delay, restart_delay=restart_delay)
+            if self.stop_event.wait(restart_delay):
+                break
+            self.restart_count += 1
+            restart_delay = min(restart_delay * 2, CAPTURE_MAX_RESTART_DELAY)
         
-        print("🌐 Network Monitor stopped")
+        if failed_at is not None and self.error is not None:
+            self.downtime += time.monotonic() - failed_at  # Still down when stopped
+        if self.recorder is not None:
+            self.recorder.stop()
+        log_event(log, 'monitor stop', "Network Monitor stopped")
     
-    def stop(self):
-        """Signal the network monitor to stop."""
+    def stop(self, timeout=CAPTURE_STOP_TIMEOUT):
+        """
+        Signal the network monitor to stop and wait up to `timeout` seconds for it.
+        
+        Returns True once the capture thread has exited.
+        """
         self.stop_event.set()
+        if timeout and self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+        return not self.is_alive()
+    
+    def record_spawn_latency(self, seconds):
+        """Account the delay between a packet and the enemy it spawned (game thread)."""
+        if self.capture_clock:
+            return  # Packet times are on the capture timeline, not comparable with the wall clock
+        self.metrics.record_spawn_latency(seconds)
+    
+    def poll_kernel_stats(self):
+        """Fold the capture backend's kernel packet/drop counters into the metrics."""
+        capture = self.capture
+        if capture is None or not hasattr(capture, 'get_kernel_stats'):
+            return
+        try:
+            self.metrics.add_kernel_stats(*capture.get_kernel_stats())
+        except OSError:
+            pass  # Socket closed by the capture thread in the meantime
+    
+    def get_metrics(self):
+        """
+        Snapshot of the capture pipeline metrics (game thread).
+        
+        The per-protocol counters are copied in one step (dict.copy() runs
+        without releasing the GIL) before `packets_seen` is read. The capture
+        thread bumps `packets_seen` before classifying, so the snapshot never
+        shows more classified packets than were seen.
+        """
+        packets = self.packet_count.copy()
+        metrics = self.metrics
+        packets_seen = metrics.packets_seen
+        self.poll_kernel_stats()
+        return {
+            'packets_seen': packets_seen,
+            'packets_classified': packets,
+            'packets_unclassified': max(0, packets_seen - sum(packets.values())),
+            'kernel_packets': metrics.kernel_packets,
+            'kernel_drops': metrics.kernel_drops,
+            'feed_high_water': self.spawn_feed.high_water,
+            'spawns_suppressed': self.spawn_controller.get_suppressed(),
+            'pps': self.spawn_controller.get_rates(),
+            'spawn_latency_ms': metrics.latency_snapshot(),
+            'capture_restarts': self.restart_count,
+            'capture_downtime': self.downtime,
+        }
     
     def get_stats(self):
         """Get packet capture statistics."""
-        return self.packet_count.copy()
\ No newline at end of file
+        stats = self.packet_count.copy()
+        stats['packets_seen'] = self.metrics.packets_seen
+        self.poll_kernel_stats()
+        stats['kernel_packets'] = self.metrics.kernel_packets
+        stats['kernel_drops'] = self.metrics.kernel_drops
+        stats['feed_high_water'] = self.spawn_feed.high_water
+        stats['pps'] = self.spawn_controller.get_rates()
+        stats['spawns_suppressed'] = sum(self.spawn_controller.get_suppressed().values())
+        stats['capture_restarts'] = self.restart_count
+        stats['capture_downtime'] = self.downtime
+        if self.flow_table is not None:
+            stats.update(self.flow_table.get_stats())
+        if self.heavy_hitters is not None:
+            stats.update(self.heavy_hitters.get_stats())
+        if self.recorder is not None:
+            stats.update(self.recorder.get_stats())
+        if self.distinct_sources is not None:
+            stats['distinct_sources'] = int(self.get_distinct_sources())
+        return stats
\ No newline at end of file
@@ -0,0 +1,315 @@
+"""
+Data-driven packet classification.
+
+Rules in data/protocol_rules.json map ethertypes, IP protocols and TCP/UDP
+port ranges to packet types (DNS, HTTP, SSH, QUIC, ...) and enemy types.
+ProtocolClassifier compiles them into lookup tables (a dict per ethertype /
+IP protocol and a 64 KiB port table per transport), so classifying a packet
+is a couple of indexing operations however many rules there are. It also
+generates the BPF filter that drops traffic no rule matches in the kernel.
+
+Capture backends that hand us raw Ethernet frames (mmap ring, pcap replay)
+classify them by peeking at header bytes in place, so no per-packet Python
+objects are created. parse_flow() does the same walk but also pulls out the
+5-tuple for connection tracking and the source address for distinct-source
+counting; it only copies addresses out of the buffer for packets that
+actually need them.
+"""
+
+import ipaddress
+import json
+import os
+from src.settings import PACKET_TO_ENEMY_MAP
+
+# Ethertypes
+ETH_P_IP = 0x0800
+ETH_P_ARP = 0x0806
+ETH_P_IPV6 = 0x86DD
+ETH_P_8021Q = 0x8100
+ETH_P_8021AD = 0x88A8
+
+# IP protocol numbers
+IPPROTO_ICMP = 1
+IPPROTO_TCP = 6
+IPPROTO_UDP = 17
+IPPROTO_ICMPV6 = 58
+
+# TCP flags that end a connection
+TCP_FIN = 0x01
+TCP_RST = 0x04
+
+ETH_HEADER_LEN = 14
+VLAN_TAG_LEN = 4
+ARP_IPV4_LEN = 28
+
+# Names accepted in protocol rules
+IP_PROTO_NAMES = {'icmp': IPPROTO_ICMP, 'tcp': IPPROTO_TCP, 'udp': IPPROTO_UDP, 'icmpv6': IPPROTO_ICMPV6}
+ETHERTYPE_NAMES = {'arp': ETH_P_ARP}
+
+# libpcap filter primitives per IP protocol
+BPF_PROTO_NAMES = {IPPROTO_ICMP: 'icmp', IPPROTO_TCP: 'tcp', IPPROTO_UDP: 'udp', IPPROTO_ICMPV6: 'icmp6'}
+
+# Transports with port-aware rules
+PORT_PROTOS = (IPPROTO_TCP, IPPROTO_UDP)
+PORT_COUNT = 1 << 16
+MAX_PORT_RULES = 255  # Port tables store rule indices in bytes
+
+
+def default_protocol_rules():
+    """Rules used if data/protocol_rules.json is missing: the four original packet types"""
+    return [
+        {'name': 'tcp', 'ip_proto': ['tcp'], 'enemy': PACKET_TO_ENEMY_MAP['tcp'], 'flows': True},
+        {'name': 'udp', 'ip_proto': ['udp'], 'enemy': PACKET_TO_ENEMY_MAP['udp'], 'flows': True},
+        {'name': 'icmp', 'ip_proto': ['icmp', 'icmpv6'], 'enemy': PACKET_TO_ENEMY_MAP['icmp']},
+        {'name': 'arp', 'ethertype': 'arp', 'enemy': PACKET_TO_ENEMY_MAP['arp']},
+    ]
+
+
+def load_protocol_classifier(path=os.path.join('data', 'protocol_rules.json')):
+    """Load protocol rules from JSON and compile them"""
+    try:
+        with open(path, 'r') as f:
+            rules = json.load(f)['rules']
+    except (FileNotFoundError, json.JSONDecodeError):
+        rules = default_protocol_rules()
+    return ProtocolClassifier(rules)
+
+
+def resolve_number(names, value, rule_name):
+    """Rule field -> number: a known name, an int or a hex string like '0x88cc'."""
+    if isinstance(value, int):
+        return value
+    if value in names:
+        return names[value]
+    try:
+        return int(value, 0)
+    except (TypeError, ValueError):
+        raise ValueError(f"protocol rule '{rule_name}': unknown protocol {value!r}") from None
+
+
+def port_ranges(ports):
+    """Expand a rule's ports (ints or [low, high] pairs) into (low, high) tuples."""
+    for port in ports:
+        if isinstance(port, int):
+            yield port, port
+        else:
+            low, high = port
+            yield low, high
+
+
+class ProtocolClassifier:
+    """
+    Compiled protocol rules.
+
+    Rules are matched in file order: the first rule that claims an ethertype,
+    IP protocol or port wins. Port rules take precedence over protocol-only
+    rules, and the destination port is checked before the source port.
+    """
+
+    def __init__(self, rules):
+        self.packet_types = []  # Rule names, in rule order
+        self.enemy_map = {}  # Packet type -> enemy type
+        self.flow_types = set()  # Packet types that spawn from the flow table
+        self.type_names = [None]  # Port table index -> packet type (0 = no port rule)
+        self.ethertype_types = {}
+        self.proto_types = {}
+        self.port_tables = {proto: bytearray(PORT_COUNT) for proto in PORT_PROTOS}
+
+        for rule in rules:
+            self.add_rule(rule)
+
+    def add_rule(self, rule):
+        name = rule['name']
+        if name not in self.enemy_map:
+            self.packet_types.append(name)
+        self.enemy_map[name] = rule['enemy']
+        if rule.get('flows'):
+            self.flow_types.add(name)
+
+        if 'ethertype' in rule:
+            self.ethertype_types.setdefault(resolve_number(ETHERTYPE_NAMES, rule['ethertype'], name), name)
+
+        protos = [resolve_number(IP_PROTO_NAMES, proto, name) for proto in rule.get('ip_proto', [])]
+        if 'ports' not in rule:
+            for proto in protos:
+                self.proto_types.setdefault(proto, name)
+            return
+
+        if len(self.type_names) > MAX_PORT_RULES:
+            raise ValueError(f"protocol rule '{name}': more than {MAX_PORT_RULES} port rules")
+        index = len(self.type_names)
+        self.type_names.append(name)
+        for proto in protos:
+            table = self.port_tables.get(proto)
+            if table is None:
+                raise ValueError(f"protocol rule '{name}': ports only apply to tcp and udp")
+            for low, high in port_ranges(rule['ports']):
+                for port in range(low, high + 1):
+                    if not table[port]:
+                        table[port] = index
+
+    def classify_ip(self, proto, sport=0, dport=0):
+        """Packet type for an IP packet, or None."""
+        table = self.port_tables.get(proto)
+        if table is not None:
+            index = table[dport] or table[sport]
+            if index:
+                return self.type_names[index]
+        return self.proto_types.get(proto)
+
+    def classify_ethertype(self, ethertype):
+        """Packet type for a non-IP frame, or None."""
+        return self.ethertype_types.get(ethertype)
+
+    def classify_frame(self, buf, offset=0, length=None):
+        """Return the packet type of the Ethernet frame at buf[offset:], or None."""
+        if length is None:
+            length = len(buf) - offset
+        end = offset + length
+
+        if length < ETH_HEADER_LEN:
+            return None
+        ethertype = buf[offset + 12] << 8 | buf[offset + 13]
+        pos = offset + ETH_HEADER_LEN
+
+        # Skip 802.1Q / 802.1ad VLAN tags
+        while ethertype == ETH_P_8021Q or ethertype == ETH_P_8021AD:
+            if pos + VLAN_TAG_LEN > end:
+                return None
+            ethertype = buf[pos + 2] << 8 | buf[pos + 3]
+            pos += VLAN_TAG_LEN
+
+        if ethertype == ETH_P_IP:
+            if pos + 20 > end:
+                return None
+            proto = buf[pos + 9]
+            # Only the first fragment carries the transport header
+            l4 = pos + (buf[pos] & 0x0F) * 4 if not (buf[pos + 6] & 0x1F or buf[pos + 7]) else end
+        elif ethertype == ETH_P_IPV6:
+            if pos + 40 > end:
+                return None
+            proto = buf[pos + 6]
+            l4 = pos + 40
+        else:
+            return self.ethertype_types.get(ethertype)
+
+        if l4 + 4 > end:
+            return self.classify_ip(proto)
+        return self.classify_ip(proto, buf[l4] << 8 | buf[l4 + 1], buf[l4 + 2] << 8 | buf[l4 + 3])
+
+    def parse_flow(self, buf, offset=0, length=None, flows=True, sources=True):
+        """
+        Classify a frame and extract its connection identity.
+
+        Returns (packet_type, flow_key, closing, source). flow_key is a direction-independent
+        5-tuple (proto, addr_a, port_a, addr_b, port_b) for TCP/UDP packet types
+        that track flows and None for everything else; closing is True for TCP
+        segments carrying FIN or RST. source is the sender's IP address bytes
+        (ARP sender address for ARP), or None if the frame has no usable
+        network header.
+
+        Addresses are only copied out of the buffer for classified packets,
+        and only when they are asked for: flow keys with `flows`, sources with
+        `sources`. Anything else is read in place.
+        """
+        if length is None:
+            length = len(buf) - offset
+        end = offset + length
+
+        if length < ETH_HEADER_LEN:
+            return None, None, False, None
+        ethertype = buf[offset + 12] << 8 | buf[offset + 13]
+        pos = offset + ETH_HEADER_LEN
+
+        while ethertype == ETH_P_8021Q or ethertype == ETH_P_8021AD:
+            if pos + VLAN_TAG_LEN > end:
+                return None, None, False, None
+            ethertype = buf[pos + 2] << 8 | buf[pos + 3]
+            pos += VLAN_TAG_LEN
+
+        if ethertype == ETH_P_IP:
+            if pos + 20 > end:
+                return None, None, False, None
+            proto = buf[pos + 9]
+            src_at = pos + 12
+            dst_at = pos + 16
+            address_len = 4
+            l4 = pos + (buf[pos] & 0x0F) * 4 if not (buf[pos + 6] & 0x1F or buf[pos + 7]) else end
+        elif ethertype == ETH_P_IPV6:
+            if pos + 40 > end:
+                return None, None, False, None
+            proto = buf[pos + 6]
+            src_at = pos + 8
+            dst_at = pos + 24
+            address_len = 16
+            l4 = pos + 40
+        else:
+            packet_type = self.ethertype_types.get(ethertype)
+            if packet_type is None or not sources or ethertype != ETH_P_ARP or pos + ARP_IPV4_LEN > end:
+                return packet_type, None, False, None
+            return packet_type, None, False, bytes(buf[pos + 14:pos + 18])
+
+        if (proto != IPPROTO_TCP and proto != IPPROTO_UDP) or l4 + 4 > end:
+            packet_type = self.classify_ip(proto)
+            tracked = False
+        else:
+            sport = buf[l4] << 8 | buf[l4 + 1]
+            dport = buf[l4 + 2] << 8 | buf[l4 + 3]
+            packet_type = self.classify_ip(proto, sport, dport)
+            tracked = flows and packet_type in self.flow_types
+        if packet_type is None:
+            return None, None, False, None
+
+        src = bytes(buf[src_at:src_at + address_len]) if sources or tracked else None
+        if not tracked:
+            return packet_type, None, False, src
+        dst = bytes(buf[dst_at:dst_at + address_len])
+        closing = proto == IPPROTO_TCP and l4 + 14 <= end and bool(buf[l4 + 13] & (TCP_FIN | TCP_RST))
+        return packet_type, make_flow_key(proto, src, sport, dst, dport), closing, src if sources else None
+
+    def bpf_filter(self):
+        """
+        libpcap filter expression accepting exactly the traffic some rule matches.
+
+        Port rules only narrow the filter for transports without a protocol-wide
+        rule. Returns None if there are no rules.
+        """
+        clauses = []
+        for ethertype in self.ethertype_types:
+            clauses.append('arp' if ethertype == ETH_P_ARP else f"ether proto 0x{ethertype:04x}")
+
+        for proto in self.proto_types:
+            clauses.append(BPF_PROTO_NAMES.get(proto) or f"(ip proto {proto} or ip6 proto {proto})")
+
+        for proto, table in self.port_tables.items():
+            if proto in self.proto_types:
+                continue
+            # Merge the table back into contiguous port ranges
+            ports = []
+            port = 0
+            while port < PORT_COUNT:
+                if not table[port]:
+                    port += 1
+                    continue
+                low = port
+                while port < PORT_COUNT and table[port]:
+                    port += 1
+                ports.append(f"port {low}" if port - 1 == low else f"portrange {low}-{port - 1}")
+            if ports:
+                clauses.append(f"({BPF_PROTO_NAMES[proto]} and ({' or '.join(ports)}))")
+
+        return ' or '.join(clauses) if clauses else None
+
+
+def make_flow_key(proto, src, sport, dst, dport):
+    """Order the endpoints so both directions of a connection share one key."""
+    if (src, sport) <= (dst, dport):
+        return (proto, src, sport, dst, dport)
+    return (proto, dst, dport, src, sport)
+
+
+def format_address(address):
+    """Printable form of a source address from parse_flow (bytes) or scapy (already a string)."""
+    if isinstance(address, (bytes, bytearray)):
+        return str(ipaddress.ip_address(bytes(address)))
+    return str(address)
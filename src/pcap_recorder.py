@@ -0,0 +1,198 @@
+"""
+Rotating pcap recorder for the traffic that drove a session.
+
+The capture thread only appends (timestamp, frame bytes) to a bounded queue;
+a background writer thread batches them into classic pcap files through a
+large write buffer, so disk latency never reaches the capture path. When
+the queue is full, frames are counted as dropped instead of blocking. The
+open segment is flushed and fsynced every `sync_interval` seconds or
+`sync_bytes` bytes, whichever comes first, so a crash loses at most that
+much of it.
+
+Segments are named <prefix>-<start time>-<number>.pcap and rotate when they exceed
+`segment_bytes` or `segment_seconds`, or when the frames' link type
+changes, since a pcap file has one link type in its header; only the newest
+`max_segments` are kept. Any segment replays with the 'pcap' capture backend:
+    NETWORK_CAPTURE_BACKEND = 'pcap'
+    NETWORK_REPLAY_PCAP = 'recordings/capture-20260101-120000-0000.pcap'
+"""
+
+import logging
+import os
+import struct
+import threading
+import time
+from collections import deque
+
+from src.log import get_logger, log_event
+from src.settings import (
+    RECORD_SEGMENT_BYTES, RECORD_SEGMENT_SECONDS, RECORD_MAX_SEGMENTS,
+    RECORD_QUEUE_CAPACITY, RECORD_SNAPLEN, RECORD_FLUSH_INTERVAL, RECORD_SYNC_INTERVAL, RECORD_SYNC_BYTES,
+)
+
+PCAP_MAGIC = 0xa1b2c3d4  # Microsecond timestamps
+DLT_EN10MB = 1  # Ethernet
+PCAP_HEADER = struct.Struct('<IHHiIII')
+RECORD_HEADER = struct.Struct('<IIII')
+WRITE_BUFFER_SIZE = 1 << 20
+
+log = get_logger('recorder')
+
+
+class PcapRecorder:
+    """Buffered, rotating pcap writer fed from a capture thread."""
+
+    def __init__(self, directory, prefix='capture', segment_bytes=RECORD_SEGMENT_BYTES,
+                 segment_seconds=RECORD_SEGMENT_SECONDS, max_segments=RECORD_MAX_SEGMENTS,
+                 capacity=RECORD_QUEUE_CAPACITY, snaplen=RECORD_SNAPLEN,
+                 sync_interval=RECORD_SYNC_INTERVAL, sync_bytes=RECORD_SYNC_BYTES):
+        self.directory = directory
+        self.prefix = prefix
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.max_segments = max_segments
+        self.capacity = capacity
+        self.snaplen = snaplen
+        self.sync_interval = sync_interval
+        self.sync_bytes = sync_bytes
+        self.queue = deque()  # Capture thread appends, writer thread pops
+        self.stop_event = threading.Event()
+        self.writer = None
+
+        # Current segment (writer thread only)
+        self.file = None
+        self.path = None
+        self.segment_started = 0.0
+        self.segment_size = 0
+        self.segment_number = 0
+        self.linktype = None  # Link type in the current segment's header
+        self.synced_at = 0.0  # Wall time of the current segment's last sync
+        self.unsynced = 0  # Bytes written since then
+        self.segments = []  # Paths of the retained segments, oldest first
+
+        # Statistics
+        self.packets = 0
+        self.bytes = 0
+        self.dropped = 0  # Written by the capture thread only
+        self.syncs = 0
+
+    def start(self):
+        """Start the writer thread; segments left by earlier sessions count toward retention."""
+        os.makedirs(self.directory, exist_ok=True)
+        previous = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                    if name.startswith(f"{self.prefix}-") and name.endswith('.pcap')]
+        self.segments = sorted(previous, key=os.path.getmtime)
+        self.stop_event.clear()
+        self.writer = threading.Thread(target=self.run, daemon=True)
+        self.writer.start()
+
+    def record(self, buf, offset=0, length=None, timestamp=None, linktype=DLT_EN10MB):
+        """
+        Capture thread: queue one frame, dropping it if the writer has fallen behind.
+
+        The frame is copied, since ring slots are handed back to the kernel.
+        `linktype` is the frame's DLT_* link layer type.
+        """
+        if len(self.queue) >= self.capacity:
+            self.dropped += 1
+            return
+        if length is None:
+            length = len(buf) - offset
+        caplen = min(length, self.snaplen)
+        self.queue.append((time.time() if timestamp is None else timestamp, bytes(buf[offset:offset + caplen]),
+                           length, linktype))
+
+    def run(self):
+        """Writer thread: drain the queue in batches until stopped, then flush what is left."""
+        queue = self.queue
+        while not self.stop_event.is_set():
+            if queue:
+                self.write_pending()
+            else:
+                self.stop_event.wait(RECORD_FLUSH_INTERVAL)
+            if self.unsynced and (self.unsynced >= self.sync_bytes
+                                  or time.time() - self.synced_at >= self.sync_interval):
+                self.sync()
+        self.write_pending()
+        self.close_segment()
+
+    def write_pending(self):
+        queue = self.queue
+        for _ in range(len(queue)):
+            timestamp, data, length, linktype = queue.popleft()
+            if self.file is None or linktype != self.linktype or self.should_rotate(timestamp):
+                self.open_segment(timestamp, linktype)
+            seconds = int(timestamp)
+            self.file.write(RECORD_HEADER.pack(seconds, int((timestamp - seconds) * 1e6), len(data), length))
+            self.file.write(data)
+            written = RECORD_HEADER.size + len(data)
+            self.segment_size += written
+            self.unsynced += written
+            self.bytes += written
+            self.packets += 1
+
+    def should_rotate(self, timestamp):
+        return (self.segment_size >= self.segment_bytes
+                or timestamp - self.segment_started >= self.segment_seconds)
+
+    def open_segment(self, timestamp, linktype):
+        """Start a new segment file and prune segments beyond the retention limit."""
+        self.close_segment()
+        started = time.strftime('%Y%m%d-%H%M%S', time.localtime(timestamp))
+        path = os.path.join(self.directory, f"{self.prefix}-{started}-{self.segment_number:04d}.pcap")
+        self.segment_number += 1  # Keeps names unique and ordered when segments rotate within a second
+
+        self.file = open(path, 'wb', buffering=WRITE_BUFFER_SIZE)
+        self.file.write(PCAP_HEADER.pack(PCAP_MAGIC, 2, 4, 0, 0, self.snaplen, linktype))
+        self.path = path
+        self.linktype = linktype
+        self.synced_at = time.time()
+        self.unsynced = PCAP_HEADER.size
+        self.segment_started = timestamp
+        self.segment_size = PCAP_HEADER.size
+        self.segments.append(path)
+
+        while len(self.segments) > self.max_segments:
+            oldest = self.segments.pop(0)
+            try:
+                os.remove(oldest)
+            except OSError as e:
+                log_event(log, 'prune', "Could not prune old capture segment %s: %s", oldest, e,
+                          level=logging.WARNING, segment=oldest)
+
+    def sync(self):
+        """Push the current segment's buffered frames through to disk."""
+        if self.file is None:
+            return
+        self.file.flush()
+        try:
+            os.fsync(self.file.fileno())
+        except OSError as e:
+            log_event(log, 'sync', "Could not sync capture segment %s: %s", self.path, e,
+                      level=logging.WARNING, segment=self.path)
+        self.synced_at = time.time()
+        self.unsynced = 0
+        self.syncs += 1
+
+    def close_segment(self):
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+            self.file = None
+
+    def stop(self, timeout=None):
+        """Stop the writer after it has flushed the queued frames."""
+        self.stop_event.set()
+        if self.writer is not None:
+            self.writer.join(timeout)
+            self.writer = None
+
+    def get_stats(self):
+        return {
+            'record_packets': self.packets,
+            'record_bytes': self.bytes,
+            'record_dropped': self.dropped,
+            'record_backlog': len(self.queue),
+            'record_syncs': self.syncs,
+            'record_segment': self.path,
+        }
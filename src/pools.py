@@ -0,0 +1,69 @@
+"""
+Free-list pools for short-lived sprites.
+
+A PooledSprite goes back to its SpritePool when it is killed instead of
+becoming garbage; the next acquire() pops it off the free list and reset()s
+it in place, so a steady stream of pickups reuses the same handful of
+objects (and their Rects and Vector2s) for the whole session.
+
+Bullets do not need this: BulletField (src/bullet_engine.py) is already a
+pool of preallocated array slots.
+"""
+
+
+class SpritePool:
+    """Free list of one PooledSprite class; make(pool) builds a new sprite when the list is empty."""
+
+    def __init__(self, make):
+        self.make = make
+        self.free = []
+        self.active = set()  # Sprites handed out and not yet killed
+        self.created = 0
+        self.reused = 0
+        self.high_water = 0  # Most sprites in use at once
+
+    def acquire(self, groups, *args):
+        """A sprite reset(*args) and added to `groups`, recycled when possible."""
+        if self.free:
+            sprite = self.free.pop()
+            self.reused += 1
+        else:
+            sprite = self.make(self)
+            self.created += 1
+        sprite.reset(*args)
+        sprite.add(groups)
+        self.active.add(sprite)
+        if len(self.active) > self.high_water:
+            self.high_water = len(self.active)
+        return sprite
+
+    def release(self, sprite):
+        if sprite in self.active:
+            self.active.discard(sprite)
+            self.free.append(sprite)
+
+    def reclaim(self):
+        """Take back every sprite still in use (their groups are being thrown away)."""
+        for sprite in list(self.active):
+            sprite.kill()
+
+    def get_stats(self):
+        return {
+            'size': self.created,
+            'in_use': len(self.active),
+            'free': len(self.free),
+            'high_water': self.high_water,
+            'reused': self.reused,
+        }
+
+
+class PooledSprite:
+    """Mixin for pygame sprites owned by a SpritePool: kill() returns the sprite to the pool."""
+
+    def kill(self):
+        super().kill()
+        self.pool.release(self)
+
+    def reset(self, *args):
+        """Reinitialize for a new life; called by SpritePool.acquire()"""
+        raise NotImplementedError
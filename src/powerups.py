@@ -1,5 +1,6 @@
 import pygame
 from src.settings import *
+from src.pools import PooledSprite
 import random
 
 POWERUP_SPEED = 100
@@ -64,23 +65,32 @@ class EnergyShieldEffect(PowerUpEffect):
     def remove(self, player):
         player.shield_health = 0
 
-# Power-up sprite that falls from the screen
-class PowerUp(pygame.sprite.Sprite):
+# Power-up sprite that falls from the screen, recycled through a SpritePool
+class PowerUp(PooledSprite, pygame.sprite.Sprite):
     POWERUP_TYPES = ['rapid_fire', 'spread_shot', 'shield']
 
-    def __init__(self, pos, asset_manager, groups):
-        super().__init__(groups)
-        self.powerup_type = random.choice(self.POWERUP_TYPES)
-        
-        self.image = asset_manager.get_image(self.powerup_type)
-        self.rect = self.image.get_rect(center=pos)
+    def __init__(self, pool, asset_manager):
+        super().__init__()
+        self.pool = pool
+        self.asset_manager = asset_manager
+        self.powerup_type = None
+        self.image = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
         
-        self.pos = pygame.math.Vector2(self.rect.center)
+        self.pos = pygame.math.Vector2()
         self.velocity = pygame.math.Vector2(0, POWERUP_SPEED)
 
+    def reset(self, pos):
+        """Drop from `pos` as a random power-up type"""
+        self.powerup_type = random.choice(self.POWERUP_TYPES)
+        self.image = self.asset_manager.get_image(self.powerup_type)
+        self.rect.size = self.image.get_size()
+        self.rect.center = pos
+        self.pos.update(self.rect.center)
+
     def update(self, dt):
         self.pos += self.velocity * dt
         self.rect.center = (round(self.pos.x), round(self.pos.y))
         
         if self.rect.top > SCREEN_HEIGHT:
-            self.kill()
\ No newline at end of file
+            self.kill()
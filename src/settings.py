@@ -1,4 +1,5 @@
 # Game constants and settings
+import os
 import pygame
 
 # Screen dimensions
@@ -29,9 +30,6 @@ POWERUP_DROP_CHANCE = 0.1  # 10% chance for an enemy to drop a powerup
 SCORE_FONT_SIZE = 24
 
 # --- 네트워크 스폰 설정 추가 ---
-# Pygame 커스텀 이벤트 정의
-ENEMY_SPAWN_EVENT = pygame.USEREVENT + 1
-
 # 패킷 타입과 적 종류 매핑
 PACKET_TO_ENEMY_MAP = {
     'tcp': 'interceptor',       # TCP -> 인터셉터 
@@ -40,5 +38,151 @@ PACKET_TO_ENEMY_MAP = {
     'udp': 'gunship',       # UDP -> 건쉽 
 }
 
-# 네트워크 스폰 쿨다운 (초)
-NETWORK_SPAWN_COOLDOWN = 1.0
\ No newline at end of file
+# 적응형 스폰 컨트롤러: 프로토콜별 pps(EWMA 추정) -> 초당 스폰 수
+# curve: 'linear' | 'sqrt' | 'log', scale: 곡선 배율, ceiling: 초당 최대 스폰 (토큰 충전 속도),
+# burst: 토큰 버킷 용량 (조용할 때 모아 두었다가 한 번에 낼 수 있는 스폰 수)
+NETWORK_RATE_TIME_CONSTANT = 1.0  # EWMA time constant (seconds)
+NETWORK_SPAWN_CURVES = {
+    'default': {'curve': 'log', 'scale': 0.2, 'ceiling': 1.0, 'burst': 2},
+    'tcp': {'curve': 'log', 'scale': 0.15, 'ceiling': 1.5, 'burst': 3},
+    'udp': {'curve': 'log', 'scale': 0.15, 'ceiling': 1.0, 'burst': 2},
+    'icmp': {'curve': 'sqrt', 'scale': 0.3, 'ceiling': 1.0, 'burst': 2},
+    'arp': {'curve': 'sqrt', 'scale': 0.4, 'ceiling': 0.5, 'burst': 2},
+    'flow_start': {'curve': 'linear', 'scale': 0.5, 'ceiling': 1.5, 'burst': 3},
+    'flow_end': {'curve': 'linear', 'scale': 0.3, 'ceiling': 1.0, 'burst': 2},
+    'flow_volume': {'curve': 'linear', 'scale': 1.0, 'ceiling': 0.5, 'burst': 2},
+}
+
+# --- 플로우(연결) 기반 스폰 ---
+# TCP/UDP는 패킷 단위가 아니라 연결 이벤트(시작/종료/전송량)로 적을 스폰
+NETWORK_TRACK_FLOWS = True
+FLOW_TABLE_CAPACITY = 4096       # 최대 추적 플로우 수 (초과 시 LRU 제거)
+FLOW_IDLE_TIMEOUT = 30.0         # 초
+FLOW_VOLUME_STEP = 1 << 20       # 플로우가 이 바이트 수를 넘을 때마다 'flow_volume' 이벤트
+
+# 플로우 이벤트와 적 종류 매핑 (스폰 키는 '<패킷 종류>:<이벤트>', 예: 'https:flow_start')
+# None이면 해당 프로토콜 규칙의 적을 그대로 사용
+FLOW_EVENT_TO_ENEMY_MAP = {
+    'flow_start': None,
+    'flow_volume': 'bomber',
+    'flow_end': 'scout',
+}
+
+# 캡처 백엔드: 'scapy' (기본), 'mmap' (Linux TPACKET_V3 링, 실패 시 scapy로 폴백)
+# 또는 'pcap' (NETWORK_REPLAY_PCAP 파일 재생)
+NETWORK_CAPTURE_BACKEND = 'scapy'
+
+# TPACKET_V3 mmap 링 설정
+MMAP_RING_BLOCK_SIZE = 1 << 20   # bytes per block (page size multiple)
+MMAP_RING_BLOCK_COUNT = 16
+MMAP_RING_FRAME_SIZE = 2048
+MMAP_RING_BLOCK_TIMEOUT = 50     # ms before the kernel retires a partially filled block
+
+# 캡처 실행 모드: 'thread' (게임 프로세스 내 스레드), 'process' (공유 메모리 워커 프로세스)
+# 또는 'daemon' (캡처 데몬 구독, 여러 세션이 캡처 하나를 공유)
+NETWORK_CAPTURE_MODE = 'thread'
+
+# 캡처 워커 프로세스 감시 설정 (초)
+CAPTURE_WORKER_STATS_INTERVAL = 0.5
+CAPTURE_WORKER_RESTART_DELAY = 1.0
+CAPTURE_WORKER_MAX_RESTART_DELAY = 30.0
+
+# 캡처 데몬 (python -m src.capture_daemon): 한 번 캡처/분류해 여러 게임 세션에 공유 메모리로 배포
+# NETWORK_CAPTURE_MODE = 'daemon'이면 게임은 직접 캡처하지 않고 데몬을 구독
+CAPTURE_DAEMON_NAME = 'striker1945-capture'  # 공유 메모리 이름 (인터페이스 지정 시 '<이름>-<인터페이스>')
+CAPTURE_DAEMON_STALE_AFTER = 3.0             # 하트비트가 이보다 오래되면 데몬이 죽은 것으로 보고 재연결 (초)
+CAPTURE_DAEMON_RETRY_INTERVAL = 1.0          # 데몬이 없을 때 구독 재시도 간격 (초)
+
+# pcap 재생 설정: 속도 1.0 = 실시간, N = N배속, 0 = 최대 속도
+NETWORK_REPLAY_PCAP = None
+NETWORK_REPLAY_SPEED = 1.0
+
+# 캡처 루프 폴링 타임아웃 (초)
+CAPTURE_POLL_TIMEOUT = 0.1
+
+# 고유 출발지(IP/MAC) 수 추정: 슬라이딩 윈도우 HyperLogLog (메모리 = 슬라이스 수 * 2^정밀도 바이트)
+NETWORK_TRACK_DISTINCT_SOURCES = True
+HLL_PRECISION = 10               # 1024 레지스터, 표준 오차 약 3%
+DISTINCT_WINDOW = 60.0           # 초
+DISTINCT_WINDOW_SLICES = 6
+DISTINCT_UPDATE_INTERVAL = 1.0   # 게임 루프에서 추정치를 갱신하는 주기 (초)
+
+# 고유 출발지 수 -> 웨이브 난이도 배율: 1 + scale * log2(고유 수 / baseline), [1, max]로 제한
+DISTINCT_DIFFICULTY_BASELINE = 16
+DISTINCT_DIFFICULTY_SCALE = 0.25
+DISTINCT_DIFFICULTY_MAX = 3.0
+
+# 헤비 히터(최대 발신자) 감지: 윈도우 동안 한 출발지가 전체 패킷의 일정 비율을 넘으면 보고
+NETWORK_TRACK_HEAVY_HITTERS = True
+HEAVY_HITTER_CAPACITY = 16       # space-saving 카운터 수 (1/capacity 이상 점유 발신자는 반드시 추적)
+HEAVY_HITTER_WINDOW = 5.0        # 초 (텀블링 윈도우)
+HEAVY_HITTER_SHARE = 0.5         # 트래픽 점유율 임계값
+HEAVY_HITTER_MIN_PACKETS = 1000  # 윈도우 내 최소 패킷 수 (조용한 네트워크의 오탐 방지)
+# 헤비 히터 발생 시 동작: 'elite' (발신자 주소가 붙은 정예 적) 또는 'boss' (보스전 시작)
+HEAVY_HITTER_ACTION = 'elite'
+HEAVY_HITTER_ENEMY_TYPE = 'bomber'
+ELITE_HEALTH_MULTIPLIER = 3.0
+ELITE_SCORE_MULTIPLIER = 3
+
+# 캡처 파이프라인 계측: 패킷 타임스탬프 -> 적 생성까지 지연 히스토그램 (HDR 방식 로그-선형 버킷)
+METRICS_LATENCY_MAX = 60.0           # 초, 이보다 큰 지연은 마지막 버킷에 기록
+METRICS_LATENCY_PRECISION_BITS = 5   # 2의 거듭제곱 구간당 16개 버킷 (버킷 폭 = 값의 1/16 이하)
+
+# 캡처 장애 복구: 인터페이스 다운/소켓 오류 시 지수 백오프로 재시작 (초)
+CAPTURE_RESTART_DELAY = 0.5
+CAPTURE_MAX_RESTART_DELAY = 30.0
+CAPTURE_STOP_TIMEOUT = 1.0       # stop()이 캡처 스레드 종료를 기다리는 최대 시간
+
+# 다중 인터페이스 캡처: 인터페이스 목록 (예: ['eth0', 'eth1']), None이면 단일 인터페이스 (자동 선택)
+NETWORK_INTERFACES = None
+MERGE_WINDOW = 0.01              # 인터페이스별 카운트를 합치는 시간 창 (초)
+MERGE_MAX_DELAY = 0.05           # 병합 피드가 느린 인터페이스를 기다리는 최대 시간 (초)
+MERGE_BUFFER_LIMIT = 1024        # 병합 대기 시간 창 수 상한 (초과분은 즉시 방출)
+
+# 캡처 녹화: 디렉터리를 지정하면 캡처한 프레임을 회전하는 pcap 세그먼트로 저장 (None이면 끔)
+NETWORK_RECORD_DIR = None
+RECORD_SEGMENT_BYTES = 64 << 20  # 세그먼트 최대 크기
+RECORD_SEGMENT_SECONDS = 300.0   # 세그먼트 최대 길이 (초)
+RECORD_MAX_SEGMENTS = 24         # 보관할 세그먼트 수 (초과 시 가장 오래된 것부터 삭제)
+RECORD_QUEUE_CAPACITY = 65536    # 기록 대기 프레임 상한 (초과 시 드롭, 캡처는 막지 않음)
+RECORD_SNAPLEN = 65535
+RECORD_FLUSH_INTERVAL = 0.05     # 기록 스레드 폴링 주기 (초)
+RECORD_SYNC_INTERVAL = 1.0       # 이 시간마다 세그먼트를 디스크에 동기화 (초, 비정상 종료 시 손실 상한)
+RECORD_SYNC_BYTES = 4 << 20      # 이만큼 기록되면 시간과 무관하게 동기화
+
+# 로깅: 기록은 큐를 거쳐 백그라운드 스레드에서 출력 ('human' 또는 'json')
+LOG_FORMAT = 'human'
+LOG_LEVEL = 'INFO'
+LOG_RATE_WINDOW = 5.0            # 키별 속도 제한 윈도우 (초)
+LOG_RATE_BURST = 3               # 윈도우당 그대로 출력할 기록 수 (나머지는 요약 한 줄로 집계)
+
+# 트래픽 HUD: 프로토콜별 pps 스파크라인 (T 키로 해상도 전환)
+TRAFFIC_HUD_ENABLED = True
+TRAFFIC_HISTORY_TIERS = (1.0, 10.0, 60.0)  # 티어별 버킷 길이 (초)
+TRAFFIC_HISTORY_LENGTH = 60                # 티어별 버킷 수
+TRAFFIC_HUD_WIDTH = 300
+TRAFFIC_HUD_ROWS = 6                       # 표시할 최대 프로토콜 수 (트래픽 많은 순)
+
+# 웨이브 구성: 레벨 파일 (data/wave_config.json 또는 src.level_compiler로 만든 레벨)
+WAVE_CONFIG_PATH = os.path.join('data', 'wave_config.json')
+MAX_WAVES = 10                   # 클리어까지의 웨이브 수
+WAVE_DURATION = 10000            # 일반 웨이브 제한 시간 (밀리초)
+BOSS_WAVE_INTERVAL = 5           # 레벨 파일에 "boss" 지정이 없으면 N번째 웨이브마다 보스전
+
+# pcap -> 레벨 컴파일러 (python -m src.level_compiler)
+LEVEL_BINS_PER_WAVE = 16         # 웨이브당 시간 구간 수 (피크 감지 해상도)
+LEVEL_MIN_ENEMIES = 6            # 트래픽이 가장 적은 웨이브의 적 수
+LEVEL_MAX_ENEMIES = 40           # 트래픽이 가장 많은 웨이브의 적 수
+LEVEL_MIN_SPAWN_DELAY = 300      # 밀리초
+LEVEL_MAX_SPAWN_DELAY = 1500     # 밀리초
+
+# 충돌 판정 공간 해시: 격자 칸 크기 (픽셀, 적/총알 크기의 1~2배가 적당)
+COLLISION_CELL_SIZE = 64
+
+# 총알 엔진 (NumPy 배열): 동시에 존재할 수 있는 최대 총알 수, 가득 차면 새 총알은 버림
+PLAYER_BULLET_CAPACITY = 1024
+ENEMY_BULLET_CAPACITY = 16384
+
+# 적 이동: True면 같은 패턴의 적들을 NumPy 배열로 한 번에 이동 (python -m src.movement_system),
+# False면 적마다 개별 패턴 객체로 이동 (기준 구현)
+ENEMY_MOVEMENT_BATCHED = True
@@ -0,0 +1,185 @@
+"""
+Constant-memory streaming sketches for traffic statistics.
+
+- HyperLogLog: distinct count estimate in 2^precision bytes
+- WindowedHyperLogLog: distinct count over a sliding time window, built from
+  a ring of HyperLogLog slices
+- SpaceSaving: top-k frequent items in `capacity` counters
+
+Items are hashed with a keyless 64-bit BLAKE2b digest rather than Python's
+built-in hash(), which is salted per process, so registers mean the same
+thing in every process and sketches from capture workers or earlier runs
+merge correctly. Source addresses repeat heavily, so digests are memoized
+for the most recently seen items.
+"""
+
+import functools
+import hashlib
+import math
+from src.settings import HLL_PRECISION, DISTINCT_WINDOW, DISTINCT_WINDOW_SLICES
+
+HASH_BITS = 64
+HASH_CACHE_SIZE = 4096  # Distinct items whose digests are memoized
+
+# 2^-rank lookup so estimates don't call pow() per register
+INVERSE_POWERS = [2.0 ** -rank for rank in range(HASH_BITS + 1)]
+
+
+@functools.lru_cache(maxsize=HASH_CACHE_SIZE)
+def stable_hash(item):
+    """64-bit hash of address bytes or a string, identical in every process."""
+    if isinstance(item, str):
+        item = item.encode()
+    return int.from_bytes(hashlib.blake2b(item, digest_size=HASH_BITS // 8).digest(), 'little')
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter with 2^precision one-byte registers."""
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+        self.rank_bits = HASH_BITS - precision
+
+        # Bias correction constant for this register count
+        if self.size >= 128:
+            self.alpha = 0.7213 / (1 + 1.079 / self.size)
+        else:
+            self.alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(self.size, 0.673)
+
+    def add(self, item):
+        """Add a hashable item (address bytes or string)."""
+        hashed = stable_hash(item)
+        index = hashed >> self.rank_bits
+        remainder = hashed & ((1 << self.rank_bits) - 1)
+        rank = self.rank_bits - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        """Estimated number of distinct items added."""
+        registers = self.registers
+        total = sum(INVERSE_POWERS[rank] for rank in registers)
+        estimate = self.alpha * self.size * self.size / total
+
+        # Small range correction (linear counting)
+        if estimate <= 2.5 * self.size:
+            zeros = registers.count(0)
+            if zeros:
+                estimate = self.size * math.log(self.size / zeros)
+        return estimate
+
+    def merge(self, other):
+        """Fold another sketch of the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("cannot merge HyperLogLog sketches of different precision")
+        self.registers[:] = bytes(map(max, self.registers, other.registers))
+
+    def clear(self):
+        self.registers[:] = bytes(self.size)
+
+
+class WindowedHyperLogLog:
+    """
+    Distinct count over roughly the last `window` seconds.
+
+    The window is split into `slices` HyperLogLog sketches in a ring. Adds go
+    to the slice for the packet's timestamp, slices that fall out of the window
+    are cleared as time advances, and count() merges the live slices. Memory is
+    fixed at slices * 2^precision bytes.
+    """
+
+    def __init__(self, window=DISTINCT_WINDOW, slices=DISTINCT_WINDOW_SLICES, precision=HLL_PRECISION):
+        self.window = window
+        self.slice_length = window / slices
+        self.slices = [HyperLogLog(precision) for _ in range(slices)]
+        self.precision = precision
+        self.current_slot = None  # Absolute slice number of the newest slice
+
+    def advance(self, timestamp):
+        """Rotate the ring so the slice for `timestamp` is current."""
+        slot = int(timestamp // self.slice_length)
+        if self.current_slot is None:
+            self.current_slot = slot
+        elif slot > self.current_slot:
+            # Clear every slice we skipped over (at most the whole ring)
+            for skipped in range(self.current_slot + 1, min(slot, self.current_slot + len(self.slices)) + 1):
+                self.slices[skipped % len(self.slices)].clear()
+            self.current_slot = slot
+        return self.slices[self.current_slot % len(self.slices)]
+
+    def add(self, item, timestamp):
+        self.advance(timestamp).add(item)
+
+    def count(self, now=None):
+        """Estimated distinct items over the window ending at `now` (or the newest packet)."""
+        if now is not None:
+            self.advance(now)
+        merged = HyperLogLog(self.precision)
+        for sketch in self.slices:
+            merged.merge(sketch)
+        return merged.count()
+
+    def merge(self, other):
+        """Fold another window (e.g. from a second capture thread) into this one, slice by slice."""
+        if len(other.slices) != len(self.slices) or other.slice_length != self.slice_length:
+            raise ValueError("cannot merge windows with different slicing")
+        if other.current_slot is None:
+            return
+        if self.current_slot is None or other.current_slot > self.current_slot:
+            self.advance(other.current_slot * self.slice_length)
+        oldest = self.current_slot - len(self.slices) + 1
+        for slot in range(max(oldest, other.current_slot - len(other.slices) + 1), other.current_slot + 1):
+            self.slices[slot % len(self.slices)].merge(other.slices[slot % len(other.slices)])
+
+
+class SpaceSaving:
+    """
+    Space-saving heavy hitters summary with a fixed number of counters.
+
+    Tracked items are a dict increment. An untracked item takes over the
+    smallest counter (inheriting its count as overestimate), which costs a
+    scan of `capacity` counters, so keep capacity small (any item with more
+    than 1/capacity of the stream is guaranteed to be tracked).
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.total = 0
+
+    def add(self, item, weight=1):
+        counts = self.counts
+        self.total += weight
+        count = counts.get(item)
+        if count is not None:
+            counts[item] = count + weight
+        elif len(counts) < self.capacity:
+            counts[item] = weight
+        else:
+            victim = min(counts, key=counts.__getitem__)
+            counts[item] = counts.pop(victim) + weight
+
+    def top(self):
+        """(item, count) of the most frequent item, or None if empty."""
+        if not self.counts:
+            return None
+        item = max(self.counts, key=self.counts.__getitem__)
+        return item, self.counts[item]
+
+    def most_common(self, n=None):
+        ranked = sorted(self.counts.items(), key=lambda entry: entry[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+    def merge(self, other):
+        """Fold another summary in, keeping the `capacity` largest counters."""
+        for item, count in other.counts.items():
+            self.counts[item] = self.counts.get(item, 0) + count
+        self.total += other.total
+        if len(self.counts) > self.capacity:
+            self.counts = dict(self.most_common(self.capacity))
+
+    def clear(self):
+        self.counts.clear()
+        self.total = 0
@@ -0,0 +1,214 @@
+"""
+Uniform grid broad-phase for sprite collisions.
+
+A SpatialHash files every sprite of one group under the grid cells its rect
+covers. sync() runs once per frame and only refiles sprites whose cell span
+changed, so a sprite that stays inside its cells costs one tuple compare.
+query(rect) then looks at the sprites in the cells `rect` covers instead of
+the whole group, which makes bullets-vs-enemies O(B + E) instead of O(B × E).
+
+Query results are exactly what pygame.sprite.spritecollide() would return:
+the same rect test, in group order, skipping sprites killed since the last
+sync(). may_hit() does the broad phase for a whole array of rects at once,
+for the NumPy bullet engine (src/bullet_engine.py).
+
+Compare against groupcollide at growing entity counts:
+    python -m src.spatial_hash
+"""
+
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+import pygame
+
+from src.settings import COLLISION_CELL_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT
+
+
+class SpatialHash:
+    """Incrementally maintained uniform grid over the rects of one sprite group."""
+
+    def __init__(self, group, cell_size=COLLISION_CELL_SIZE):
+        self.group = group
+        self.cell_size = cell_size
+        self.cells = {}  # (cell x, cell y) -> set of sprites
+        self.spans = {}  # Sprite -> (x0, y0, x1, y1) cells it is filed under, inclusive
+        self.order = None  # Sprite -> position in the group, built on demand once per sync()
+        self.refiled = 0  # Sprites filed or refiled by the last sync()
+
+    def span(self, rect):
+        size = self.cell_size
+        return rect.left // size, rect.top // size, (rect.right - 1) // size, (rect.bottom - 1) // size
+
+    def sync(self, group=None):
+        """Bring the grid up to date with the group: file new sprites, refile moved ones, drop departed ones."""
+        group = self.group if group is None else group
+        spans = self.spans
+        cell_size = self.cell_size
+        refiled = 0
+        for sprite in group:
+            rect = sprite.rect
+            span = (rect.left // cell_size, rect.top // cell_size,
+                    (rect.right - 1) // cell_size, (rect.bottom - 1) // cell_size)
+            old = spans.get(sprite)
+            if old == span:
+                continue
+            if old is not None:
+                self.unfile(sprite, old)
+            self.file(sprite, span)
+            spans[sprite] = span
+            refiled += 1
+        self.refiled = refiled
+        self.order = None
+
+        # Every group member is filed now, so any extra entry has left the group
+        if len(spans) > len(group):
+            for sprite in [sprite for sprite in spans if sprite not in group]:
+                self.unfile(sprite, spans.pop(sprite))
+
+    def file(self, sprite, span):
+        x0, y0, x1, y1 = span
+        cells = self.cells
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                cell = cells.get((x, y))
+                if cell is None:
+                    cells[(x, y)] = {sprite}
+                else:
+                    cell.add(sprite)
+
+    def unfile(self, sprite, span):
+        x0, y0, x1, y1 = span
+        cells = self.cells
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                cell = cells[(x, y)]
+                cell.discard(sprite)
+                if not cell:
+                    del cells[(x, y)]
+
+    def query(self, rect):
+        """Group members whose rect overlaps `rect`, in group order (same as spritecollide)."""
+        x0, y0, x1, y1 = self.span(rect)
+        cells = self.cells
+        if x0 == x1 and y0 == y1:
+            candidates = cells.get((x0, y0))
+            if not candidates:
+                return []
+        else:
+            candidates = set()
+            for x in range(x0, x1 + 1):
+                for y in range(y0, y1 + 1):
+                    cell = cells.get((x, y))
+                    if cell:
+                        candidates.update(cell)
+
+        group = self.group
+        hits = [sprite for sprite in candidates if rect.colliderect(sprite.rect) and sprite in group]
+        if len(hits) > 1:
+            # Group order, which is insertion order: a pooled sprite that left and rejoined sorts last, as in the group
+            if self.order is None:
+                self.order = {sprite: index for index, sprite in enumerate(group)}
+            hits.sort(key=self.order.__getitem__)
+        return hits
+
+    def may_hit(self, rects):
+        """
+        Boolean mask over an (n, 4) array of left, top, width, height: False
+        where a rect covers no occupied cell and so cannot hit anything.
+        """
+        if not len(rects) or not self.cells:
+            return np.zeros(len(rects), dtype=bool)
+        size = self.cell_size
+        x0 = rects[:, 0] // size
+        y0 = rects[:, 1] // size
+        x1 = (rects[:, 0] + rects[:, 2] - 1) // size
+        y1 = (rects[:, 1] + rects[:, 3] - 1) // size
+
+        # Occupancy over the occupied cells' bounding box, plus a border of empty cells everything outside clips to
+        occupied = np.array(list(self.cells), dtype=np.int64)
+        origin = occupied.min(axis=0) - 1
+        grid = np.zeros(occupied.max(axis=0) - origin + 2, dtype=bool)
+        grid[occupied[:, 0] - origin[0], occupied[:, 1] - origin[1]] = True
+        x0 -= origin[0]
+        x1 -= origin[0]
+        y0 -= origin[1]
+        y1 -= origin[1]
+        columns, rows = grid.shape
+
+        # Test each cell a rect spans; offsets past a rect's own span repeat its last cell
+        mask = np.zeros(len(rects), dtype=bool)
+        for dx in range(int((x1 - x0).max()) + 1):
+            x = np.minimum(x0 + dx, x1)
+            np.clip(x, 0, columns - 1, out=x)
+            for dy in range(int((y1 - y0).max()) + 1):
+                y = np.minimum(y0 + dy, y1)
+                np.clip(y, 0, rows - 1, out=y)
+                mask |= grid[x, y]
+        return mask
+
+    def collide_group(self, sprites, dokill=False):
+        """Same as pygame.sprite.groupcollide(sprites, self.group, dokill, False), with this grid as the second group."""
+        crashed = {}
+        for sprite in sprites:
+            hits = self.query(sprite.rect)
+            if hits:
+                crashed[sprite] = hits
+                if dokill:
+                    sprite.kill()
+        return crashed
+
+
+def benchmark(counts=(100, 200, 400, 800, 1600, 3200), frames=30, seed=1, density=400):
+    """
+    Time bullets-vs-enemies with groupcollide and with the grid, checking they agree.
+
+    The field grows with the entity count so there are always about `density`
+    entities per screen; at a fixed size the number of actual hits, and so
+    any exact method's cost, would grow quadratically.
+    """
+    rng = random.Random(seed)
+    print(f"{'entities':>8} {'groupcollide ms':>16} {'spatial hash ms':>16} {'hits':>6}")
+    for count in counts:
+        scale = math.sqrt(count / density)
+        width, height = int(SCREEN_WIDTH * scale), int(SCREEN_HEIGHT * scale)
+        bullets = pygame.sprite.Group()
+        enemies = pygame.sprite.Group()
+        for group, size, share in ((bullets, (4, 12), 0.5), (enemies, (28, 28), 0.5)):
+            for _ in range(int(count * share)):
+                sprite = pygame.sprite.Sprite(group)
+                sprite.rect = pygame.Rect(rng.randrange(width), rng.randrange(height), *size)
+        grid = SpatialHash(enemies)
+
+        brute = fast = 0.0
+        hits = 0
+        for _ in range(frames):
+            for sprite in enemies:
+                sprite.rect.move_ip(rng.randint(-3, 3), rng.randint(0, 3))  # Enemies drift, some change cells
+            start = time.perf_counter()
+            expected = pygame.sprite.groupcollide(bullets, enemies, False, False)
+            brute += time.perf_counter() - start
+
+            start = time.perf_counter()
+            grid.sync()
+            result = grid.collide_group(bullets)
+            fast += time.perf_counter() - start
+
+            assert result == expected, "spatial hash disagrees with groupcollide"
+            hits += len(result)
+        print(f"{count:>8} {brute / frames * 1000:>16.3f} {fast / frames * 1000:>16.3f} {hits // frames:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the collision broad-phase against groupcollide")
+    parser.add_argument('--frames', type=int, default=30, help="frames to average per entity count")
+    parser.add_argument('counts', type=int, nargs='*', default=[100, 200, 400, 800, 1600, 3200],
+                        help="total bullets + enemies per run")
+    args = parser.parse_args()
+    benchmark(args.counts, args.frames)
+
+
+if __name__ == '__main__':
+    main()
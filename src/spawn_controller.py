@@ -0,0 +1,133 @@
+import math
+from src.settings import NETWORK_SPAWN_CURVES, NETWORK_RATE_TIME_CONSTANT
+
+# Packet-rate -> spawn-rate response curves
+SPAWN_CURVES = {
+    'linear': lambda pps: pps,
+    'sqrt': math.sqrt,
+    'log': math.log1p,
+}
+
+
+class RateEstimator:
+    """Exponentially weighted packets-per-second estimate, updated once per frame."""
+
+    def __init__(self, time_constant=NETWORK_RATE_TIME_CONSTANT):
+        self.time_constant = time_constant
+        self.rate = 0.0
+
+    def update(self, count, dt):
+        """Fold `count` packets seen over `dt` seconds into the estimate."""
+        if dt <= 0:
+            return self.rate
+        # Time-aware smoothing factor so the estimate doesn't depend on frame rate
+        alpha = 1.0 - math.exp(-dt / self.time_constant)
+        self.rate += alpha * (count / dt - self.rate)
+        return self.rate
+
+
+class TokenBucket:
+    """
+    Spawn allowance: refills at `rate` tokens per second up to `capacity` (the
+    burst), and every released spawn takes one token. A quiet spell banks up
+    to `capacity` spawns for the next surge, while sustained traffic is held
+    to `rate` spawns per second.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+
+    def refill(self, dt):
+        self.tokens = min(self.capacity, self.tokens + self.rate * dt)
+
+    def take(self, count):
+        """Remove up to `count` whole tokens and return how many were taken."""
+        taken = min(count, int(self.tokens))
+        self.tokens -= taken
+        return taken
+
+
+class SpawnController:
+    """
+    Maps observed packets-per-second per protocol onto an enemy spawn rate.
+
+    Each key (packet type) gets a RateEstimator and a TokenBucket. Once per frame
+    the drained packet counts update the estimators, and the configured curve
+    turns the estimated pps into the spawns owed this frame. The bucket refills
+    at the curve's ceiling up to its burst size and releases owed spawns while
+    it has tokens, so a surge after a quiet spell gets up to `burst` spawns at
+    once but the sustained rate never exceeds the ceiling. Owed spawns the
+    bucket cannot cover are dropped. The spawns the ceiling cuts off the curve
+    are accounted per key as `suppressed`. Capture threads only ever count packets,
+    so the per-packet cost stays O(1).
+    """
+
+    def __init__(self, curves=NETWORK_SPAWN_CURVES, time_constant=NETWORK_RATE_TIME_CONSTANT):
+        self.curves = curves
+        self.time_constant = time_constant
+        self.estimators = {}
+        self.buckets = {}
+        self.owed = {}  # Key -> fraction of a spawn carried to the next frame
+        self.suppressed = {}  # Key -> spawns the curve asked for above its ceiling, integrated over time
+        self.last_poll_time = None
+
+    def get_curve_config(self, key):
+        """Curve for a spawn key; flow event keys ('https:flow_start') fall back to their event's curve."""
+        config = self.curves.get(key)
+        if config is None:
+            config = self.curves.get(key.rpartition(':')[2], self.curves['default'])
+        return config
+
+    def ensure_key(self, key):
+        if key not in self.estimators:
+            config = self.get_curve_config(key)
+            self.estimators[key] = RateEstimator(self.time_constant)
+            self.buckets[key] = TokenBucket(config.get('ceiling', float('inf')), config.get('burst', 3))
+            self.owed[key] = 0.0
+            self.suppressed[key] = 0.0
+
+    def spawn_rate(self, key, pps):
+        """Spawns per second the key's curve asks for at a packet rate (the bucket applies the ceiling)."""
+        config = self.get_curve_config(key)
+        curve = SPAWN_CURVES.get(config.get('curve', 'log'), SPAWN_CURVES['log'])
+        return config.get('scale', 1.0) * curve(pps)
+
+    def update(self, counts, dt):
+        """Advance every key by one frame and return {key: spawns due this frame}."""
+        for key in counts:
+            self.ensure_key(key)
+
+        spawns = {}
+        for key, estimator in self.estimators.items():
+            pps = estimator.update(counts.get(key, 0), dt)
+            rate = self.spawn_rate(key, pps)
+            bucket = self.buckets[key]
+            self.suppressed[key] += (rate - min(rate, bucket.rate)) * dt
+            owed = self.owed[key] + rate * dt
+            whole = int(owed)
+            self.owed[key] = owed - whole
+            bucket.refill(dt)
+            due = bucket.take(whole)
+            if due:
+                spawns[key] = due
+        return spawns
+
+    def start(self, now):
+        """Measure the first poll's interval from `now` (capture start), so its packets count."""
+        self.last_poll_time = now
+
+    def poll(self, counts, now):
+        """Advance the controller to `now` with the packet counts seen since the last poll."""
+        dt = 0.0 if self.last_poll_time is None else now - self.last_poll_time
+        self.last_poll_time = now
+        return self.update(counts, dt)
+
+    def get_rates(self):
+        """Current estimated packets-per-second for every key seen so far."""
+        return {key: estimator.rate for key, estimator in self.estimators.items()}
+
+    def get_suppressed(self):
+        """Spawns per key that the curve asked for but its ceiling cut off."""
+        return {key: int(suppressed) for key, suppressed in self.suppressed.items()}
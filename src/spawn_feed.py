@@ -0,0 +1,51 @@
+class SpawnFeed:
+    """
+    Per-key event counters between the capture thread and the game loop.
+
+    The capture thread bumps a monotonic counter and stores the event time for
+    every spawn key it emits; the game loop reads each key once per frame and
+    turns the counters into deltas against the values it saw last time. Every
+    counter is written by the producer only and the key set is fixed up front,
+    so the dicts never resize under the reader and no lock is needed. A read
+    costs O(keys) however many packets arrived, and nothing can overflow.
+    Each key's batch is stamped with its newest event time.
+    """
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self.events = dict.fromkeys(self.keys, 0)  # Events per key since start (producer only)
+        self.latest = dict.fromkeys(self.keys, 0.0)  # Time of the newest event per key (producer only)
+        self.seen = dict.fromkeys(self.keys, 0)  # Events already read per key (consumer only)
+        self.high_water = 0  # Most events taken by one read (consumer only)
+
+    def push(self, key, timestamp):
+        """Producer side: count one event for `key`."""
+        self.latest[key] = timestamp  # Stamp before counting, so a counted event always has its time
+        self.events[key] += 1
+
+    def drain(self):
+        """Consumer side: events since the last read as {key: (count, newest timestamp)}."""
+        events = self.events
+        seen = self.seen
+        batch = {}
+        total = 0
+        for key in self.keys:
+            count = events[key]
+            delta = count - seen[key]
+            if delta:
+                seen[key] = count
+                batch[key] = (delta, self.latest[key])
+                total += delta
+        if total > self.high_water:
+            self.high_water = total
+        return batch
+
+    def drain_records(self):
+        """Consumer side: events since the last read as (newest timestamp, key, count) records in time order."""
+        records = [(timestamp, key, count) for key, (count, timestamp) in self.drain().items()]
+        records.sort()
+        return records
+
+    def __len__(self):
+        """Events pushed but not read yet."""
+        return sum(self.events[key] - self.seen[key] for key in self.keys)
@@ -1,3 +1,4 @@
+import math
 import pygame
 from src.settings import *
 
@@ -41,14 +42,14 @@ class Player(pygame.sprite.Sprite):
         self.shield_health = 0
         self.shield_image = None
         
-        # Sprite groups will be set by the game state
+        # Sprite group and bullet field will be set by the game state
         self.all_sprites = None
-        self.bullet_group = None
+        self.bullets = None
         
-    def set_sprite_groups(self, all_sprites, bullet_group):
-        """Set sprite groups for bullet spawning"""
+    def set_sprite_groups(self, all_sprites, bullets):
+        """Set the sprite group and the BulletField player shots go into"""
         self.all_sprites = all_sprites
-        self.bullet_group = bullet_group
+        self.bullets = bullets
         
     def get_input(self):
         """Handle player input"""
@@ -75,25 +76,35 @@ class Player(pygame.sprite.Sprite):
             # Check for spread shot power-up
             if self.has_spread_shot:
                 # 3-way spread shot, distinct from weapon level
-                Bullet(self.rect.midtop, self.asset_manager, [self.all_sprites, self.bullet_group], angle=0)
-                Bullet(self.rect.center, self.asset_manager, [self.all_sprites, self.bullet_group], angle=-30)
-                Bullet(self.rect.center, self.asset_manager, [self.all_sprites, self.bullet_group], angle=30)
+                self.fire(self.rect.midtop, angle=0)
+                self.fire(self.rect.center, angle=-30)
+                self.fire(self.rect.center, angle=30)
             elif self.weapon_level == 1:
                 # Single bullet from center
-                Bullet(self.rect.midtop, self.asset_manager, [self.all_sprites, self.bullet_group])
+                self.fire(self.rect.midtop)
             elif self.weapon_level == 2:
                 # Two bullets from sides
-                Bullet((self.rect.left + 8, self.rect.top), self.asset_manager, [self.all_sprites, self.bullet_group])
-                Bullet((self.rect.right - 8, self.rect.top), self.asset_manager, [self.all_sprites, self.bullet_group])
+                self.fire((self.rect.left + 8, self.rect.top))
+                self.fire((self.rect.right - 8, self.rect.top))
             elif self.weapon_level >= 3:
                 # Three bullets: center and angled
-                Bullet(self.rect.midtop, self.asset_manager, [self.all_sprites, self.bullet_group])
-                Bullet((self.rect.left + 8, self.rect.top), self.asset_manager, [self.all_sprites, self.bullet_group], angle=-15)
-                Bullet((self.rect.right - 8, self.rect.top), self.asset_manager, [self.all_sprites, self.bullet_group], angle=15)
+                self.fire(self.rect.midtop)
+                self.fire((self.rect.left + 8, self.rect.top), angle=-15)
+                self.fire((self.rect.right - 8, self.rect.top), angle=15)
                 
             # Play shoot sound
             self.asset_manager.play_sound('shoot')
             
+    def fire(self, pos, angle=0):
+        """Spawn one bullet at `pos`, tilted `angle` degrees (rotated images are made once per angle)"""
+        image_id = self.bullets.image_id(('bullet', angle), bullet_image, self.asset_manager, angle)
+        if angle == 0:
+            velocity = (0, -BULLET_SPEED)
+        else:
+            angle_rad = math.radians(angle)
+            velocity = (math.sin(angle_rad) * BULLET_SPEED, -math.cos(angle_rad) * BULLET_SPEED)
+        self.bullets.spawn(pos, velocity, image_id)
+            
     def upgrade_weapon(self):
         """Upgrade weapon level"""
         self.weapon_level += 1
@@ -240,39 +251,12 @@ class Player(pygame.sprite.Sprite):
             screen.blit(self.image, self.rect)
 
 
-class Bullet(pygame.sprite.Sprite):
-    def __init__(self, pos, asset_manager, groups, angle=0):
-        super().__init__(groups)
-        
-        # Image and rect
-        self.image = asset_manager.get_image('bullet')
-        if angle != 0:
-            self.image = pygame.transform.rotate(self.image, angle)
-        self.rect = self.image.get_rect(center=pos)
-        
-        # Movement
-        self.pos = pygame.math.Vector2(self.rect.center)
-        
-        # Calculate velocity based on angle
-        if angle == 0:
-            self.velocity = pygame.math.Vector2(0, -BULLET_SPEED)
-        else:
-            # Convert angle to radians and create angled velocity
-            import math
-            angle_rad = math.radians(angle)
-            self.velocity = pygame.math.Vector2(
-                math.sin(angle_rad) * BULLET_SPEED,
-                -math.cos(angle_rad) * BULLET_SPEED
-            )
-            
-    def update(self, dt):
-        """Update bullet position"""
-        self.pos += self.velocity * dt
-        self.rect.center = (round(self.pos.x), round(self.pos.y))
-        
-        # Remove bullet when it goes off screen
-        if self.rect.bottom < 0 or self.rect.top > SCREEN_HEIGHT or self.rect.right < 0 or self.rect.left > SCREEN_WIDTH:
-            self.kill()
+def bullet_image(asset_manager, angle=0):
+    """Player bullet image, rotated for angled shots"""
+    image = asset_manager.get_image('bullet')
+    if angle != 0:
+        image = pygame.transform.rotate(image, angle)
+    return image
 
 
 class Enemy(pygame.sprite.Sprite):
@@ -0,0 +1,40 @@
+"""
+Startup timing report.
+
+Game startup is split into phases (imports, display init, asset load, state
+construction, first frame). Each mark() closes the phase running since the
+previous mark. Once the first frame is on screen, report() logs one line
+with every phase, so a slow import or asset shows up as a regression in the
+log instead of as a vague "the window takes longer to open".
+"""
+
+import time
+
+from src.log import get_logger, log_event
+
+log = get_logger('startup')
+
+
+class StartupTimer:
+    """Wall-clock durations of consecutive startup phases."""
+
+    def __init__(self, started=None):
+        # `started` lets the caller include time spent before the game modules were imported
+        self.started = time.perf_counter() if started is None else started
+        self.last = self.started
+        self.phases = {}  # Phase name -> seconds, in order
+
+    def mark(self, phase):
+        """Close `phase` at the current time."""
+        now = time.perf_counter()
+        self.phases[phase] = now - self.last
+        self.last = now
+
+    def total(self):
+        return self.last - self.started
+
+    def report(self):
+        """Log every phase in milliseconds, plus the total."""
+        breakdown = ', '.join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in self.phases.items())
+        log_event(log, 'startup', "Startup took %.0f ms: %s", self.total() * 1000, breakdown,
+                  **{f"{phase.replace(' ', '_')}_ms": round(seconds * 1000, 1) for phase, seconds in self.phases.items()})
@@ -2,10 +2,14 @@ import pygame
 from src.settings import *
 from src.sprites import Player
 from src.enemy import Enemy
-from src.attack_patterns import EnemyBullet
-from src.wave_manager import WaveManager
-from src.powerups import PowerUp
+from src.wave_manager import WaveManager, difficulty_from_distinct_sources
+from src.spatial_hash import SpatialHash
+from src.movement_system import MovementSystem
 import random
+import time
+from src.log import get_logger, log_event
+
+log = get_logger('gameplay')
 
 class State:
     """Base state class"""
@@ -16,6 +20,10 @@ class State:
         """Handle events for this state"""
         pass
         
+    def handle_network_spawns(self, spawns):
+        """Handle the network spawns decided this frame"""
+        pass
+        
     def update(self, dt):
         """Update state logic"""
         pass
@@ -32,15 +40,29 @@ class GameplayState(State):
         # Sprite groups
         self.all_sprites = pygame.sprite.Group()
         self.player_group = pygame.sprite.Group()
-        self.bullet_group = pygame.sprite.Group()  # Player bullets
         self.enemy_group = pygame.sprite.Group()
-        self.enemy_bullet_group = pygame.sprite.Group()  # Enemy bullets
         self.powerup_group = pygame.sprite.Group()  # Power-ups
+
+        # Bullets live in NumPy arrays rather than sprite groups; the arrays and
+        # the power-up pool belong to the game and are emptied for the new run
+        self.bullets = game.bullets  # Player bullets
+        self.enemy_bullets = game.enemy_bullets
+        self.bullets.clear()
+        self.enemy_bullets.clear()
+        self.powerup_pool = game.powerup_pool
+        self.powerup_pool.reclaim()
+
+        # Regular enemies' movement, advanced in batches once per frame
+        self.movement = MovementSystem() if ENEMY_MOVEMENT_BATCHED else None
+
+        # Collision broad-phase grids, refreshed once per frame in check_collisions
+        self.enemy_grid = SpatialHash(self.enemy_group)
+        self.powerup_grid = SpatialHash(self.powerup_group)
         
         # Create player
         player_pos = (SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100)
         self.player = Player(player_pos, game.asset_manager, pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
-        self.player.set_sprite_groups(self.all_sprites, self.bullet_group)
+        self.player.set_sprite_groups(self.all_sprites, self.bullets)
         self.all_sprites.add(self.player)
         self.player_group.add(self.player)
         
@@ -49,31 +71,47 @@ class GameplayState(State):
         self.game_won = False  # Victory state
         
         # Wave management
-        sprite_groups = [self.all_sprites, self.enemy_group, self.enemy_bullet_group]
-        self.wave_manager = WaveManager(game.asset_manager, self.player, sprite_groups)
+        sprite_groups = [self.all_sprites, self.enemy_group]
+        self.wave_manager = WaveManager(game.asset_manager, self.player, sprite_groups, self.enemy_bullets,
+                                        self.movement)
+        self.difficulty_timer = 0  # Seconds since the distinct source estimate was last read
+        
+        # Traffic sparklines, shared across restarts (redrawn only when a new bucket lands)
+        self.traffic_panel = game.traffic_panel
         
     def spawn_powerup(self, pos):
         """Spawns a power-up at a given position."""
-        PowerUp(pos, self.game.asset_manager, [self.all_sprites, self.powerup_group])
+        self.powerup_pool.acquire([self.all_sprites, self.powerup_group], pos)
         
     def handle_events(self, events):
         """Handle gameplay events"""
         for event in events:
-            # --- 네트워크 스폰 이벤트 처리 추가 ---
-            if event.type == ENEMY_SPAWN_EVENT:
-                if event.source == 'network':
-                    self.spawn_network_enemy(event.enemy_type)
-
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     self.game.running = False
+                elif event.key == pygame.K_t:
+                    self.traffic_panel.cycle_tier()
                 elif event.key == pygame.K_r and (self.player.is_dead or self.game_won):
                     # Restart game from game over or victory screen
                     self.game.state_manager.change_state('gameplay')
     
+    def handle_network_spawns(self, spawns):
+        """Spawn this frame's batch of network enemies"""
+        for spawn in spawns:
+            if 'talker' in spawn:
+                self.handle_heavy_hitter(spawn)
+            else:
+                self.spawn_network_enemy(spawn['enemy_type'], timestamp=spawn.get('timestamp'))
+    
+    def handle_heavy_hitter(self, spawn):
+        """A single talker dominated the traffic: start a boss battle for it or send an elite"""
+        if HEAVY_HITTER_ACTION == 'boss' and self.wave_manager.start_talker_boss(spawn['talker']):
+            return
+        self.spawn_network_enemy(spawn['enemy_type'], talker=spawn['talker'], timestamp=spawn.get('timestamp'))
+    
     # --- 네트워크 적 스폰을 위한 새로운 메서드 추가 ---
-    def spawn_network_enemy(self, enemy_type):
-        """Spawns an enemy from a network event."""
+    def spawn_network_enemy(self, enemy_type, talker=None, timestamp=None):
+        """Spawns an enemy from a network event (timestamp: capture time of the packet behind it)."""
         # 화면 상단 밖에서 랜덤한 x 위치에 스폰
         x = random.randint(50, SCREEN_WIDTH - 50)
         y = random.randint(-100, -50)
@@ -83,8 +121,14 @@ class GameplayState(State):
         sprite_groups = [self.all_sprites, self.enemy_group]
         
         # Enemy 인스턴스 생성
-        Enemy(spawn_pos, enemy_type, self.game.asset_manager, self.player, sprite_groups)
-        print(f"Spawning '{enemy_type}' at {spawn_pos} from network event.")
+        enemy = Enemy(spawn_pos, enemy_type, self.game.asset_manager, self.player, sprite_groups, self.enemy_bullets,
+                      self.movement)
+        if talker is not None:
+            enemy.make_elite(talker)
+        if timestamp is not None:
+            self.game.network_monitor.record_spawn_latency(time.time() - timestamp)
+        log_event(log, f"spawn {enemy_type}", "Spawning '%s' at %s from network event.",
+                  enemy_type, spawn_pos, enemy_type=enemy_type, position=spawn_pos)
         
     def update(self, dt):
         """Update gameplay state"""
@@ -92,9 +136,24 @@ class GameplayState(State):
         if self.game_won or self.player.is_dead:
             return
             
+        # Move bullets first: shots fired during this frame's sprite updates start moving next frame
+        self.bullets.update(dt)
+        self.enemy_bullets.update(dt)
+
+        # Batched enemy movement, before the enemies' own update() reads their positions
+        if self.movement is not None:
+            self.movement.update(dt)
+        
         # Update all sprites
         self.all_sprites.update(dt)
         
+        # Scale wave difficulty with the number of distinct hosts on the network
+        self.difficulty_timer += dt
+        if self.difficulty_timer >= DISTINCT_UPDATE_INTERVAL:
+            self.difficulty_timer = 0
+            distinct_sources = self.game.network_monitor.get_distinct_sources()
+            self.wave_manager.set_difficulty_multiplier(difficulty_from_distinct_sources(distinct_sources))
+        
         # Update wave manager (handles enemy spawning)
         self.wave_manager.update(dt)
         
@@ -108,8 +167,11 @@ class GameplayState(State):
         
     def check_collisions(self):
         """Handle all collision detection"""
+        # Same results as groupcollide/spritecollide, through the grids instead of all pairs
+        self.enemy_grid.sync()
+
         # Player bullets vs enemies
-        hits = pygame.sprite.groupcollide(self.bullet_group, self.enemy_group, True, False)
+        hits = self.bullets.collide_grid(self.enemy_grid)
         for bullet, enemies in hits.items():
             for enemy in enemies:
                 if enemy.take_damage():
@@ -119,21 +181,24 @@ class GameplayState(State):
                         self.spawn_powerup(enemy.rect.center)
                     
         # Player vs enemies (contact damage)
-        hits = pygame.sprite.spritecollide(self.player, self.enemy_group, False)
+        hits = self.enemy_grid.query(self.player.rect)
         if hits and not self.player.invulnerable:
             self.player.take_damage(30)  # Heavy damage from enemy contact
             # Remove one enemy on contact
             hits[0].kill()
             
         # Player vs enemy bullets
-        hits = pygame.sprite.spritecollide(self.player, self.enemy_bullet_group, True)
-        if hits and not self.player.invulnerable:
+        hits = self.enemy_bullets.collide_rect(self.player.rect)
+        self.enemy_bullets.kill(hits)
+        if len(hits) and not self.player.invulnerable:
             for bullet in hits:
                 self.player.take_damage(15)  # Moderate damage from bullets
         
-        # Player vs power-ups
-        hits = pygame.sprite.spritecollide(self.player, self.powerup_group, True)
+        # Player vs power-ups, including any dropped by this frame's kills
+        self.powerup_grid.sync()
+        hits = self.powerup_grid.query(self.player.rect)
         for powerup in hits:
+            powerup.kill()
             self.player.add_powerup(powerup.powerup_type)
             
     def draw(self, screen):
@@ -145,6 +210,14 @@ class GameplayState(State):
         for sprite in self.all_sprites:
             if sprite != self.player:
                 screen.blit(sprite.image, sprite.rect)
+        self.bullets.draw(screen)
+        self.enemy_bullets.draw(screen)
+        
+        # Label elite enemies / bosses with the talker address they stand for (rendered when tagged)
+        for enemy in self.enemy_group:
+            label = getattr(enemy, 'talker_label', None)
+            if label is not None:
+                screen.blit(label, label.get_rect(midbottom=enemy.rect.midtop))
         
         # Draw player with special handling for invulnerability
         self.player.draw(screen)
@@ -244,7 +317,7 @@ class GameplayState(State):
         
         # Wave transition message
         if wave_info['in_transition']:
-            if wave_info['wave_number'] % 5 == 0:
+            if wave_info['is_boss_wave']:
                 # Boss defeated message
                 transition_text = font.render(f"BOSS DEFEATED!", True, (255, 215, 0))  # Gold
                 transition_rect = transition_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
@@ -260,13 +333,17 @@ class GameplayState(State):
             
             # Check if next wave is a boss wave
             next_wave = wave_info['wave_number'] + 1
-            if next_wave % 5 == 0:
+            if self.wave_manager.is_boss(next_wave):
                 next_wave_text = font.render(f"BOSS INCOMING...", True, (255, 0, 0))  # Red warning
             else:
                 next_wave_text = font.render(f"Next Wave Starting...", True, WHITE)
             next_wave_rect = next_wave_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 40))
             screen.blit(next_wave_text, next_wave_rect)
         
+        # Traffic panel (top right)
+        if TRAFFIC_HUD_ENABLED:
+            self.traffic_panel.draw(screen, (SCREEN_WIDTH - 10, 10))
+        
         # Visual feedback for invulnerability
         if self.player.invulnerable:
             inv_text = font.render("INVULNERABLE", True, (255, 255, 0))
@@ -281,10 +358,7 @@ class GameplayState(State):
     def draw_game_over(self, screen):
         """Draw game over screen"""
         # Semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        screen.blit(overlay, (0, 0))
+        screen.blit(self.game.asset_manager.get_image('overlay'), (0, 0))
         
         # Game over text
         title_font = self.game.asset_manager.get_font('title')
@@ -305,10 +379,7 @@ class GameplayState(State):
     def draw_game_success(self, screen):
         """Draw victory screen"""
         # Semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        screen.blit(overlay, (0, 0))
+        screen.blit(self.game.asset_manager.get_image('overlay'), (0, 0))
         
         # Victory text
         title_font = self.game.asset_manager.get_font('title')
@@ -343,6 +414,16 @@ class MenuState(State):
     def __init__(self, game):
         super().__init__(game)
         
+        # The menu text never changes, so it is rendered once
+        title_font = game.asset_manager.get_font('title')
+        font = game.asset_manager.get_font('score')
+        self.texts = []
+        for text, text_font, offset in (("STRIKER 1945", title_font, -50),
+                                        ("Press SPACE to start", font, 50),
+                                        ("Press ESC to quit", font, 80)):
+            surface = text_font.render(text, True, WHITE)
+            self.texts.append((surface, surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + offset))))
+        
     def handle_events(self, events):
         """Handle menu events"""
         for event in events:
@@ -359,35 +440,38 @@ class MenuState(State):
     def draw(self, screen):
         """Draw menu state"""
         screen.fill(BLACK)
-        
-        font = self.game.asset_manager.get_font('title')
-        title_text = font.render("STRIKER 1945", True, WHITE)
-        title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
-        screen.blit(title_text, title_rect)
-        
-        font = self.game.asset_manager.get_font('score')
-        start_text = font.render("Press SPACE to start", True, WHITE)
-        start_rect = start_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50))
-        screen.blit(start_text, start_rect)
-        
-        quit_text = font.render("Press ESC to quit", True, WHITE)
-        quit_rect = quit_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 80))
-        screen.blit(quit_text, quit_rect)
+        for surface, rect in self.texts:
+            screen.blit(surface, rect)
 
 
 class StateManager:
+    """
+    Builds states on demand.
+    
+    The menu is built on first use and kept; gameplay is rebuilt on every
+    entry so a restart starts from scratch. Expensive pieces the states
+    share (parsed configs, surfaces, fonts, traffic panel) live on the game
+    and its asset manager, so a rebuild does not redo them.
+    """
+    
+    STATE_CLASSES = {
+        'menu': MenuState,
+        'gameplay': GameplayState,
+    }
+    FRESH_STATES = {'gameplay'}  # Rebuilt on every change_state()
+    
     def __init__(self, game):
         self.game = game
-        self.states = {
-            'menu': MenuState(game),
-            'gameplay': GameplayState(game)
-        }
-        self.current_state = self.states['menu']
+        self.states = {}
+        self.current_state = None
+        self.change_state('menu')
         
     def change_state(self, state_name):
-        """Change to a different state"""
-        if state_name in self.states:
-            if state_name == 'gameplay':
-                # Create a new gameplay state each time
-                self.states['gameplay'] = GameplayState(self.game)
-            self.current_state = self.states[state_name]
\ No newline at end of file
+        """Change to a different state, building it if needed"""
+        state_class = self.STATE_CLASSES.get(state_name)
+        if state_class is None:
+            return
+        if state_name in self.FRESH_STATES or state_name not in self.states:
+            self.states.pop(state_name, None)  # Let the old state go before building its replacement
+            self.states[state_name] = state_class(self.game)
+        self.current_state = self.states[state_name]
\ No newline at end of file
@@ -0,0 +1,253 @@
+"""
+Synthetic traffic generator for load-testing the packet→enemy pipeline.
+
+Scripted profiles drive a NetworkMonitor at a controlled packet mix and rate,
+without touching the real network:
+- steady   -> constant rate, everyday protocol mix
+- burst    -> same mix, 1 s bursts at 4× the rate every 5 s (same average)
+- synflood -> one source spraying TCP SYNs over fresh ports, light background
+- scan     -> ICMP sweep from many distinct sources, light background
+
+Packet sources:
+- inprocess -> frames fed straight into NetworkMonitor.process_frame on a
+               synthetic clock, as fast as possible (classification/spawn capacity)
+- loopback  -> frames injected onto an interface (default lo) through an
+               AF_PACKET socket at the profile's rate while the chosen capture
+               backend reads them (capture path saturation, needs CAP_NET_RAW).
+               On lo each injected frame is captured twice (outgoing and incoming).
+
+Reports offered and achieved pps, spawns emitted and drops:
+    python -m src.traffic_generator --profile synflood --rate 20000
+    sudo python -m src.traffic_generator --source loopback --backend mmap --mode process
+"""
+
+import argparse
+import random
+import socket
+import time
+
+from scapy.all import Ether, IP, IPv6, TCP, UDP, ICMP, ARP, DNS, DNSQR, Raw, raw
+from src.settings import FPS
+
+LOOPBACK_MAC = '00:00:00:00:00:00'
+SERVER_ADDRESS = '192.0.2.10'
+SERVER_ADDRESS_V6 = '2001:db8::10'
+FLOOD_SOURCE = '198.51.100.66'
+
+FRAME_POOL_SIZE = 256  # Distinct frames built per kind (scapy builds are slow)
+SCHEDULE_SIZE = 1 << 14  # Length of the precomputed frame sequence (power of two)
+
+# Header bytes re-randomised in every schedule slot, so floods and sweeps aren't
+# limited to the pool's distinct frames: kind -> (offset, size) in an untagged IPv4 frame.
+# Checksums go stale, which neither the classifier nor capture looks at.
+VARIED_FIELDS = {
+    'syn': (34, 2),  # TCP source port: a fresh flow per packet
+    'sweep': (27, 3),  # Low 24 bits of the source address: a fresh host per packet
+}
+
+
+def client_address(rng):
+    return f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}"
+
+
+def ephemeral_port(rng):
+    return rng.randrange(32768, 61000)
+
+
+# Frame builders per traffic kind: rng -> scapy packet
+FRAME_KINDS = {
+    'dns': lambda rng: IP(src=client_address(rng), dst=SERVER_ADDRESS)
+                       / UDP(sport=ephemeral_port(rng), dport=53) / DNS(qd=DNSQR(qname='example.com')),
+    'http': lambda rng: IP(src=client_address(rng), dst=SERVER_ADDRESS)
+                        / TCP(sport=ephemeral_port(rng), dport=80, flags='PA') / Raw(b'GET / HTTP/1.1\r\n\r\n'),
+    'https': lambda rng: IP(src=SERVER_ADDRESS, dst=client_address(rng))
+                         / TCP(sport=443, dport=ephemeral_port(rng), flags='A') / Raw(bytes(1200)),
+    'quic': lambda rng: IPv6(src=SERVER_ADDRESS_V6, dst=f"2001:db8::{rng.randrange(1, 0xffff):x}")
+                        / UDP(sport=443, dport=ephemeral_port(rng)) / Raw(bytes(1200)),
+    'tcp': lambda rng: IP(src=client_address(rng), dst=SERVER_ADDRESS)
+                       / TCP(sport=ephemeral_port(rng), dport=rng.randrange(10000, 20000), flags='A'),
+    'udp': lambda rng: IP(src=client_address(rng), dst=SERVER_ADDRESS)
+                       / UDP(sport=ephemeral_port(rng), dport=rng.randrange(10000, 20000)) / Raw(bytes(100)),
+    'icmp': lambda rng: IP(src=client_address(rng), dst=SERVER_ADDRESS) / ICMP(),
+    'arp': lambda rng: ARP(psrc=client_address(rng), pdst=SERVER_ADDRESS),
+    'syn': lambda rng: IP(src=FLOOD_SOURCE, dst=SERVER_ADDRESS)
+                       / TCP(sport=rng.randrange(1024, 65536), dport=rng.randrange(1, 1024), flags='S'),
+    'sweep': lambda rng: IP(src=client_address(rng), dst=f"192.0.2.{rng.randrange(1, 255)}") / ICMP(),
+}
+
+STEADY_MIX = {'https': 0.35, 'quic': 0.15, 'http': 0.1, 'dns': 0.15,
+              'tcp': 0.05, 'udp': 0.05, 'icmp': 0.1, 'arp': 0.05}
+
+# mix: traffic kind -> weight, rate: (t, nominal pps) -> pps at t seconds into the run
+PROFILES = {
+    'steady': {'mix': STEADY_MIX, 'rate': lambda t, rate: rate},
+    'burst': {'mix': STEADY_MIX, 'rate': lambda t, rate: rate * 4 if t % 5.0 < 1.0 else rate * 0.25},
+    'synflood': {'mix': {'syn': 0.9, 'https': 0.1}, 'rate': lambda t, rate: rate},
+    'scan': {'mix': {'sweep': 0.8, 'https': 0.2}, 'rate': lambda t, rate: rate},
+}
+
+
+def build_schedule(mix, seed=1945):
+    """Pre-build the frame sequence for a mix, so generating a packet is a list index."""
+    rng = random.Random(seed)
+    pools = {}
+    for kind in mix:
+        pools[kind] = []
+        for _ in range(FRAME_POOL_SIZE):
+            ether = Ether(src=f"02:00:00:{rng.randrange(256):02x}:{rng.randrange(256):02x}:01", dst=LOOPBACK_MAC)
+            pools[kind].append(raw(ether / FRAME_KINDS[kind](rng)))
+
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    schedule = []
+    for kind in rng.choices(kinds, weights, k=SCHEDULE_SIZE):
+        frame = rng.choice(pools[kind])
+        if kind in VARIED_FIELDS:
+            offset, size = VARIED_FIELDS[kind]
+            frame = bytearray(frame)
+            frame[offset:offset + size] = rng.getrandbits(size * 8).to_bytes(size, 'big')
+            frame = bytes(frame)
+        schedule.append(frame)
+    return schedule
+
+
+def count_captured(stats, packet_types):
+    return sum(stats.get(packet_type, 0) for packet_type in packet_types)
+
+
+def run_inprocess(profile, rate, duration, fps=FPS):
+    """Feed the profile into NetworkMonitor.process_frame as fast as possible on a synthetic clock."""
+    from src.network_monitor import NetworkMonitor
+
+    monitor = NetworkMonitor(backend='pcap')  # Never started; frames are fed directly
+    frames = build_schedule(profile['mix'])
+    rate_at = profile['rate']
+    mask = SCHEDULE_SIZE - 1
+    process_frame = monitor.process_frame
+
+    base = time.time()
+    monitor.spawn_controller.start(base)
+    frame_interval = 1.0 / fps
+    next_poll = frame_interval
+    spawns = 0
+    offered = 0
+    t = 0.0
+
+    start = time.perf_counter()
+    while t < duration:
+        while t >= next_poll:
+            spawns += len(monitor.poll_spawns(now=base + next_poll))
+            next_poll += frame_interval
+        frame = frames[offered & mask]
+        process_frame(frame, 0, len(frame), base + t)
+        offered += 1
+        t += 1.0 / rate_at(t, rate)
+    spawns += len(monitor.poll_spawns(now=base + next_poll))
+    elapsed = time.perf_counter() - start
+
+    stats = monitor.get_stats()
+    return {
+        'offered': offered,
+        'offered_pps': offered / duration,
+        'captured': count_captured(stats, monitor.classifier.packet_types),
+        'elapsed': elapsed,
+        'achieved_pps': offered / max(elapsed, 1e-9),
+        'spawns': spawns,
+        'kernel_drops': 0,
+        'stats': stats,
+    }
+
+
+def run_loopback(profile, rate, duration, fps=FPS, interface='lo', backend='mmap', mode='thread'):
+    """Inject the profile onto `interface` in real time while a capture backend reads it."""
+    from src.network_monitor import NetworkMonitor, PROTOCOL_CLASSIFIER
+    from src.capture_worker import CaptureWorkerClient
+
+    monitor_class = CaptureWorkerClient if mode == 'process' else NetworkMonitor
+    monitor = monitor_class(interface=interface, backend=backend)
+    frames = build_schedule(profile['mix'])
+    rate_at = profile['rate']
+    mask = SCHEDULE_SIZE - 1
+
+    sender = socket.socket(socket.AF_PACKET, socket.SOCK_RAW)
+    sender.bind((interface, 0))
+    monitor.start()
+    time.sleep(1.0)  # Let the capture open before traffic starts
+    baseline = count_captured(monitor.get_stats(), PROTOCOL_CLASSIFIER.packet_types)
+
+    frame_interval = 1.0 / fps
+    spawns = 0
+    offered = 0
+    due = 0.0
+    start = last = time.perf_counter()
+    next_poll = start + frame_interval
+    try:
+        while True:
+            now = time.perf_counter()
+            if now - start >= duration:
+                break
+            due += rate_at(now - start, rate) * (now - last)
+            last = now
+            while offered < int(due):
+                sender.send(frames[offered & mask])
+                offered += 1
+            if now >= next_poll:
+                spawns += len(monitor.poll_spawns())
+                next_poll += frame_interval
+            elif offered >= int(due):
+                time.sleep(0.0005)
+        elapsed = time.perf_counter() - start
+
+        time.sleep(0.5)  # Let the capture drain what is still queued
+        spawns += len(monitor.poll_spawns())
+        stats = monitor.get_stats()
+        kernel_drops = stats.get('kernel_drops', 0)
+    finally:
+        sender.close()
+        monitor.stop()
+
+    captured = count_captured(stats, PROTOCOL_CLASSIFIER.packet_types) - baseline
+    return {
+        'offered': offered,
+        'offered_pps': offered / max(elapsed, 1e-9),
+        'captured': captured,
+        'elapsed': elapsed,
+        'achieved_pps': captured / max(elapsed, 1e-9),
+        'spawns': spawns,
+        'kernel_drops': kernel_drops,
+        'stats': stats,
+    }
+
+
+def print_report(name, result):
+    print(f"Profile {name}: offered {result['offered']} packets ({result['offered_pps']:.0f} pps)")
+    print(f"Captured {result['captured']} packets in {result['elapsed']:.3f}s "
+          f"({result['achieved_pps']:.0f} pps achieved)")
+    print(f"Spawns emitted: {result['spawns']}")
+    print(f"Kernel drops: {result['kernel_drops']}")
+    print(f"Monitor stats: {result['stats']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the packet→enemy pipeline with synthetic traffic")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='steady')
+    parser.add_argument('--rate', type=float, default=10000, help="nominal packets per second")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds of traffic")
+    parser.add_argument('--source', choices=['inprocess', 'loopback'], default='inprocess')
+    parser.add_argument('--interface', default='lo', help="interface to inject on (loopback source)")
+    parser.add_argument('--backend', choices=['mmap', 'scapy'], default='mmap', help="capture backend (loopback source)")
+    parser.add_argument('--mode', choices=['thread', 'process'], default='thread', help="capture mode (loopback source)")
+    parser.add_argument('--fps', type=int, default=FPS, help="game frame rate for spawn polling")
+    args = parser.parse_args()
+
+    profile = PROFILES[args.profile]
+    if args.source == 'loopback':
+        result = run_loopback(profile, args.rate, args.duration, args.fps,
+                              args.interface, args.backend, args.mode)
+    else:
+        result = run_inprocess(profile, args.rate, args.duration, args.fps)
+    print_report(args.profile, result)
+
+
+if __name__ == '__main__':
+    main()
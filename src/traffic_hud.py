@@ -0,0 +1,172 @@
+"""
+In-game traffic panel: per-protocol packets-per-second sparklines.
+
+TrafficHistory keeps fixed-size NumPy ring buffers (protocols x slots) at
+several resolutions, 1 s, 10 s and 60 s buckets by default. It samples the
+monitor's cumulative packet counters once per base bucket, never per
+frame. Coarser tiers are downsampled from the base samples as their
+buckets fill.
+
+TrafficPanel renders one tier into a cached surface and only redraws it when
+that tier has a new bucket; every other frame is a single blit.
+"""
+
+import numpy as np
+import pygame
+
+from src.settings import (
+    TRAFFIC_HISTORY_TIERS, TRAFFIC_HISTORY_LENGTH, TRAFFIC_HUD_WIDTH, TRAFFIC_HUD_ROWS, WHITE,
+)
+
+SPARKLINE_COLORS = [
+    (0, 200, 255), (255, 180, 0), (120, 255, 120), (255, 90, 90),
+    (200, 120, 255), (255, 255, 120), (120, 200, 200), (255, 150, 200),
+]
+ROW_HEIGHT = 22
+LABEL_WIDTH = 50
+VALUE_WIDTH = 60
+HEADER_HEIGHT = 20
+
+
+class TrafficHistory:
+    """Per-protocol pps history in preallocated ring buffers, one per downsampling tier."""
+
+    def __init__(self, protocols, tiers=TRAFFIC_HISTORY_TIERS, length=TRAFFIC_HISTORY_LENGTH):
+        self.protocols = list(protocols)
+        self.index = {protocol: i for i, protocol in enumerate(self.protocols)}
+        self.tiers = list(tiers)  # Bucket length in seconds per tier, finest first
+        self.length = length
+        count = len(self.protocols)
+        self.rings = [np.zeros((count, length), dtype=np.float32) for _ in self.tiers]
+        self.heads = [0] * len(self.tiers)  # Next slot to write per tier
+        self.filled = [0] * len(self.tiers)
+        self.versions = [0] * len(self.tiers)  # Bumped whenever a tier gets a bucket
+
+        # Accumulators for the coarser tiers: packets and seconds since their last bucket
+        self.pending = np.zeros((len(self.tiers), count), dtype=np.float64)
+        self.pending_seconds = [0.0] * len(self.tiers)
+
+        # Scratch arrays reused by every sample
+        self.totals = np.zeros(count, dtype=np.float64)
+        self.last_totals = np.zeros(count, dtype=np.float64)
+        self.delta = np.zeros(count, dtype=np.float64)
+        self.last_time = None
+
+    def poll(self, monitor, now):
+        """Sample the monitor if a base bucket has elapsed since the last sample (call once per frame)."""
+        if self.last_time is not None and now - self.last_time < self.tiers[0]:
+            return False
+        self.sample(monitor.get_metrics()['packets_classified'], now)
+        return True
+
+    def sample(self, packet_totals, now):
+        """Close a base bucket from cumulative {protocol: packets} counters read at `now`."""
+        totals = self.totals
+        for protocol, count in packet_totals.items():
+            index = self.index.get(protocol)
+            if index is not None:
+                totals[index] = count
+
+        if self.last_time is None:
+            self.last_time = now
+            self.last_totals[:] = totals
+            return
+
+        elapsed = now - self.last_time
+        self.last_time = now
+        delta = self.delta
+        np.subtract(totals, self.last_totals, out=delta)
+        np.maximum(delta, 0, out=delta)  # A restarted capture may reset its counters
+        self.last_totals[:] = totals
+        if elapsed <= 0:
+            return
+
+        for tier, bucket_seconds in enumerate(self.tiers):
+            pending = self.pending[tier]
+            pending += delta
+            self.pending_seconds[tier] += elapsed
+            if self.pending_seconds[tier] + 1e-6 < bucket_seconds:
+                continue
+            self.push(tier, pending, self.pending_seconds[tier])
+            pending[:] = 0
+            self.pending_seconds[tier] = 0.0
+
+    def push(self, tier, packets, seconds):
+        """Write one bucket (mean pps over `seconds`) into a tier's ring."""
+        head = self.heads[tier]
+        np.divide(packets, seconds, out=self.rings[tier][:, head], casting='unsafe')
+        self.heads[tier] = (head + 1) % self.length
+        self.filled[tier] = min(self.filled[tier] + 1, self.length)
+        self.versions[tier] += 1
+
+    def series(self, tier):
+        """(protocols x filled) pps array for a tier, oldest bucket first."""
+        ring = self.rings[tier]
+        filled = self.filled[tier]
+        head = self.heads[tier]
+        if filled < self.length:
+            return ring[:, :filled]
+        return np.concatenate((ring[:, head:], ring[:, :head]), axis=1)
+
+
+class TrafficPanel:
+    """Sparkline panel for one TrafficHistory tier, cached between buckets."""
+
+    def __init__(self, history, font, width=TRAFFIC_HUD_WIDTH, rows=TRAFFIC_HUD_ROWS):
+        self.history = history
+        self.font = font
+        self.rows = rows
+        self.surface = pygame.Surface((width, HEADER_HEIGHT + rows * ROW_HEIGHT + 4), pygame.SRCALPHA)
+        self.tier = 0
+        self.drawn_version = None
+
+    def cycle_tier(self):
+        self.tier = (self.tier + 1) % len(self.history.tiers)
+        self.drawn_version = None
+
+    def draw(self, screen, topright):
+        version = (self.tier, self.history.versions[self.tier])
+        if version != self.drawn_version:
+            self.redraw()
+            self.drawn_version = version
+        screen.blit(self.surface, self.surface.get_rect(topright=topright))
+
+    def redraw(self):
+        surface = self.surface
+        surface.fill((0, 0, 0, 150))
+        history = self.history
+        bucket_seconds = history.tiers[self.tier]
+        series = history.series(self.tier)
+        span = bucket_seconds * history.length
+
+        header = self.font.render(f"Traffic pps ({bucket_seconds:g}s buckets, {span / 60:g} min)", True, WHITE)
+        surface.blit(header, (4, 2))
+        if not series.shape[1]:
+            return
+
+        # Busiest protocols over the window first, idle ones left out
+        totals = series.sum(axis=1)
+        order = [index for index in np.argsort(totals)[::-1][:self.rows] if totals[index] > 0]
+        spark_width = surface.get_width() - LABEL_WIDTH - VALUE_WIDTH - 8
+        step = spark_width / max(history.length - 1, 1)
+        offset = history.length - series.shape[1]  # Right-align a partially filled window
+
+        for row, index in enumerate(order):
+            color = SPARKLINE_COLORS[index % len(SPARKLINE_COLORS)]
+            top = HEADER_HEIGHT + row * ROW_HEIGHT
+            values = series[index]
+            peak = float(values.max()) or 1.0
+
+            label = self.font.render(history.protocols[index].upper(), True, color)
+            surface.blit(label, (4, top + 2))
+
+            base = top + ROW_HEIGHT - 3
+            heights = (values / peak) * (ROW_HEIGHT - 6)
+            points = [(LABEL_WIDTH + (offset + i) * step, base - height) for i, height in enumerate(heights.tolist())]
+            if len(points) > 1:
+                pygame.draw.lines(surface, color, False, points)
+            else:
+                pygame.draw.circle(surface, color, points[0], 1)
+
+            value = self.font.render(f"{values[-1]:.0f}", True, WHITE)
+            surface.blit(value, value.get_rect(topright=(surface.get_width() - 4, top + 2)))
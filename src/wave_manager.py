@@ -1,22 +1,38 @@
 import pygame
-import json
-import os
+import math
 import random
 from src.enemy import Enemy
 from src.boss import Boss
-from src.settings import SCREEN_WIDTH
+from src.log import get_logger, log_event
+from src.settings import (
+    SCREEN_WIDTH, DISTINCT_DIFFICULTY_BASELINE, DISTINCT_DIFFICULTY_SCALE, DISTINCT_DIFFICULTY_MAX,
+    WAVE_CONFIG_PATH, MAX_WAVES, WAVE_DURATION, BOSS_WAVE_INTERVAL,
+)
+
+log = get_logger('waves')
+
+
+def difficulty_from_distinct_sources(distinct_sources):
+    """Map the distinct source estimate onto a wave difficulty multiplier (log scale, clamped)."""
+    if distinct_sources <= DISTINCT_DIFFICULTY_BASELINE:
+        return 1.0
+    multiplier = 1.0 + DISTINCT_DIFFICULTY_SCALE * math.log2(distinct_sources / DISTINCT_DIFFICULTY_BASELINE)
+    return min(multiplier, DISTINCT_DIFFICULTY_MAX)
+
 
 class WaveManager:
     """Manages wave-based enemy spawning and progression"""
     
-    def __init__(self, asset_manager, player, sprite_groups):
+    def __init__(self, asset_manager, player, sprite_groups, enemy_bullets=None, movement=None):
         self.asset_manager = asset_manager
         self.player = player
-        self.sprite_groups = sprite_groups  # [all_sprites, enemy_group, enemy_bullet_group]
+        self.sprite_groups = sprite_groups  # [all_sprites, enemy_group]
+        self.enemy_bullets = enemy_bullets  # BulletField enemy attacks fire into
+        self.movement = movement  # MovementSystem that moves regular enemies in batches, or None
         
         # Wave state
         self.current_wave = 1
-        self.max_waves = 10  # Total waves to complete the game
+        self.max_waves = MAX_WAVES  # Total waves to complete the game
         self.wave_active = False
         self.wave_complete = False
         self.all_waves_complete = False  # Victory condition
@@ -24,6 +40,10 @@ class WaveManager:
         self.enemies_to_spawn = 0
         self.spawn_timer = 0
         self.spawn_delay = 1000  # Base spawn delay in milliseconds
+        self.base_spawn_delay = 1000  # Wave's configured delay before difficulty scaling
+        
+        # Network-driven difficulty (distinct hosts on the wire)
+        self.difficulty_multiplier = 1.0
         
         # Boss battle state
         self.is_boss_wave = False
@@ -36,7 +56,7 @@ class WaveManager:
         
         # Wave duration (1 minute per wave)
         self.wave_start_time = 0
-        self.wave_duration = 10000  # 10 seconds in milliseconds
+        self.wave_duration = WAVE_DURATION  # Milliseconds
 
         # Current wave configuration
         self.current_wave_config = None
@@ -48,13 +68,11 @@ class WaveManager:
         self.start_wave(1)
         
     def load_wave_configs(self):
-        """Load wave configurations from JSON file"""
-        config_path = os.path.join('data', 'wave_config.json')
-        try:
-            with open(config_path, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
+        """Load wave configurations from JSON file (data/wave_config.json or a compiled level, parsed once)"""
+        wave_configs = self.asset_manager.get_config(WAVE_CONFIG_PATH)
+        if wave_configs is None:
             return self.get_default_wave_configs()
+        return wave_configs
             
     def get_default_wave_configs(self):
         """Default wave configurations if file doesn't exist"""
@@ -115,30 +133,47 @@ class WaveManager:
         """Start a specific wave or boss battle"""
         self.current_wave = wave_number
         
-        # Check if this is a boss wave (every 5 waves)
-        self.is_boss_wave = (wave_number % 5 == 0)
+        self.is_boss_wave = self.is_boss(wave_number)
         
         if self.is_boss_wave:
-            self.start_boss_battle()
+            # Compiled levels can name the talker behind the traffic peak
+            self.start_boss_battle(self.wave_configs.get(str(wave_number), {}).get("talker"))
         else:
             self.start_regular_wave(wave_number)
             
+    def is_boss(self, wave_number):
+        """
+        Whether a wave is a boss battle.
+        
+        A wave config's "boss" flag decides (compiled levels place bosses on
+        traffic peaks); otherwise every BOSS_WAVE_INTERVAL-th wave is one.
+        """
+        wave_config = self.wave_configs.get(str(wave_number), {})
+        return wave_config.get("boss", wave_number % BOSS_WAVE_INTERVAL == 0)
+        
     def start_regular_wave(self, wave_number):
         """Start a regular enemy wave"""
         wave_key = str(wave_number)
         
         # Get wave config or generate procedural wave
         if wave_key in self.wave_configs:
-            self.current_wave_config = self.wave_configs[wave_key]
+            wave_config = self.wave_configs[wave_key]
         else:
-            self.current_wave_config = self.generate_procedural_wave(wave_number)
+            wave_config = self.generate_procedural_wave(wave_number)
+        
+        # Scale enemy counts by the difficulty multiplier (copy so the loaded config is untouched)
+        self.current_wave_config = dict(wave_config, enemies={
+            enemy_type: math.ceil(count * self.difficulty_multiplier)
+            for enemy_type, count in wave_config["enemies"].items()
+        })
             
         # Calculate total enemies to spawn
         self.enemies_to_spawn = sum(self.current_wave_config["enemies"].values())
         self.enemies_spawned = 0
         
         # Set spawn timing
-        self.spawn_delay = self.current_wave_config.get("spawn_delay", 1000)
+        self.base_spawn_delay = self.current_wave_config.get("spawn_delay", 1000)
+        self.spawn_delay = self.base_spawn_delay / self.difficulty_multiplier
         self.spawn_timer = 0
         
         # Start wave
@@ -147,18 +182,24 @@ class WaveManager:
         self.in_transition = False
         self.wave_start_time = pygame.time.get_ticks()
         
-    def start_boss_battle(self):
-        """Start a boss battle"""
-        # Determine boss type based on wave number
-        boss_type = self.get_boss_type_for_wave(self.current_wave)
+    def start_boss_battle(self, talker=None):
+        """Start a boss battle, optionally tagged with the network talker that triggered it"""
+        # Determine boss type based on wave number, unless the wave config names one
+        wave_config = self.wave_configs.get(str(self.current_wave), {})
+        boss_type = wave_config.get("boss_type") or self.get_boss_type_for_wave(self.current_wave)
         
         # Spawn the boss
         spawn_pos = (SCREEN_WIDTH // 2, -50)  # Center top of screen
-        self.boss_enemy = Boss(spawn_pos, boss_type, self.asset_manager, self.player, self.sprite_groups)
+        self.boss_enemy = Boss(spawn_pos, boss_type, self.asset_manager, self.player, self.sprite_groups, self.enemy_bullets)
+        if talker is not None:
+            self.boss_enemy.tag_talker(talker)
         
         # Boss wave configuration
+        boss_name = boss_type.replace('_', ' ').title()
+        if talker is not None:
+            boss_name = f"{boss_name} ({talker})"
         self.current_wave_config = {
-            "name": f"Boss Battle - {boss_type.replace('_', ' ').title()}",
+            "name": f"Boss Battle - {boss_name}",
             "enemies": {},
             "spawn_delay": 0,
             "spawn_pattern": "boss"
@@ -173,7 +214,30 @@ class WaveManager:
         self.in_transition = False
         self.wave_start_time = pygame.time.get_ticks()
         
-        print(f"Boss battle started! Wave {self.current_wave} - {boss_type}")
+        log_event(log, "boss battle", "Boss battle started! Wave %d - %s", self.current_wave, boss_type,
+                  wave=self.current_wave, boss_type=boss_type, talker=talker)
+        
+    def start_talker_boss(self, talker):
+        """
+        Replace the current regular wave with a boss battle for a heavy hitter talker.
+        
+        Returns False (and does nothing) during boss waves and wave transitions.
+        """
+        if self.is_boss_wave or self.in_transition or not self.wave_active:
+            return False
+        self.is_boss_wave = True
+        self.start_boss_battle(talker)
+        return True
+        
+    def set_difficulty_multiplier(self, multiplier):
+        """
+        Set the network difficulty multiplier.
+        
+        Spawn pacing of the running wave follows immediately; enemy counts
+        are scaled when the next regular wave starts.
+        """
+        self.difficulty_multiplier = max(1.0, multiplier)
+        self.spawn_delay = self.base_spawn_delay / self.difficulty_multiplier
         
     def get_boss_type_for_wave(self, wave_number):
         """Determine which boss to spawn based on wave number"""
@@ -260,7 +324,8 @@ class WaveManager:
         spawn_pos = self.get_spawn_position(enemy_type)
         
         # Create enemy
-        enemy = Enemy(spawn_pos, enemy_type, self.asset_manager, self.player, self.sprite_groups)
+        enemy = Enemy(spawn_pos, enemy_type, self.asset_manager, self.player, self.sprite_groups, self.enemy_bullets,
+                      self.movement)
         
         self.enemies_spawned += 1
         
@@ -335,5 +400,6 @@ class WaveManager:
             "wave_active": self.wave_active,
             "is_boss_wave": self.is_boss_wave,
             "boss_enemy": self.boss_enemy,
-            "all_waves_complete": self.all_waves_complete
+            "all_waves_complete": self.all_waves_complete,
+            "difficulty_multiplier": self.difficulty_multiplier
         }
\ No newline at end of file